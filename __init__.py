@@ -1,2 +1,9 @@
 # This file makes Python treat this directory as a package.
-from . import lc_adk_agent
+# lc_adk_agent is imported on first access, since loading it pulls in google.adk.
+import importlib
+
+
+def __getattr__(name):
+    if name == "lc_adk_agent":
+        return importlib.import_module(f"{__name__}.lc_adk_agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
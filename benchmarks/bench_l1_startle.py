@@ -0,0 +1,54 @@
+import argparse
+import time
+from typing import Callable, Dict, Any
+
+from ..sops import sop_l1_startle
+from ..sops.sop_l1_startle import startle_process
+
+# L1 throughput: building a fully validated MadaSeed shell per event (the old path, kept as
+# _startle_build_madaSeed_shell) against cloning the prebuilt template, and startle_process
+# end to end. Run with:  python -m lc_python_core.benchmarks.bench_l1_startle [-n 5000]
+
+EXAMPLE_EVENT: Dict[str, Any] = {
+    "reception_timestamp_utc_iso": "2023-10-27T10:00:00Z",
+    "origin_hint": "Benchmark",
+    "data_components": [
+        {"role_hint": "primary_text_content", "content_handle_placeholder": "This is the main text.", "size_hint": 22, "type_hint": "text/plain"},
+        {"role_hint": "attachment_file", "content_handle_placeholder": "file_ref_xyz.pdf", "size_hint": 102400, "type_hint": "application/pdf"}
+    ]
+}
+
+
+def _per_second(func: Callable[[], Any], iterations: int) -> float:
+    func() # Warm up (builds the template on first use)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def run_benchmark(iterations: int = 5000) -> Dict[str, float]:
+    build_shell = lambda: sop_l1_startle._startle_build_madaSeed_shell("urn:crux:uid::bench", "urn:crux:uid::bench", [])
+    clone_shell = lambda: sop_l1_startle._startle_create_initial_madaSeed_shell("urn:crux:uid::bench", "urn:crux:uid::bench", [])
+    build_rate = _per_second(build_shell, iterations)
+    clone_rate = _per_second(clone_shell, iterations)
+
+    # startle_process creates two shells per event (the error shell and the working one).
+    original_create = sop_l1_startle._startle_create_initial_madaSeed_shell
+    sop_l1_startle._startle_create_initial_madaSeed_shell = sop_l1_startle._startle_build_madaSeed_shell
+    try:
+        events_before = _per_second(lambda: startle_process(EXAMPLE_EVENT), iterations)
+    finally:
+        sop_l1_startle._startle_create_initial_madaSeed_shell = original_create
+    events_after = _per_second(lambda: startle_process(EXAMPLE_EVENT), iterations)
+    return {"shell_build_per_sec": build_rate, "shell_clone_per_sec": clone_rate,
+            "l1_events_per_sec_build": events_before, "l1_events_per_sec_clone": events_after}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="L1 startle throughput: validated shell build vs template clone.")
+    parser.add_argument("-n", "--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    results = run_benchmark(args.iterations)
+    print(f"MadaSeed shell   build: {results['shell_build_per_sec']:9.0f}/s   clone: {results['shell_clone_per_sec']:9.0f}/s   ({results['shell_clone_per_sec'] / results['shell_build_per_sec']:.1f}x)")
+    print(f"L1 events        build: {results['l1_events_per_sec_build']:9.0f}/s   clone: {results['l1_events_per_sec_clone']:9.0f}/s   ({results['l1_events_per_sec_clone'] / results['l1_events_per_sec_build']:.1f}x)")
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from typing import Dict, List
+
+# Import-time and cold-start cost of the SOP modules, each measured in a fresh interpreter.
+#   import:  time to import the module, and whether google.adk got loaded with it
+#   cold L3: time for the first get_llm_service() (builds the shared AdkLlmService)
+# Run with:  python -m lc_python_core.benchmarks.bench_startup [-n 5]
+
+MODULES = ["sop_l1_startle", "sop_l2_frame_click", "sop_l3_keymap_click", "sop_l7_apply_done", "sop_pipeline_runner"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import lc_python_core.sops.{module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "adk_loaded": "google.adk" in sys.modules}}))
+"""
+
+_COLD_START_PROBE = """
+import json, sys, time
+import lc_python_core.sops.sop_l3_keymap_click
+from lc_python_core.services.lc_llm_registry import get_llm_service
+start = time.perf_counter()
+service = get_llm_service()
+print(json.dumps({"seconds": time.perf_counter() - start, "adk_loaded": "google.adk" in sys.modules}))
+"""
+
+
+def _probe(code: str) -> Dict:
+    package_parent = str(Path(__file__).parents[2]) # Directory containing lc_python_core
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_parent, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs: int = 5) -> Dict[str, Dict]:
+    results = {}
+    for module in MODULES:
+        samples: List[Dict] = [_probe(_IMPORT_PROBE.format(module=module)) for _ in range(runs)]
+        results[module] = {"median_seconds": median(s["seconds"] for s in samples), "adk_loaded": samples[-1]["adk_loaded"]}
+    samples = [_probe(_COLD_START_PROBE) for _ in range(runs)]
+    results["first get_llm_service()"] = {"median_seconds": median(s["seconds"] for s in samples), "adk_loaded": samples[-1]["adk_loaded"]}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import-time and cold-start cost of the SOP modules.")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    args = parser.parse_args()
+    for name, result in run_benchmark(args.runs).items():
+        print(f"{name:28s} {result['median_seconds'] * 1000:8.1f} ms   google.adk loaded: {result['adk_loaded']}")
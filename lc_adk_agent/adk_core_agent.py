@@ -13,7 +13,7 @@ except ImportError:
     genai = None # Define genai as None if import fails, to be checked later
 
 class CoreADKAgent:
-    def __init__(self, llm_model_name: str, api_key: str = None, agent_name: str = "CoreADKAgentV1"): # Modified signature
+    def __init__(self, llm_model_name: str, api_key: str = None, agent_name: str = "CoreADKAgentV1", llm_backend=None): # Modified signature
         """
         Initializes the CoreADKAgent.
 
@@ -23,9 +23,18 @@ class CoreADKAgent:
                                      to configure the google-generativeai library. Otherwise,
                                      relies on environment configuration.
             agent_name (str, optional): A name for this agent instance.
+            llm_backend (LlmBackend, optional): Answers prompts instead of an ADK LlmAgent, e.g. a
+                                                StubLlmService for offline load tests. No ADK agent,
+                                                session service or runner is created.
         """
         self.model_name = llm_model_name
         self.agent_name = agent_name
+        self.llm_backend = llm_backend
+        if llm_backend is not None:
+            self.llm_agent = None
+            self.session_service = None
+            self.runner = None
+            return
         # self.provided_api_key = api_key # No longer needed to store separately like before
 
         if api_key:
@@ -74,7 +83,14 @@ class CoreADKAgent:
         """
         Sends a prompt to the LLM via the ADK Runner and returns the response.
         (Method body remains unchanged from previous correct version)
+        With an `llm_backend`, the prompt is sent to it instead.
         """
+        if self.llm_backend is not None:
+            try:
+                return await self.llm_backend.prompt_llm(prompt, user_id=user_id, session_id=session_id)
+            except Exception as e:
+                return f"Error during ADK prompt execution: {e}"
+
         if not self.runner or not self.llm_agent:
             return "Error: ADK Runner or LlmAgent not initialized."
 
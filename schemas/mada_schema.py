@@ -1135,23 +1135,23 @@ class L7EncodedApplication(BaseModel):
 # Nested content models
 class L1StartleReflex(BaseModel):
     L1_startle_context_obj: L1StartleContextObj
-    L2_frame_type: L2FrameTypeObj # Placeholder for L2FrameType
+    L2_frame_type: L2FrameType
 
 class L2FrameType(BaseModel):
     L2_frame_type_obj: L2FrameTypeObj
-    L3_surface_keymap: L3SurfaceKeymapObj # Placeholder for L3SurfaceKeymap
+    L3_surface_keymap: L3SurfaceKeymap
 
 class L3SurfaceKeymap(BaseModel):
     L3_surface_keymap_obj: L3SurfaceKeymapObj
-    L4_anchor_state: L4AnchorStateObj # Placeholder for L4AnchorState
+    L4_anchor_state: L4AnchorState
 
 class L4AnchorState(BaseModel):
     L4_anchor_state_obj: L4AnchorStateObj
-    L5_field_state: L5FieldStateObj # Placeholder for L5FieldState
+    L5_field_state: L5FieldState
 
 class L5FieldState(BaseModel):
     L5_field_state_obj: L5FieldStateObj
-    L6_reflection_payload: L6ReflectionPayloadObj # Placeholder for L6ReflectionPayload
+    L6_reflection_payload: L6ReflectionPayload
 
 class L6ReflectionPayload(BaseModel):
     L6_reflection_payload_obj: L6ReflectionPayloadObj
@@ -1164,9 +1164,18 @@ class SeedContent(BaseModel):
     L1_startle_reflex: L1StartleReflex
 
 # Trace metadata models
+class LayerTiming(BaseModel): # Filled by services/lc_metrics.py when LC_METRICS is enabled
+    wall_ms: float
+    cpu_ms: float
+    llm_wait_ms: float = 0.0 # Summed over the layer's LLM calls, which may overlap
+    llm_calls: int = 0
+    tracemalloc_peak_bytes: Optional[int] = None
+    seed_size_bytes: Optional[int] = None
+
 class L1Trace(BaseModel):
     version_L1_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.startle$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L1: datetime # Renamed from completion_timestamp_l1
     epistemic_state_L1: L1EpistemicStateOfStartleEnum
     L1_trace_creation_time_from_context: datetime # Renamed
@@ -1180,6 +1189,7 @@ class L1Trace(BaseModel):
 class L2Trace(BaseModel):
     version_L2_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.frame_click$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L2: datetime # Renamed
     epistemic_state_L2: L2EpistemicStateOfFramingEnum
     L2_input_class_determined_in_trace: Optional[InputClassL2Enum] = None # Renamed
@@ -1195,6 +1205,7 @@ class L2Trace(BaseModel):
 class L3Trace(BaseModel):
     version_L3_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.keymap_click$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L3: datetime # Renamed
     epistemic_state_L3: Optional[str] = None # Enum: Keymapped_Successfully, LCL-Clarify-Semantics_L3 etc.
     L3_primary_language_detected_code: Optional[str] = None # Renamed
@@ -1207,6 +1218,7 @@ class L3Trace(BaseModel):
 class L4Trace(BaseModel):
     version_L4_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.anchor_click$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L4: datetime # Renamed
     epistemic_state_L4: L4EpistemicStateOfAnchoringEnum
     L4_pa_profile_engaged_ref_in_trace: Optional[str] = None # CRUX UID, Renamed
@@ -1220,6 +1232,7 @@ class L4Trace(BaseModel):
 class L5Trace(BaseModel):
     version_L5_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.field_click$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L5: datetime # Renamed
     epistemic_state_L5: L5EpistemicStateOfFieldProcessingEnum
     L5_field_instance_uid_processed: Optional[str] = None # CRUX UID, Renamed
@@ -1235,6 +1248,7 @@ class L5Trace(BaseModel):
 class L6Trace(BaseModel):
     version_L6_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.reflect_boom$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L6: datetime # Renamed
     epistemic_state_L6: L6EpistemicStateEnum
     L6_presentation_target_consumer_type: Optional[ConsumerTypeEnum] = None # Renamed
@@ -1256,6 +1270,7 @@ class L7TraceActionExecutionSummary(BaseModel): # Added from MR logic example
 class L7Trace(BaseModel):
     version_L7_trace_schema: Annotated[str, StringConstraints(pattern=r"^\d+\.\d+\.\d+$")]
     sop_name: Annotated[str, StringConstraints(pattern=r"^lC\.SOP\.apply_done$")]
+    timing: Optional[LayerTiming] = None # Per-layer instrumentation
     completion_timestamp_L7: datetime # Renamed
     epistemic_state_L7: L7EpistemicStateEnum
     L7_application_intent_resolved: Optional[str] = None # Renamed
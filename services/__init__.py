@@ -1,7 +1,13 @@
 # This file makes Python treat this directory as a package.
-
-from .adk_llm_service import AdkLlmService
+# AdkLlmService is imported on first access, since loading it pulls in google.adk.
 
 __all__ = [
     "AdkLlmService",
 ]
+
+
+def __getattr__(name):
+    if name == "AdkLlmService":
+        from .adk_llm_service import AdkLlmService
+        return AdkLlmService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
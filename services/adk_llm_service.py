@@ -2,19 +2,43 @@
 
 import os # Retained for os.getenv for fallback check, though primary config is via genai.configure
 import asyncio
+import inspect
+import uuid
+from collections import OrderedDict
 
 # Corrected ADK imports
 from google.adk.agents import LlmAgent
 from google.adk.sessions import InMemorySessionService, Session # Session might be needed for get/create
 from google.adk.runners import Runner
 from google.genai import types as genai_types # For creating content messages
+from .lc_llm_backend import LlmBackend
+from .lc_llm_cassette import LLM_CASSETTE
+from .lc_llm_limiter import LLM_LIMITER
+from .lc_logging import get_logger
 # Attempt to import google.generativeai for programmatic API key configuration
 try:
     import google.generativeai as genai
 except ImportError:
     genai = None # Define genai as None if import fails, to be checked later
 
-class AdkLlmService:
+# Sessions. prompt_llm without a session_id is stateless: the call runs in a fresh session
+# that is deleted afterwards, so no history is carried between calls (the L3 helpers). With
+# a session_id the conversation is kept, but only its last ADK_SESSION_MAX_HISTORY_EVENTS
+# events, and at most ADK_MAX_STATEFUL_SESSIONS such sessions (least recently used evicted).
+ADK_SESSION_MAX_HISTORY_EVENTS = int(os.getenv("LC_ADK_SESSION_MAX_HISTORY_EVENTS", "20"))
+ADK_MAX_STATEFUL_SESSIONS = int(os.getenv("LC_ADK_MAX_STATEFUL_SESSIONS", "256"))
+
+
+_logger = get_logger(__name__)
+
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
+
+
+async def _adk_result(value):
+    """Session service methods are sync in older ADK releases and coroutines in newer ones."""
+    return await value if inspect.isawaitable(value) else value
+
+class AdkLlmService(LlmBackend):
     """A service to interact with LLMs via the Google ADK, using LlmAgent and Runner."""
 
     def __init__(self, model_name: str = "gemini-1.5-flash-001", api_key: str = None): # Modified signature
@@ -32,16 +56,16 @@ class AdkLlmService:
             if genai:
                 try:
                     genai.configure(api_key=api_key)
-                    print(f"AdkLlmService: Programmatically configured google-generativeai with provided API key.")
+                    _logger.info("AdkLlmService: Programmatically configured google-generativeai with provided API key.")
                 except Exception as e:
-                    print(f"ERROR (AdkLlmService): Failed to configure google-generativeai with API key: {e}")
+                    _logger.error("AdkLlmService: Failed to configure google-generativeai with API key: %s", e)
             else:
-                print("ERROR (AdkLlmService): Failed to import google.generativeai. API key not configured programmatically.")
+                _logger.error("AdkLlmService: Failed to import google.generativeai. API key not configured programmatically.")
         else:
-            print("INFO (AdkLlmService): No direct API key provided, relying on environment configuration (e.g., GOOGLE_API_KEY).")
+            _logger.info("AdkLlmService: No direct API key provided, relying on environment configuration (e.g., GOOGLE_API_KEY).")
             # Optional: Check if GOOGLE_API_KEY is set if no direct key provided, for more robust warning
             if not os.getenv("GOOGLE_API_KEY"):
-                print("WARNING (AdkLlmService): No direct API key provided AND GOOGLE_API_KEY environment variable is not set. ADK operations will likely fail.")
+                _logger.warning("AdkLlmService: No direct API key provided AND GOOGLE_API_KEY environment variable is not set. ADK operations will likely fail.")
 
 
         try:
@@ -51,36 +75,74 @@ class AdkLlmService:
                 instruction="You are a helpful AI assistant performing specific text analysis tasks."
             )
             self.session_service = InMemorySessionService()
+            self._stateful_sessions: "OrderedDict[tuple, None]" = OrderedDict() # (user_id, session_id), least recently used first
             self.runner = Runner(
                 agent=self.llm_agent, 
                 app_name="lc_adk_llm_service_app", 
                 session_service=self.session_service
             )
-            print(f"AdkLlmService initialized successfully with model: {self.model_name}")
+            _logger.info("AdkLlmService initialized successfully with model: %s", self.model_name)
         except Exception as e:
-            print(f"Error initializing AdkLlmService components: {e}")
+            _logger.error("Error initializing AdkLlmService components: %s", e)
             self.llm_agent = None
             self.session_service = None
             self.runner = None
             raise ConnectionError(f"Failed to initialize AdkLlmService: {e}") from e
 
 
-    async def prompt_llm(self, prompt_text: str, user_id: str = "adk_service_user", session_id: str = "adk_service_session") -> str:
+    async def _get_or_create_session(self, user_id: str, session_id: str):
+        try:
+            session = await _adk_result(self.session_service.get_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id))
+        except KeyError: # Older ADK releases raise instead of returning None
+            session = None
+        if session is None:
+            session = await _adk_result(self.session_service.create_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id))
+        return session
+
+    async def _delete_session(self, user_id: str, session_id: str):
+        try:
+            await _adk_result(self.session_service.delete_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id))
+        except Exception as e: # Already gone; nothing is leaked
+            log_internal_warning("AdkLlmService._delete_session", {"session_id": session_id, "error": str(e)})
+
+    def _cap_session_history(self, user_id: str, session_id: str):
+        """Keeps the last ADK_SESSION_MAX_HISTORY_EVENTS events of a stored in-memory session."""
+        stored = getattr(self.session_service, "sessions", {}).get(self.runner.app_name, {}).get(user_id, {}).get(session_id)
+        if stored is not None and len(stored.events) > ADK_SESSION_MAX_HISTORY_EVENTS:
+            del stored.events[:len(stored.events) - ADK_SESSION_MAX_HISTORY_EVENTS]
+
+    async def _touch_stateful_session(self, user_id: str, session_id: str):
+        key = (user_id, session_id)
+        self._stateful_sessions[key] = None
+        self._stateful_sessions.move_to_end(key)
+        while len(self._stateful_sessions) > max(1, ADK_MAX_STATEFUL_SESSIONS):
+            evicted_user_id, evicted_session_id = self._stateful_sessions.popitem(last=False)[0]
+            await self._delete_session(evicted_user_id, evicted_session_id)
+
+    async def prompt_llm(self, prompt_text: str, user_id: str = "adk_service_user", session_id: str = None) -> str:
         """
         Sends a prompt to the configured LLM using the ADK Runner and returns the response.
-        (Method body remains unchanged from previous correct version)
+        Without `session_id` the call is stateless (fresh session, deleted afterwards); with one,
+        the session's history is kept, capped to ADK_SESSION_MAX_HISTORY_EVENTS events.
+        Calls are rate limited, concurrency capped and retried on throttling by LLM_LIMITER, and
+        each attempt is recorded to / replayed from LLM_CASSETTE when a cassette mode is set.
         """
         if not self.runner or not self.llm_agent or not self.session_service:
             raise RuntimeError("AdkLlmService is not properly initialized. Runner, LlmAgent, or SessionService is missing.")
+        return await LLM_LIMITER.run(lambda: LLM_CASSETTE.prompt_llm(lambda: self._prompt_once(prompt_text, user_id, session_id), prompt_text, self.model_name),
+                                     prompt_text=prompt_text, label=self.model_name)
 
+    async def _prompt_once(self, prompt_text: str, user_id: str, session_id: str = None) -> str:
         content = genai_types.Content(role="user", parts=[genai_types.Part(text=prompt_text)])
         final_response_text = "Error: No final response from ADK LLM service." 
+        stateless = session_id is None
+        if stateless:
+            session_id = f"adk_ephemeral_{uuid.uuid4().hex}"
 
         try:
-            try:
-                session = self.session_service.get_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id)
-            except KeyError: 
-                session = self.session_service.create_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id)
+            session = await self._get_or_create_session(user_id, session_id)
+            if not stateless:
+                await self._touch_stateful_session(user_id, session_id)
 
             async for event in self.runner.run_async(
                 user_id=session.user_id, session_id=session.id, new_message=content
@@ -91,8 +153,13 @@ class AdkLlmService:
                         break 
             return final_response_text
         except Exception as e:
-            print(f"Error during AdkLlmService prompt execution: {e}")
+            _logger.error("Error during AdkLlmService prompt execution: %s", e)
             raise RuntimeError(f"AdkLlmService call failed: {e}") from e
+        finally:
+            if stateless:
+                await self._delete_session(user_id, session_id)
+            else:
+                self._cap_session_history(user_id, session_id)
 
 # Example usage
 async def main_example():
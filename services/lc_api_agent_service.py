@@ -2,6 +2,7 @@ import os
 import json
 import requests
 from typing import Optional, Dict, Any, List
+from .lc_llm_cassette import LLM_CASSETTE
 
 __all__ = ["execute_api_call"]
 
@@ -52,7 +53,24 @@ def execute_api_call(
 ) -> Dict[str, Any]:
     """
     Executes an API call to a specified endpoint, typically an LLM.
+    Calls are recorded to / replayed from LLM_CASSETTE when a cassette mode is set, keyed by
+    the endpoint, prompt and request options (not the API key).
     """
+    request = {"api_endpoint_url": api_endpoint_url, "prompt_text": prompt_text, "request_payload_template_json": request_payload_template_json,
+               "conversation_history_json": conversation_history_json, "response_extraction_path": response_extraction_path,
+               "request_parameters_json": request_parameters_json}
+    return LLM_CASSETTE.api_call(lambda: _execute_api_call(api_endpoint_url, prompt_text, api_key_env_var, request_payload_template_json,
+                                                           conversation_history_json, response_extraction_path, request_parameters_json), request)
+
+def _execute_api_call(
+    api_endpoint_url: str,
+    prompt_text: str,
+    api_key_env_var: Optional[str],
+    request_payload_template_json: Optional[str],
+    conversation_history_json: Optional[str],
+    response_extraction_path: Optional[str],
+    request_parameters_json: Optional[str]
+) -> Dict[str, Any]:
     api_key: Optional[str] = None
     headers = {"Content-Type": "application/json"}
 
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# The interface the SOPs and agents use to reach an LLM. AdkLlmService (a live model via
+# Google ADK) and StubLlmService (lc_llm_stub.py, deterministic offline responses for load
+# tests) implement it; L3 takes any instance through lc_llm_registry or
+# keymap_click_process(llm_service=...), and CoreADKAgent through its `llm_backend` argument.
+
+
+class LlmBackend(ABC):
+    """An LLM that answers one text prompt at a time."""
+
+    model_name: str = "unknown"
+
+    @abstractmethod
+    async def prompt_llm(self, prompt_text: str, user_id: str = "adk_service_user", session_id: Optional[str] = None) -> str:
+        """
+        Returns the model's text response to `prompt_text`. Without `session_id` the call is
+        stateless. Raises on failure; throttling errors are recognised by
+        lc_llm_limiter.is_throttle_error.
+        """
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+from .lc_logging import get_logger
+
+# Content-addressed cache for validated LLM responses (see _call_llm_for_pydantic_model
+# in sops/sop_l3_keymap_click.py).
+#
+# Keys are a SHA-256 over (prompt text, model name, target model type), so identical
+# requests - retries, duplicate messages, reruns of a trace - are answered without a
+# model round trip. Values are the validated model dumped to JSON-compatible data;
+# callers re-validate them into the target type. Two tiers:
+#   - an in-process LRU bounded by entry count and approximate bytes, and
+#   - an optional SQLite file shared across processes and runs.
+# Entries older than the TTL are treated as misses and dropped. Stats are kept per
+# label (the calling helper) so savings can be measured helper by helper.
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+
+
+def make_cache_key(prompt_text: str, model_name: Optional[str], target_type_name: str) -> str:
+    material = json.dumps([prompt_text, model_name or "", target_type_name], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LlmResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache of validated LLM responses.
+    `enabled=False` turns every get into a miss and every put into a no-op.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key   TEXT PRIMARY KEY,
+            value       TEXT NOT NULL,
+            created_at  REAL NOT NULL,
+            size        INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_llm_response_cache_created ON llm_response_cache (created_at);
+    """
+
+    def __init__(self, enabled: bool = True, max_entries: int = 2048, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600, sqlite_path: Optional[Path] = None, max_disk_entries: int = 100000):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else None
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()  # key -> (json text, created_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # sqlite3 connections must not be shared across threads; keep one per thread.
+        self._local = threading.local()
+        self._disk_writes = 0
+        self.reset_stats()
+
+    @classmethod
+    def from_env(cls) -> "LlmResponseCache":
+        """
+        Builds a cache from LC_LLM_CACHE (1 to enable; off by default),
+        LC_LLM_CACHE_MAX_ENTRIES, LC_LLM_CACHE_MAX_BYTES, LC_LLM_CACHE_TTL_SECONDS
+        (0 = no expiry) and LC_LLM_CACHE_SQLITE_PATH (enables the on-disk tier).
+        """
+        ttl = float(os.getenv("LC_LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        sqlite_path = os.getenv("LC_LLM_CACHE_SQLITE_PATH")
+        return cls(
+            enabled=os.getenv("LC_LLM_CACHE", "0").lower() in ("1", "true", "yes"),
+            max_entries=int(os.getenv("LC_LLM_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(os.getenv("LC_LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl_seconds=ttl if ttl > 0 else None,
+            sqlite_path=Path(sqlite_path) if sqlite_path else None,
+        )
+
+    # --- disk tier -------------------------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.sqlite_path is None:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.sqlite_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT value, created_at FROM llm_response_cache WHERE cache_key = ?", (key,)).fetchone()
+            return (row[0], row[1]) if row else None
+        except sqlite3.Error as e:
+            log_internal_error("LlmResponseCache._disk_get", {"message": f"Disk tier unavailable: {e}"})
+            return None
+
+    def _disk_put(self, key: str, text: str, created_at: float):
+        try:
+            conn = self._connection()
+            if conn is None:
+                return
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO llm_response_cache (cache_key, value, created_at, size) VALUES (?, ?, ?, ?)",
+                             (key, text, created_at, len(text)))
+            self._disk_writes += 1
+            if self._disk_writes % 256 == 0:
+                self._prune_disk(conn)
+        except sqlite3.Error as e:
+            log_internal_error("LlmResponseCache._disk_put", {"message": f"Disk tier unavailable: {e}"})
+
+    def _disk_delete(self, key: str):
+        try:
+            conn = self._connection()
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+        except sqlite3.Error as e:
+            log_internal_error("LlmResponseCache._disk_delete", {"message": f"Disk tier unavailable: {e}"})
+
+    def _prune_disk(self, conn: sqlite3.Connection):
+        with conn:
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM llm_response_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM llm_response_cache WHERE cache_key IN (SELECT cache_key FROM llm_response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,))
+
+    # --- memory tier -----------------------------------------------------
+
+    def _memory_put(self, key: str, text: str, created_at: float):
+        size = len(text)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (text, created_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _count(self, label: Optional[str], stat: str):
+        with self._lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+            if label is not None:
+                per_label = self._by_label.setdefault(label, {"hits": 0, "misses": 0, "stores": 0})
+                per_label[stat] += 1
+
+    # --- public API ------------------------------------------------------
+
+    def get(self, key: str, label: Optional[str] = None) -> Optional[Any]:
+        """Returns the cached JSON value for `key`, or None on a miss (or when disabled)."""
+        if not self.enabled:
+            return None
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    del self._entries[key]
+                    self._bytes -= entry[2]
+                    expired = True
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+        if entry is None:
+            disk_entry = self._disk_get(key)
+            if disk_entry is not None and self._expired(disk_entry[1]):
+                self._disk_delete(key)
+                expired = True
+                disk_entry = None
+            if disk_entry is None:
+                if expired:
+                    with self._lock:
+                        self.expired += 1
+                self._count(label, "misses")
+                return None
+            self._memory_put(key, disk_entry[0], disk_entry[1])
+            with self._lock:
+                self.disk_hits += 1
+            entry = (disk_entry[0], disk_entry[1], len(disk_entry[0]))
+        self._count(label, "hits")
+        return json.loads(entry[0])
+
+    def put(self, key: str, value: Any, label: Optional[str] = None):
+        """Stores a JSON-compatible `value`; only call this with successfully validated responses."""
+        if not self.enabled:
+            return
+        try:
+            text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            log_internal_error("LlmResponseCache.put", {"message": f"Value is not JSON-serializable, not cached: {e}"})
+            return
+        created_at = time.time()
+        self._memory_put(key, text, created_at)
+        self._disk_put(key, text, created_at)
+        self._count(label, "stores")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        try:
+            conn = self._connection()
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM llm_response_cache")
+        except sqlite3.Error as e:
+            log_internal_error("LlmResponseCache.clear", {"message": f"Disk tier unavailable: {e}"})
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.stores = 0
+            self.memory_hits = self.disk_hits = self.expired = self.evictions = 0
+            self._by_label: Dict[str, Dict[str, int]] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "stores": self.stores,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "by_label": {label: dict(counts) for label, counts in self._by_label.items()},
+            }
+
+
+# Shared instance used by the SOPs' LLM helpers.
+LLM_RESPONSE_CACHE = LlmResponseCache.from_env()
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/store counters of the shared LLM response cache, overall and per calling helper."""
+    return LLM_RESPONSE_CACHE.stats()
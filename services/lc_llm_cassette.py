@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+from .lc_logging import get_logger
+
+# Record/replay of LLM traffic (AdkLlmService.prompt_llm and execute_api_call).
+#
+# In 'record' mode every model call is appended to a JSONL cassette as
+#   {"kind", "key", "model", "request", "response", "error", "latency_ms", "recorded_at"}
+# where `key` is a SHA-256 over the kind and the request (the prompt text for prompt_llm;
+# endpoint, prompt and request options for execute_api_call - never the API key). Failed
+# calls are recorded with their error, so throttling replays as throttling.
+# In 'replay' mode calls are answered from the cassette without touching the network: each
+# key serves its recordings in recorded order (the last one repeats once they run out), and
+# with `replay_latency` the recorded latency (times `latency_scale`) is slept first. A prompt
+# that is not in the cassette counts as a miss: prompt_llm raises LookupError and
+# execute_api_call returns an error result.
+#
+# The hook sits under LLM_LIMITER in AdkLlmService, so a replayed slice still goes through
+# the concurrency cap and retries of the build being measured. Stateful sessions are keyed by
+# the prompt alone; their history is not part of the key.
+# Configure with LC_LLM_CASSETTE_MODE (off / record / replay), LC_LLM_CASSETTE_PATH,
+# LC_LLM_CASSETTE_REPLAY_LATENCY and LC_LLM_CASSETTE_LATENCY_SCALE, or LLM_CASSETTE.configure().
+
+CASSETTE_MODE_OFF = "off"
+CASSETTE_MODE_RECORD = "record"
+CASSETTE_MODE_REPLAY = "replay"
+CASSETTE_MODES = [CASSETTE_MODE_OFF, CASSETTE_MODE_RECORD, CASSETTE_MODE_REPLAY]
+
+CASSETTE_KIND_PROMPT = "prompt_llm"
+CASSETTE_KIND_API_CALL = "api_call"
+
+
+_logger = get_logger(__name__)
+
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
+
+
+def cassette_key(kind: str, request: Any) -> str:
+    material = json.dumps([kind, request], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _error_text(error: BaseException) -> str:
+    """The error and its __cause__ chain, so replayed errors are classified like the originals."""
+    parts = []
+    while error is not None:
+        parts.append(f"{type(error).__name__}: {error}")
+        error = error.__cause__
+    return " <- ".join(parts)
+
+
+class LlmCassette:
+    """JSONL recorder / replayer for LLM calls. Thread-safe; mode 'off' passes calls straight through."""
+
+    def __init__(self, mode: str = CASSETTE_MODE_OFF, path: Optional[Path] = None, replay_latency: bool = False, latency_scale: float = 1.0):
+        self._lock = threading.Lock()
+        self._file = None
+        self.configure(mode, path, replay_latency, latency_scale)
+
+    @classmethod
+    def from_env(cls) -> "LlmCassette":
+        return cls(
+            mode=os.getenv("LC_LLM_CASSETTE_MODE", CASSETTE_MODE_OFF).lower(),
+            path=os.getenv("LC_LLM_CASSETTE_PATH") or None,
+            replay_latency=os.getenv("LC_LLM_CASSETTE_REPLAY_LATENCY", "0").lower() in ("1", "true", "yes"),
+            latency_scale=float(os.getenv("LC_LLM_CASSETTE_LATENCY_SCALE", "1")),
+        )
+
+    def configure(self, mode: str, path: Optional[Path] = None, replay_latency: bool = False, latency_scale: float = 1.0):
+        """Switches mode and cassette file. Recording appends to `path`; replay loads it now."""
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Cassette mode must be one of {CASSETTE_MODES}, got {mode!r}")
+        if mode != CASSETTE_MODE_OFF and not path:
+            raise ValueError(f"Cassette mode '{mode}' needs a cassette path")
+        entries = self._load(Path(path)) if mode == CASSETTE_MODE_REPLAY else {}
+        with self._lock:
+            self._close_locked()
+            self.mode = mode
+            self.path = Path(path) if path else None
+            self.replay_latency = replay_latency
+            self.latency_scale = latency_scale
+            self._entries: Dict[str, List[Dict[str, Any]]] = entries
+            self._positions: Dict[str, int] = {}
+            self._counts = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, List[Dict[str, Any]]]:
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        with open(path, encoding="utf-8") as cassette_file:
+            for line_number, line in enumerate(cassette_file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entries.setdefault(entry["key"], []).append(entry)
+                except (json.JSONDecodeError, KeyError, TypeError) as e: # e.g. a line cut short when recording was killed
+                    log_internal_warning("LlmCassette._load", {"path": str(path), "line": line_number, "error": str(e)})
+        return entries
+
+    # --- record ------------------------------------------------------------
+
+    def _record(self, kind: str, key: str, model: Optional[str], request: Any, response: Any, error: Optional[str], latency_ms: float):
+        entry = {"kind": kind, "key": key, "model": model, "request": request, "response": response, "error": error,
+                 "latency_ms": round(latency_ms, 3), "recorded_at": datetime.now(timezone.utc).isoformat()}
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._counts["recorded"] += 1
+
+    # --- replay ------------------------------------------------------------
+
+    def _next_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                self._counts["misses"] += 1
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self._counts["replayed"] += 1
+            return recordings[min(position, len(recordings) - 1)]
+
+    def _replay_delay_seconds(self, entry: Dict[str, Any]) -> float:
+        return max(0.0, entry.get("latency_ms") or 0.0) * self.latency_scale / 1000 if self.replay_latency else 0.0
+
+    # --- calls -------------------------------------------------------------
+
+    async def prompt_llm(self, call: Callable[[], Awaitable[str]], prompt_text: str, model_name: Optional[str] = None) -> str:
+        """Runs `call()` (record / off) or answers `prompt_text` from the cassette (replay)."""
+        if self.mode == CASSETTE_MODE_OFF:
+            return await call()
+        key = cassette_key(CASSETTE_KIND_PROMPT, prompt_text)
+        if self.mode == CASSETTE_MODE_REPLAY:
+            entry = self._next_entry(key)
+            if entry is None:
+                raise LookupError(f"No cassette entry for this prompt (key {key[:12]}) in {self.path}")
+            delay = self._replay_delay_seconds(entry)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if entry.get("error"):
+                raise RuntimeError(entry["error"])
+            return entry["response"]
+        start = time.perf_counter()
+        try:
+            response = await call()
+        except Exception as e:
+            self._record(CASSETTE_KIND_PROMPT, key, model_name, prompt_text, None, _error_text(e), (time.perf_counter() - start) * 1000)
+            raise
+        self._record(CASSETTE_KIND_PROMPT, key, model_name, prompt_text, response, None, (time.perf_counter() - start) * 1000)
+        return response
+
+    def api_call(self, call: Callable[[], Dict[str, Any]], request: Dict[str, Any]) -> Dict[str, Any]:
+        """Synchronous counterpart for execute_api_call; `request` identifies the call (no secrets)."""
+        if self.mode == CASSETTE_MODE_OFF:
+            return call()
+        key = cassette_key(CASSETTE_KIND_API_CALL, request)
+        if self.mode == CASSETTE_MODE_REPLAY:
+            entry = self._next_entry(key)
+            if entry is None:
+                return {"status": f"Error: No cassette entry for this request (key {key[:12]}) in {self.path}",
+                        "agent_response_text": None, "full_response_json": None, "http_status_code": None}
+            delay = self._replay_delay_seconds(entry)
+            if delay > 0:
+                time.sleep(delay)
+            return entry["response"]
+        start = time.perf_counter()
+        result = call() # Reports failures in its result instead of raising
+        self._record(CASSETTE_KIND_API_CALL, key, request.get("api_endpoint_url"), request, result, None, (time.perf_counter() - start) * 1000)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "path": str(self.path) if self.path else None, **self._counts}
+
+
+# Shared by AdkLlmService and execute_api_call.
+LLM_CASSETTE = LlmCassette.from_env()
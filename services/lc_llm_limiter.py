@@ -0,0 +1,252 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable
+from .lc_logging import get_logger
+
+# Process-wide admission control for LLM calls (see AdkLlmService.prompt_llm).
+#
+# Every call goes through LLM_LIMITER.run(), which
+#   - waits for a requests/min and a tokens/min token bucket (token counts are estimated
+#     from text length; the response is charged after the fact),
+#   - waits for a slot under an AIMD concurrency cap: the cap grows by ~1 per cap's worth
+#     of successful calls and is halved (at most once per cooldown) when the provider
+#     throttles, and
+#   - retries throttled calls (429 / RESOURCE_EXHAUSTED / rate limit / quota) with full-jitter
+#     exponential backoff; other errors are raised straight away.
+# The limiter is not tied to an event loop, so it can be shared by callers running under
+# different loops and threads. stats() reports in-flight calls and queue depth.
+
+
+_logger = get_logger(__name__)
+
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
+
+
+_THROTTLE_PATTERN = re.compile(r"\b429\b|resource[_ ]exhausted|rate[ -]?limit|quota|too many requests|throttl", re.IGNORECASE)
+
+def is_throttle_error(error: BaseException) -> bool:
+    """True for provider throttling, also when wrapped (checks the message and the __cause__ chain)."""
+    while error is not None:
+        if _THROTTLE_PATTERN.search(f"{type(error).__name__}: {error}"):
+            return True
+        error = error.__cause__
+    return False
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return max(1, len(text or "") // 4) # ~4 characters per token
+
+
+class TokenBucket:
+    """
+    `rate_per_minute` units per minute, bursting up to `capacity` (default: one minute's worth).
+    Reservations may take the level negative; the caller then sleeps until it is paid back,
+    so waiters are served in arrival order without a queue. A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` (clamped to the capacity) and returns how many seconds to wait for it."""
+        if self.rate_per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_minute / 60)
+            self._updated = now
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level * 60 / self.rate_per_minute)
+
+    def refund(self, amount: float):
+        if self.rate_per_minute > 0:
+            with self._lock:
+                self._level = min(self.capacity, self._level + min(amount, self.capacity))
+
+    def charge(self, amount: float):
+        """Takes `amount` without waiting (e.g. response tokens, known only afterwards)."""
+        self.reserve(amount)
+
+
+class LlmRateLimiter:
+    """Token buckets + AIMD concurrency cap + retry with jittered backoff, shared by all LLM calls."""
+
+    def __init__(self, enabled: bool = True, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 initial_concurrency: int = 8, min_concurrency: int = 1, max_concurrency: int = 64,
+                 max_retries: int = 4, backoff_base_seconds: float = 0.5, backoff_max_seconds: float = 30.0,
+                 decrease_factor: float = 0.5, decrease_cooldown_seconds: float = 1.0):
+        self.enabled = enabled
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._limit = float(min(self.max_concurrency, max(self.min_concurrency, initial_concurrency)))
+        self._lock = threading.Lock()
+        self._waiters: "deque" = deque() # (loop, future) waiting for a concurrency slot
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._queued = 0
+        self.reset_stats()
+
+    @classmethod
+    def from_env(cls) -> "LlmRateLimiter":
+        """
+        Builds a limiter from LC_LLM_LIMITER (0 to disable; on by default),
+        LC_LLM_REQUESTS_PER_MINUTE and LC_LLM_TOKENS_PER_MINUTE (0 = unlimited),
+        LC_LLM_CONCURRENCY_INITIAL / _MIN / _MAX, LC_LLM_MAX_RETRIES,
+        LC_LLM_BACKOFF_BASE_SECONDS and LC_LLM_BACKOFF_MAX_SECONDS.
+        """
+        return cls(
+            enabled=os.getenv("LC_LLM_LIMITER", "1").lower() in ("1", "true", "yes"),
+            requests_per_minute=float(os.getenv("LC_LLM_REQUESTS_PER_MINUTE", "0")),
+            tokens_per_minute=float(os.getenv("LC_LLM_TOKENS_PER_MINUTE", "0")),
+            initial_concurrency=int(os.getenv("LC_LLM_CONCURRENCY_INITIAL", "8")),
+            min_concurrency=int(os.getenv("LC_LLM_CONCURRENCY_MIN", "1")),
+            max_concurrency=int(os.getenv("LC_LLM_CONCURRENCY_MAX", "64")),
+            max_retries=int(os.getenv("LC_LLM_MAX_RETRIES", "4")),
+            backoff_base_seconds=float(os.getenv("LC_LLM_BACKOFF_BASE_SECONDS", "0.5")),
+            backoff_max_seconds=float(os.getenv("LC_LLM_BACKOFF_MAX_SECONDS", "30")),
+        )
+
+    # --- concurrency slots ----------------------------------------------
+
+    def _grant_waiters_locked(self):
+        while self._waiters and self._in_flight < int(self._limit):
+            loop, future = self._waiters.popleft()
+            if future.done(): # Cancelled while queued
+                continue
+            self._in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._deliver_slot, future)
+            except RuntimeError: # Its loop is closed
+                self._in_flight -= 1
+
+    def _deliver_slot(self, future: asyncio.Future):
+        if future.cancelled():
+            self._release_slot()
+        else:
+            future.set_result(None)
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiters_locked()
+
+    async def _acquire_slot(self):
+        with self._lock:
+            if self._in_flight < int(self._limit) and not self._waiters:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future # The slot is counted for us when the future is resolved
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                elif future.done() and not future.cancelled(): # Granted just before the cancel
+                    self._in_flight -= 1
+                    self._grant_waiters_locked()
+            raise
+
+    def _on_success(self):
+        with self._lock:
+            self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            self._grant_waiters_locked()
+
+    def _on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown_seconds: # One decrease per burst of 429s
+                self._limit = max(self.min_concurrency, self._limit * self.decrease_factor)
+                self._last_decrease = now
+            self._counts["throttled"] += 1
+
+    def backoff_seconds(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    # --- calls -----------------------------------------------------------
+
+    async def run(self, call: Callable[[], Awaitable[str]], prompt_text: Optional[str] = None, label: str = "llm") -> str:
+        """Runs `call()` (a fresh coroutine per attempt) under the limits; returns its text response."""
+        if not self.enabled:
+            return await call()
+        prompt_tokens = estimate_tokens(prompt_text)
+        attempt = 0
+        while True:
+            with self._lock:
+                self._queued += 1
+            try:
+                wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(prompt_tokens))
+                try:
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    await self._acquire_slot()
+                except asyncio.CancelledError:
+                    self.request_bucket.refund(1)
+                    self.token_bucket.refund(prompt_tokens)
+                    raise
+            finally:
+                with self._lock:
+                    self._queued -= 1
+            try:
+                with self._lock:
+                    self._counts["calls"] += 1
+                response = await call()
+            except Exception as e:
+                if not is_throttle_error(e):
+                    with self._lock:
+                        self._counts["failures"] += 1
+                    raise
+                self._on_throttle()
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self._counts["failures"] += 1
+                    raise
+                delay = self.backoff_seconds(attempt)
+                log_internal_warning("LlmRateLimiter.run", {"label": label, "attempt": attempt + 1, "retry_in_seconds": round(delay, 3), "error": str(e)})
+                with self._lock:
+                    self._counts["retries"] += 1
+            else:
+                self.token_bucket.charge(estimate_tokens(response if isinstance(response, str) else None))
+                self._on_success()
+                return response
+            finally:
+                self._release_slot()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    # --- stats -----------------------------------------------------------
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, "concurrency_limit": round(self._limit, 3), "in_flight": self._in_flight,
+                    "queue_depth": self._queued, **self._counts}
+
+
+# Shared by every AdkLlmService in the process.
+LLM_LIMITER = LlmRateLimiter.from_env()
+
+def get_llm_limiter_stats() -> Dict[str, Any]:
+    """Concurrency cap, in-flight calls, queue depth and call/retry/throttle counters of the shared limiter."""
+    return LLM_LIMITER.stats()
@@ -0,0 +1,84 @@
+import os
+import threading
+from typing import Any, Callable, Optional
+from .lc_logging import get_logger
+
+# Process-wide LLM service, created on first use rather than at import time.
+#
+# Building an AdkLlmService creates an ADK LlmAgent, Runner and session service, and
+# importing it pulls in google.adk; processes that only run L1/L2 (or use a stub) should pay
+# for neither. get_llm_service() builds the service with the registered factory the first
+# time it is asked for and hands the same instance to every later caller. A failed build
+# is remembered (None is returned) until set_llm_service_factory() or reset_llm_service().
+# Per-run services (a pool, a stub) are injected with keymap_click_process(llm_service=...)
+# instead of replacing the process-wide one.
+#
+# LC_LLM_BACKEND selects what the default factory builds: "adk" (default, AdkLlmService) or
+# "stub" (StubLlmService.from_env(), deterministic offline responses for load tests).
+
+LLM_BACKEND_ADK = "adk"
+LLM_BACKEND_STUB = "stub"
+LLM_BACKENDS = [LLM_BACKEND_ADK, LLM_BACKEND_STUB]
+LLM_BACKEND = os.getenv("LC_LLM_BACKEND", LLM_BACKEND_ADK).lower()
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+
+
+def _default_llm_service_factory() -> Any:
+    if LLM_BACKEND == LLM_BACKEND_STUB:
+        from .lc_llm_stub import StubLlmService
+        return StubLlmService.from_env()
+    if LLM_BACKEND != LLM_BACKEND_ADK:
+        raise ValueError(f"LC_LLM_BACKEND must be one of {LLM_BACKENDS}, got {LLM_BACKEND!r}")
+    from .adk_llm_service import AdkLlmService # Deferred: importing it loads google.adk
+    return AdkLlmService()
+
+
+_lock = threading.Lock()
+_factory: Callable[[], Any] = _default_llm_service_factory
+_service: Optional[Any] = None
+_resolved = False
+
+
+def get_llm_service() -> Optional[Any]:
+    """The shared LLM service (an LlmBackend, or anything with `async prompt_llm(prompt_text) -> str`), or None if it cannot be built."""
+    global _service, _resolved
+    if _resolved:
+        return _service
+    with _lock:
+        if not _resolved:
+            try:
+                _service = _factory()
+            except Exception as e:
+                log_internal_error("get_llm_service", {"message": f"Failed to initialize the LLM service: {e}"})
+                _service = None
+            _resolved = True
+        return _service
+
+
+def set_llm_service(service: Optional[Any]) -> Optional[Any]:
+    """Installs `service` as the shared instance (None = no LLM). Returns the previous one, if it was built."""
+    global _service, _resolved
+    with _lock:
+        previous = _service
+        _service, _resolved = service, True
+        return previous
+
+
+def set_llm_service_factory(factory: Callable[[], Any]):
+    """Builds the shared service with `factory` from the next get_llm_service() on."""
+    global _factory, _service, _resolved
+    with _lock:
+        _factory, _service, _resolved = factory, None, False
+
+
+def reset_llm_service():
+    """Drops the shared instance and restores the default (LC_LLM_BACKEND) factory."""
+    set_llm_service_factory(_default_llm_service_factory)
+
+
+def is_llm_service_created() -> bool:
+    return _resolved and _service is not None
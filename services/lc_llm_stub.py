@@ -0,0 +1,340 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from ..sops import sop_l3_local_extractors as local
+from .lc_llm_backend import LlmBackend
+from .lc_llm_limiter import LLM_LIMITER, estimate_tokens
+
+# Deterministic offline LLM backend for load tests and benchmarks (no model, no network).
+#
+# StubLlmService recognises the L3 keymap prompts (each per-helper prompt and the
+# consolidated one) and answers with JSON that validates against the mada_schema target
+# (LexicalAffordances, SyntacticHints, StatisticalProperties, L3Flags, ...). Values are
+# derived from the text under analysis with the local extractors plus a few word lists, so
+# the keymap is not empty, and the same prompt always gets the same answer. Any other
+# prompt gets a short deterministic text reply.
+#
+# To make the runs look like a provider, each call can also
+#   - wait for a latency drawn from a fixed, uniform or lognormal distribution (plus a cost
+#     per output token),
+#   - fail with a 429 RESOURCE_EXHAUSTED at `throttle_rate`, or whenever more than
+#     `max_concurrent` calls are in flight, like a provider-side concurrency quota,
+#   - fail with a 503 at `error_rate`, or
+#   - return a malformed response at `malformed_rate`: truncated JSON, JSON wrapped in prose,
+#     or the right JSON in the wrong container (a list instead of an object).
+# Faults and latencies come from one stream seeded with `seed`, so a sequential run replays
+# exactly. Calls go through LLM_LIMITER like AdkLlmService's, so throttling exercises the
+# same retry and AIMD paths. Select it with LC_LLM_BACKEND=stub (see lc_llm_registry).
+
+STUB_LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "lognormal"]
+STUB_MALFORMED_KINDS = ["truncated", "prose", "wrong_type"]
+STUB_MODEL_NAME = "lc-stub-llm"
+
+_STOPWORDS = {
+    "that", "this", "with", "from", "have", "been", "were", "they", "them", "their", "there", "what", "when", "where",
+    "which", "will", "would", "could", "should", "about", "into", "your", "just", "than", "then", "also", "some", "very",
+}
+_POSITIVE_WORDS = {"good", "great", "thanks", "thank", "love", "excellent", "happy", "glad", "nice", "appreciate", "perfect", "works"}
+_NEGATIVE_WORDS = {"bad", "wrong", "error", "fail", "failed", "broken", "issue", "problem", "angry", "unhappy", "hate", "late", "slow"}
+_POLITENESS_TERMS = ["please", "thank you", "thanks", "kindly", "would you", "could you"]
+_URGENCY_TERMS = ["urgent", "urgently", "asap", "immediately", "right away", "critical", "deadline"]
+_METADATA_LINE_RE = re.compile(r"^\s*([A-Z][\w -]{0,30}):[ \t]+(\S.*)$", re.MULTILINE)
+_CAPITALIZED_RE = re.compile(r"\b[A-Z][a-z]+(?:[ \t]+[A-Z][a-z]+)*")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+_CONTENT_RE = re.compile(r"\n---\n(.*)\n---\s*$", re.DOTALL)
+
+
+def _stub_confidence(rng: random.Random, low: float = 0.6, high: float = 0.95) -> float:
+    return round(rng.uniform(low, high), 2)
+
+def _stub_dump(models: List[Any]) -> List[Dict[str, Any]]:
+    return [model.model_dump(mode="json", exclude_none=True) for model in models]
+
+def _stub_find_terms(lower_text: str, terms: List[str]) -> List[str]:
+    return [term for term in terms if re.search(rf"\b{re.escape(term)}\b", lower_text)]
+
+def _stub_affect(text: str):
+    words = [word.lower() for word in local.tokenize_words(text)]
+    return [w for w in words if w in _POSITIVE_WORDS], [w for w in words if w in _NEGATIVE_WORDS]
+
+def _stub_entities(text: str) -> List[Any]:
+    """Capitalised runs that do not start a sentence or line: (mention, start, end)."""
+    entities, seen = [], set()
+    for match in _CAPITALIZED_RE.finditer(text):
+        before = text[:match.start()].rstrip(" \t")
+        if not before or before[-1] in ".!?:\n" or match.group(0) in seen:
+            continue
+        seen.add(match.group(0))
+        entities.append((match.group(0), match.start(), match.end()))
+    return entities
+
+
+def _stub_detected_languages(text: str, rng: random.Random) -> List[Dict[str, Any]]:
+    ascii_share = sum(ch.isascii() for ch in text) / max(1, len(text))
+    return [{"language_code": "en" if ascii_share > 0.9 else "und", "confidence": _stub_confidence(rng, 0.8, 0.99)}]
+
+def _stub_explicit_metadata(text: str, rng: random.Random) -> List[Dict[str, Any]]:
+    return [{"key": key.strip(), "value": value.strip(), "confidence": _stub_confidence(rng, 0.8, 0.99)}
+            for key, value in _METADATA_LINE_RE.findall(text)[:10]]
+
+def _stub_structure_markers(text: str, rng: random.Random) -> List[str]:
+    return local.local_structure_markers(text)
+
+def _stub_lexical_affordances(text: str, rng: random.Random) -> Dict[str, Any]:
+    counts = Counter(word.lower() for word in local.tokenize_words(text)
+                     if len(word) > 3 and not word.isdigit() and word.lower() not in _STOPWORDS)
+    return {
+        "keyword_mentions": [{"term": term, "confidence": _stub_confidence(rng)} for term, _ in counts.most_common(5)],
+        "entity_mentions_raw": [{"mention": mention, "confidence": _stub_confidence(rng), "start_offset": start, "end_offset": end,
+                                 "possible_types": [rng.choice(["person", "organization", "location", "product"])]}
+                                for mention, start, end in _stub_entities(text)[:5]],
+        "numerical_quantity_mentions": _stub_dump(local.local_numerical_quantities(text)),
+        "temporal_expression_mentions": _stub_dump(local.local_temporal_expressions(text)),
+        "quantifier_qualifier_mentions": _stub_dump(local.local_quantifier_qualifiers(text)),
+        "negation_markers": _stub_dump(local.local_negation_markers(text)),
+    }
+
+def _stub_syntactic_hints(text: str, rng: random.Random) -> Dict[str, Any]:
+    sentences = [sentence.strip() for sentence in _SENTENCE_RE.findall(text) if sentence.strip()]
+    words = local.tokenize_words(text)
+    sentence_initial_caps = sum(1 for sentence in sentences if sentence[0].isupper())
+    return {
+        "sentence_type_distribution": {
+            "declarative": sum(1 for s in sentences if not s.endswith(("?", "!"))),
+            "interrogative": sum(1 for s in sentences if s.endswith("?")),
+            "exclamatory": sum(1 for s in sentences if s.endswith("!")),
+            "imperative": 0,
+            "other": 0,
+        },
+        "pos_tagging_candidate_flag": len(words) >= 3,
+        "punctuation_analysis": {
+            "period_count": text.count("."), "question_mark_count": text.count("?"), "exclamation_mark_count": text.count("!"),
+            "comma_count": text.count(","), "quote_count": text.count('"') + text.count("'"),
+            "other_punctuation_count": sum(text.count(ch) for ch in ";:()-"),
+        },
+        "capitalization_analysis": {
+            "all_caps_word_count": sum(1 for word in words if len(word) > 1 and word.isupper()),
+            "sentence_initial_caps_count": sentence_initial_caps,
+            "proper_noun_candidate_caps_count": len(_stub_entities(text)),
+        },
+        "emoji_mentions": _stub_dump(local.local_emoji_mentions(text)),
+    }
+
+def _stub_pragmatic_affective_affordances(text: str, rng: random.Random) -> Dict[str, Any]:
+    lower_text = text.lower()
+    positive, negative = _stub_affect(text)
+    polarity = "mixed" if positive and negative else "pos" if positive else "neg" if negative else "neu"
+    politeness = _stub_find_terms(lower_text, _POLITENESS_TERMS)
+    urgency = _stub_find_terms(lower_text, _URGENCY_TERMS)
+    informal = "!" in text or re.search(r"\w['’](?:t|s|re|ll|ve|m)\b", text) or local.local_emoji_mentions(text)
+    actors = []
+    if re.search(r"\b(?:I|me|my|we|our)\b", text):
+        actors.append({"role": "speaker", "mention": "I", "confidence": _stub_confidence(rng)})
+    if re.search(r"\byou(?:r)?\b", lower_text):
+        actors.append({"role": "recipient", "mention": "you", "confidence": _stub_confidence(rng)})
+    return {
+        "formality_hint": {"score": round((0.3 if informal else 0.7) + rng.uniform(-0.1, 0.1), 2), "confidence": _stub_confidence(rng)},
+        "sentiment_hint": {"polarity": polarity, "score": round((len(positive) - len(negative)) / max(1, len(positive) + len(negative)), 2),
+                           "confidence": _stub_confidence(rng), "contributing_markers": sorted(set(positive + negative))},
+        "politeness_markers": {"detected_terms": politeness, "score_hint": round(min(1.0, 0.4 + 0.2 * len(politeness)), 2)},
+        "urgency_markers": {"detected_terms": urgency, "level_hint": "high" if len(urgency) > 1 else "medium" if urgency else "low"},
+        "power_dynamic_markers": {"detected_cues": [{"cue": mention.term, "type": "hedging", "confidence": 0.6}
+                                                    for mention in local.local_quantifier_qualifiers(text) if mention.type.value == "qualifier"]},
+        "interaction_pattern_affordance": {"primary_type": "question-answer" if "?" in text else "request-acknowledge" if politeness else "statement-elaboration",
+                                           "confidence": _stub_confidence(rng)},
+        "shallow_goal_intent_affordance": {"primary_type": "clarify" if "?" in text else "request_action" if politeness or urgency else "inform",
+                                           "confidence": _stub_confidence(rng)},
+        "actor_role_hint": {"detected_actors": actors},
+    }
+
+def _stub_relational_linking_markers(text: str, rng: random.Random) -> Dict[str, Any]:
+    return local.local_relational_linking(text).model_dump(mode="json", exclude_none=True)
+
+def _stub_statistical_properties(text: str, rng: random.Random) -> Dict[str, Any]:
+    return local.local_statistics(text).model_dump(mode="json", exclude_none=True)
+
+def _stub_l3_flags(text: str, rng: random.Random) -> Dict[str, Any]:
+    positive, negative = _stub_affect(text)
+    return {
+        "internal_contradiction_hint": {"detected": False},
+        "mixed_affect_signal": {"detected": bool(positive and negative),
+                                "description": "Positive and negative terms in the same text." if positive and negative else None},
+        "multivalent_cue_detected": {"detected": False},
+        "low_confidence_overall_flag": {"detected": False},
+        "gricean_violation_hints": {"detected": []},
+    }
+
+
+# Keymap sections, in the order of the consolidated prompt.
+_STUB_KEYMAP_SECTIONS: Dict[str, Callable[[str, random.Random], Any]] = {
+    "detected_languages": _stub_detected_languages,
+    "explicit_metadata": _stub_explicit_metadata,
+    "content_structure_markers": _stub_structure_markers,
+    "lexical_affordances": _stub_lexical_affordances,
+    "syntactic_hints": _stub_syntactic_hints,
+    "pragmatic_affective_affordances": _stub_pragmatic_affective_affordances,
+    "relational_linking_markers": _stub_relational_linking_markers,
+    "statistical_properties": _stub_statistical_properties,
+}
+
+def _stub_keymap(text: str, rng: random.Random) -> Dict[str, Any]:
+    return {section: build(text, rng) for section, build in _STUB_KEYMAP_SECTIONS.items()}
+
+# (target, marker in the prompt's instructions, builder). Checked in order: the consolidated
+# prompt mentions every per-helper key, so it goes first. The list-valued helpers answer
+# with a one-key object, like their prompts ask for.
+_STUB_TARGETS = [
+    ("keymap", "complete L3 surface keymap", _stub_keymap),
+    ("detected_languages", '"detected_languages":', lambda text, rng: {"detected_languages": _stub_detected_languages(text, rng)}),
+    ("explicit_metadata", '"explicit_metadata":', lambda text, rng: {"explicit_metadata": _stub_explicit_metadata(text, rng)}),
+    ("content_structure_markers", '"content_structure_markers":', lambda text, rng: {"content_structure_markers": _stub_structure_markers(text, rng)}),
+    ("lexical_affordances", "extract lexical affordances", _stub_lexical_affordances),
+    ("syntactic_hints", "for syntactic hints", _stub_syntactic_hints),
+    ("pragmatic_affective_affordances", "PragmaticAffectiveAffordances", _stub_pragmatic_affective_affordances),
+    ("relational_linking_markers", "RelationalLinkingMarkers", _stub_relational_linking_markers),
+    ("statistical_properties", "StatisticalProperties", _stub_statistical_properties),
+    ("l3_flags", "L3Flags", _stub_l3_flags),
+]
+
+
+def stub_target_for_prompt(prompt_text: str) -> Optional[str]:
+    """The L3 target a prompt asks for ("lexical_affordances", "keymap", ...), or None for any other prompt."""
+    instructions = prompt_text.split("\n---\n", 1)[0] # Ignore the text under analysis
+    for target, marker, _ in _STUB_TARGETS:
+        if marker in instructions:
+            return target
+    return None
+
+def stub_response_for_prompt(prompt_text: str, seed: int = 0) -> str:
+    """The stub's well-formed answer to `prompt_text`; the same prompt and seed always give the same text."""
+    digest = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+    rng = random.Random(f"{seed}:{digest}")
+    target = stub_target_for_prompt(prompt_text)
+    if target is None:
+        return f"Stub response to a {len(local.tokenize_words(prompt_text))}-word prompt ({digest[:12]})."
+    content_match = _CONTENT_RE.search(prompt_text)
+    text = content_match.group(1) if content_match else ""
+    build = next(build for name, _, build in _STUB_TARGETS if name == target)
+    return json.dumps(build(text, rng), ensure_ascii=False)
+
+def stub_malform_response(response: str, kind: str) -> str:
+    if kind == "truncated":
+        return response[:max(1, len(response) // 2)]
+    if kind == "prose":
+        return "Sure, here is the analysis you asked for:\n" + response
+    if kind == "wrong_type":
+        try:
+            return json.dumps([json.loads(response)], ensure_ascii=False)
+        except json.JSONDecodeError: # Plain-text reply; there is no container to get wrong
+            return response[:max(1, len(response) // 2)]
+    raise ValueError(f"Unknown malformed response kind: {kind}")
+
+
+class StubLlmService(LlmBackend):
+    """Offline LlmBackend with schema-valid L3 answers and simulated latency, throttling and malformed responses."""
+
+    def __init__(self, seed: int = 0, latency_ms: float = 0.0, latency_distribution: str = "lognormal", latency_spread: float = 0.5,
+                 ms_per_output_token: float = 0.0, throttle_rate: float = 0.0, error_rate: float = 0.0, malformed_rate: float = 0.0,
+                 max_concurrent: int = 0, use_limiter: bool = True, model_name: str = STUB_MODEL_NAME):
+        """
+        `latency_ms` is the fixed value, the uniform mean (+/- `latency_spread` as a fraction) or the
+        lognormal median (sigma `latency_spread`). `max_concurrent` > 0 throttles calls above that
+        many in flight. `use_limiter` routes calls through LLM_LIMITER, like AdkLlmService.
+        """
+        if latency_distribution not in STUB_LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {STUB_LATENCY_DISTRIBUTIONS}, got {latency_distribution!r}")
+        self.model_name = model_name
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_spread = latency_spread
+        self.ms_per_output_token = ms_per_output_token
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.max_concurrent = max_concurrent
+        self.use_limiter = use_limiter
+        self._rng = random.Random(seed) # Faults and latencies, drawn in call order
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.reset_stats()
+
+    @classmethod
+    def from_env(cls) -> "StubLlmService":
+        """
+        Builds a stub from LC_LLM_STUB_SEED, LC_LLM_STUB_LATENCY_MS, LC_LLM_STUB_LATENCY_DISTRIBUTION,
+        LC_LLM_STUB_LATENCY_SPREAD, LC_LLM_STUB_MS_PER_OUTPUT_TOKEN, LC_LLM_STUB_THROTTLE_RATE,
+        LC_LLM_STUB_ERROR_RATE, LC_LLM_STUB_MALFORMED_RATE and LC_LLM_STUB_MAX_CONCURRENT.
+        """
+        return cls(
+            seed=int(os.getenv("LC_LLM_STUB_SEED", "0")),
+            latency_ms=float(os.getenv("LC_LLM_STUB_LATENCY_MS", "0")),
+            latency_distribution=os.getenv("LC_LLM_STUB_LATENCY_DISTRIBUTION", "lognormal"),
+            latency_spread=float(os.getenv("LC_LLM_STUB_LATENCY_SPREAD", "0.5")),
+            ms_per_output_token=float(os.getenv("LC_LLM_STUB_MS_PER_OUTPUT_TOKEN", "0")),
+            throttle_rate=float(os.getenv("LC_LLM_STUB_THROTTLE_RATE", "0")),
+            error_rate=float(os.getenv("LC_LLM_STUB_ERROR_RATE", "0")),
+            malformed_rate=float(os.getenv("LC_LLM_STUB_MALFORMED_RATE", "0")),
+            max_concurrent=int(os.getenv("LC_LLM_STUB_MAX_CONCURRENT", "0")),
+        )
+
+    def _sample_latency_ms(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return max(0.0, self._rng.uniform(self.latency_ms * (1 - self.latency_spread), self.latency_ms * (1 + self.latency_spread)))
+        if self.latency_distribution == "lognormal":
+            return self.latency_ms * self._rng.lognormvariate(0, self.latency_spread)
+        return self.latency_ms
+
+    async def prompt_llm(self, prompt_text: str, user_id: str = "adk_service_user", session_id: Optional[str] = None) -> str:
+        """Answers like a model would (the stub keeps no session state). Raises on simulated throttling and errors."""
+        if not self.use_limiter:
+            return await self._prompt_once(prompt_text)
+        return await LLM_LIMITER.run(lambda: self._prompt_once(prompt_text), prompt_text=prompt_text, label=self.model_name)
+
+    async def _prompt_once(self, prompt_text: str) -> str:
+        target = stub_target_for_prompt(prompt_text) or "text"
+        with self._lock:
+            latency_ms = self._sample_latency_ms()
+            roll = self._rng.random()
+            malformed_kind = self._rng.choice(STUB_MALFORMED_KINDS)
+            overloaded = 0 < self.max_concurrent <= self._in_flight
+            self._counts["calls"] += 1
+            self._targets[target] += 1
+            if overloaded or roll < self.throttle_rate:
+                self._counts["throttled"] += 1
+                raise RuntimeError("429 RESOURCE_EXHAUSTED: stub backend rejected the call")
+            self._in_flight += 1
+        try:
+            response = stub_response_for_prompt(prompt_text, self.seed)
+            await asyncio.sleep((latency_ms + self.ms_per_output_token * estimate_tokens(response)) / 1000)
+            if roll < self.throttle_rate + self.error_rate:
+                with self._lock:
+                    self._counts["errors"] += 1
+                raise RuntimeError("503 UNAVAILABLE: stub backend error")
+            if roll < self.throttle_rate + self.error_rate + self.malformed_rate:
+                with self._lock:
+                    self._counts["malformed"] += 1
+                return stub_malform_response(response, malformed_kind)
+            return response
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts = {"calls": 0, "throttled": 0, "errors": 0, "malformed": 0}
+            self._targets: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls (including throttled ones), simulated faults, calls in flight and calls per L3 target."""
+        with self._lock:
+            return {**self._counts, "in_flight": self._in_flight, "targets": dict(self._targets)}
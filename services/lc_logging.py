@@ -0,0 +1,101 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Any, Optional
+
+# Shared logging for the SOPs and services.
+#
+# Each module keeps its `log_internal_*` helpers, but they go through a `logging.Logger`
+# under the package logger instead of calling `print`. Messages use %-style arguments,
+# so payload dicts are only turned into strings when the record is actually emitted.
+#   LC_LOG_LEVEL             minimum level (default WARNING; INFO restores the old output)
+#   LC_LOG_INFO_SAMPLE_EVERY emit 1 of every N INFO messages per helper (default 1 = all)
+#   LC_LOG_QUEUE=1           hand records to a background thread (QueueHandler/QueueListener)
+#                            so the caller never blocks on stdout
+# Records are written to stdout as the bare message, like the old prints. Applications
+# that configure logging themselves can call configure_logging(propagate=True) instead.
+
+ROOT_LOGGER_NAME = __name__.split(".")[0]
+LOG_LEVEL = os.getenv("LC_LOG_LEVEL", "WARNING").upper()
+LOG_INFO_SAMPLE_EVERY = int(os.getenv("LC_LOG_INFO_SAMPLE_EVERY", "1"))
+LOG_QUEUE = os.getenv("LC_LOG_QUEUE", "0").lower() in ("1", "true", "yes")
+
+_configure_lock = threading.Lock()
+_configured = False
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_counts: Dict[str, int] = {}
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (so redirected/captured stdout works)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(level: Optional[str] = None, use_queue: Optional[bool] = None, propagate: bool = False) -> logging.Logger:
+    """
+    (Re)configures the package logger. `propagate=True` drops the package's own handler
+    and leaves output to the application's logging configuration.
+    """
+    global _configured, _listener
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(getattr(logging, (level or LOG_LEVEL).upper(), logging.WARNING))
+        root.propagate = propagate
+        if not propagate:
+            handler = _StdoutHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            if use_queue if use_queue is not None else LOG_QUEUE:
+                records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+                _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+                _listener.start()
+                handler = logging.handlers.QueueHandler(records)
+            root.addHandler(handler)
+        _configured = True
+        return root
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop() # Flushes queued records
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def get_logger(module_name: str) -> logging.Logger:
+    """Logger for a module (pass `__name__`); configures the package logger on first use."""
+    if not _configured:
+        configure_logging()
+    if module_name != ROOT_LOGGER_NAME and not module_name.startswith(ROOT_LOGGER_NAME + "."):
+        module_name = f"{ROOT_LOGGER_NAME}.{module_name}"
+    return logging.getLogger(module_name)
+
+
+def log_info_sampled(logger: logging.Logger, key: str, msg: str, *args: Any):
+    """INFO with per-`key` sampling (LC_LOG_INFO_SAMPLE_EVERY); free when INFO is disabled."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if LOG_INFO_SAMPLE_EVERY > 1:
+        count = _sample_counts.get(key, 0)
+        _sample_counts[key] = count + 1 # Racy across threads, which only skews the sample
+        if count % LOG_INFO_SAMPLE_EVERY:
+            return
+    logger.info(msg, *args)
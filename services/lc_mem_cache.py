@@ -0,0 +1,123 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Hashable
+
+# In-process LRU cache for decoded lC.MEM.CORE objects (see lc_mem_service.py).
+#
+# Each entry remembers the backend's version token for the object (file mtimes
+# and sizes for the directory backend). A lookup presents the current token; if
+# another process rewrote the object the tokens differ and the entry is dropped
+# as stale. Writes made through lc_mem_service invalidate entries directly.
+# Callers always receive a private copy, so mutating a returned payload (as the
+# meta-SOPs do before writing it back) never corrupts the cache.
+
+
+def _clone_json(value: Any) -> Any:
+    # Cheaper than copy.deepcopy for JSON-shaped data (no memo, no reduce protocol).
+    if isinstance(value, dict):
+        return {k: _clone_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone_json(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_clone_json(v) for v in value)
+    return value
+
+
+def _approx_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class ObjectCache:
+    """
+    Bounded LRU keyed by (namespace, uid_hex). Bounded both by entry count and
+    by the approximate serialized size of the cached values; a limit of 0
+    disables caching.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, int]]" = OrderedDict()  # key -> (value, token, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable, token: Any) -> Optional[Any]:
+        """Returns a copy of the cached value if present and still at `token`, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, cached_token, size = entry
+            if token is None or cached_token != token:
+                del self._entries[key]
+                self._bytes -= size
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _clone_json(value)
+
+    def put(self, key: Hashable, value: Any, token: Any):
+        if not self.enabled or token is None:
+            return
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        value = _clone_json(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, token, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.stale = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,144 @@
+import json
+from typing import Any, Dict, List, Union
+from .lc_logging import get_logger
+
+# Optional faster encoders. The vault stays readable without them: files written
+# by a codec that is not installed fail to decode with a clear error.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Serialization codecs for lC.MEM.CORE vault files (see lc_mem_storage.py).
+#
+# JSON codecs ("json", "orjson") write plain compact JSON with no marker, so
+# their files are interchangeable with each other and with older pretty-printed
+# vaults. Binary codecs prefix every file with a format marker,
+#   b"\x00lcmem:<codec name>\n"
+# which a JSON document can never start with. decode() sniffs the marker, so a
+# vault holding files from several codecs stays readable.
+
+FORMAT_MARKER_PREFIX = b"\x00lcmem:"
+DEFAULT_CODEC = "json"
+
+
+_logger = get_logger(__name__)
+
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
+
+
+class Codec:
+    """Encodes JSON-shaped values to bytes and back."""
+
+    name = "abstract"
+    is_json = False  # True when output is plain JSON text (usable for JSON Lines, TEXT columns, ...)
+
+    def available(self) -> bool:
+        return True
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+    is_json = True
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    is_json = True
+
+    def available(self) -> bool:
+        return orjson is not None
+
+    def encode(self, value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # e.g. integers beyond 64 bits; stdlib json handles these
+            return JSON_CODEC.encode(value)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:  # stdlib-only extensions such as NaN/Infinity
+            return JSON_CODEC.decode(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+
+    def available(self) -> bool:
+        return msgpack is not None
+
+    def encode(self, value: Any) -> bytes:
+        return FORMAT_MARKER_PREFIX + b"msgpack\n" + msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        _, body = _split_marker(data)
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+JSON_CODEC = JsonCodec()
+CODECS: Dict[str, Codec] = {codec.name: codec for codec in (JSON_CODEC, OrjsonCodec(), MsgpackCodec())}
+
+
+def _split_marker(data: bytes):
+    end = data.index(b"\n", len(FORMAT_MARKER_PREFIX))
+    return data[len(FORMAT_MARKER_PREFIX):end].decode("ascii"), data[end + 1:]
+
+
+def available_codecs() -> List[str]:
+    return [name for name, codec in CODECS.items() if codec.available()]
+
+
+def get_codec(name: str) -> Codec:
+    """Returns the named codec. Raises ValueError if it is unknown or its package is not installed."""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown lC.MEM.CORE codec '{name}'. Expected one of {sorted(CODECS)}.")
+    if not codec.available():
+        raise ValueError(f"lC.MEM.CORE codec '{name}' is not available; install the '{name}' package.")
+    return codec
+
+
+def resolve_codec(name: str) -> Codec:
+    """Like get_codec, but falls back to the stdlib JSON codec (with a warning) instead of raising."""
+    try:
+        return get_codec(name)
+    except ValueError as e:
+        log_internal_warning("resolve_codec", {"message": f"{e} Falling back to '{DEFAULT_CODEC}'."})
+        return JSON_CODEC
+
+
+def _json_reader() -> Codec:
+    # Any JSON file can be read by the fastest installed JSON decoder.
+    return CODECS["orjson"] if orjson is not None else JSON_CODEC
+
+
+def decode(data: Union[bytes, str]) -> Any:
+    """Decodes a value written by any codec, using its format marker (no marker means JSON)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if data.startswith(FORMAT_MARKER_PREFIX):
+        name, _ = _split_marker(data)
+        return get_codec(name).decode(data)
+    return _json_reader().decode(data)
+
+
+def dumps_json_line(value: Any) -> bytes:
+    """Compact JSON for line-oriented files (event logs), via the fastest installed encoder."""
+    return _json_reader().encode(value)
@@ -0,0 +1,315 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Iterable, Tuple, Callable
+
+from .lc_mem_codec import decode as decode_value
+from .lc_logging import get_logger, log_info_sampled
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows; the index is then only safe within one process.
+    fcntl = None
+
+# On-disk secondary indexes for the file-based lC.MEM.CORE vault.
+#
+# An index lives next to the objects it covers as two dotfiles (dotfiles are
+# skipped by the vault's directory scans because they are not directories):
+#   .<name>_index_snapshot.json  - full posting lists as of the last compaction
+#   .<name>_index_log.jsonl      - append-only put/del deltas since the snapshot
+#   .<name>_index.lock           - flock()ed while the files are read or changed
+# Mutations append one line to the log, so maintaining the index is O(1) per
+# create/update/delete. The log is folded back into the snapshot once it grows
+# past COMPACT_THRESHOLD entries.
+# Several processes may share a vault: every catch-up, append and compaction
+# holds an exclusive lock on the lock file, so no process appends to a log that
+# another is truncating, and every process sees the others' appends.
+
+COMPACT_THRESHOLD = 500
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+def log_internal_info(func_name: str, params: dict): log_info_sampled(_logger, func_name, "INFO:%s:%s", func_name, params)
+
+
+def _posting_key(value: Any) -> str:
+    # Values are compared with ==, so encode them losslessly ("1" and 1 stay distinct).
+    return json.dumps(value, sort_keys=True)
+
+
+class SecondaryIndex:
+    """
+    Persistent field -> value -> set(uid_hex) index over a vault directory.
+
+    `scalar_fields` maps a query key to the payload key whose value is indexed
+    as-is. `list_fields` maps a query key to a payload key holding a list; each
+    list member is indexed, so a query value matches if it is in the list.
+    `scan` yields (uid_hex, payload) pairs for rebuilds; by default the
+    `<uid_hex>/object_payload.json` directories under root_dir are read.
+    """
+
+    def __init__(self, root_dir: Path, name: str, scalar_fields: Dict[str, str], list_fields: Optional[Dict[str, str]] = None,
+                 scan: Optional[Callable[[], Iterable[Tuple[str, Dict[str, Any]]]]] = None):
+        self.root_dir = root_dir
+        self.name = name
+        self.scalar_fields = dict(scalar_fields)
+        self.list_fields = dict(list_fields or {})
+        self._scan = scan or self._scan_payloads
+        self._lock = threading.RLock()
+        self._disk_lock_depth = 0
+        self._reset_memory()
+
+    def relocate(self, root_dir: Path):
+        """Points the index at a different directory (e.g. after a storage backend switch) and drops in-memory state."""
+        with self._lock:
+            self.root_dir = root_dir
+            self._reset_memory()
+
+    # --- paths -----------------------------------------------------------
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.root_dir / f".{self.name}_index_snapshot.json"
+
+    @property
+    def log_path(self) -> Path:
+        return self.root_dir / f".{self.name}_index_log.jsonl"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.root_dir / f".{self.name}_index.lock"
+
+    @contextmanager
+    def _disk_lock(self):
+        """Holds the cross-process lock on the index files. Re-entrant; callers must hold self._lock."""
+        if fcntl is None or self._disk_lock_depth > 0 or not self.root_dir.exists():
+            # Nothing on disk yet means nothing to protect; writers create root_dir before locking.
+            self._disk_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._disk_lock_depth -= 1
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._disk_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._disk_lock_depth -= 1
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- in-memory state -------------------------------------------------
+
+    def _reset_memory(self):
+        self._entries: Dict[str, Dict[str, List[str]]] = {}  # uid_hex -> query key -> posting keys
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}  # query key -> posting key -> uid_hexes
+        self._loaded = False
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
+        self._log_offset = 0
+        self._log_entries = 0
+
+    def _extract(self, payload: Dict[str, Any]) -> Dict[str, List[str]]:
+        entry: Dict[str, List[str]] = {}
+        for query_key, payload_key in self.scalar_fields.items():
+            if payload_key in payload:
+                entry[query_key] = [_posting_key(payload[payload_key])]
+        for query_key, payload_key in self.list_fields.items():
+            values = payload.get(payload_key)
+            if isinstance(values, list):
+                entry[query_key] = sorted({_posting_key(v) for v in values})
+        return entry
+
+    def _apply_put(self, uid_hex: str, entry: Dict[str, List[str]]):
+        self._apply_del(uid_hex)
+        self._entries[uid_hex] = entry
+        for query_key, keys in entry.items():
+            field_postings = self._postings.setdefault(query_key, {})
+            for key in keys:
+                field_postings.setdefault(key, set()).add(uid_hex)
+
+    def _apply_del(self, uid_hex: str):
+        old_entry = self._entries.pop(uid_hex, None)
+        if not old_entry:
+            return
+        for query_key, keys in old_entry.items():
+            field_postings = self._postings.get(query_key, {})
+            for key in keys:
+                uids = field_postings.get(key)
+                if uids is not None:
+                    uids.discard(uid_hex)
+                    if not uids:
+                        del field_postings[key]
+
+    def _apply_op(self, op: Dict[str, Any]):
+        if op.get("op") == "put":
+            self._apply_put(op["uid"], op.get("entry", {}))
+        elif op.get("op") == "del":
+            self._apply_del(op["uid"])
+
+    # --- persistence -----------------------------------------------------
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _read_log_from(self, offset: int):
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-append.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply_op(json.loads(line))
+                self._log_entries += 1
+        self._log_offset = offset + end
+
+    def _load_from_disk(self):
+        self._reset_memory()
+        snapshot_stamp = self._stamp(self.snapshot_path)
+        if snapshot_stamp is not None:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            for uid_hex, entry in snapshot.get("entries", {}).items():
+                self._apply_put(uid_hex, entry)
+        self._snapshot_stamp = snapshot_stamp
+        if self.log_path.exists():
+            self._read_log_from(0)
+        self._loaded = True
+
+    def _ensure_current(self):
+        """Brings the in-memory index up to date with the files on disk (which other processes may have changed)."""
+        snapshot_stamp = self._stamp(self.snapshot_path)
+        log_stamp = self._stamp(self.log_path)
+        if snapshot_stamp is None and log_stamp is None:
+            # No persisted index: either a fresh vault or one written before indexing existed.
+            self.rebuild(self._scan())
+            return
+        if not self._loaded or snapshot_stamp != self._snapshot_stamp:
+            self._load_from_disk()
+            return
+        log_size = log_stamp[1] if log_stamp else 0
+        if log_size < self._log_offset:  # Log was truncated by a compaction elsewhere.
+            self._load_from_disk()
+        elif log_size > self._log_offset:
+            self._read_log_from(self._log_offset)
+
+    def _append(self, op: Dict[str, Any]):
+        """Appends one op to the log and applies it. Callers hold the disk lock and have just run _ensure_current()."""
+        offset = self._log_offset
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(op, separators=(",", ":")) + "\n")
+        # Read back from where we were rather than assuming our line is the only new one.
+        self._read_log_from(offset)
+        if self._log_entries >= COMPACT_THRESHOLD:
+            self._write_snapshot()
+
+    def compact(self):
+        """Folds the delta log into a fresh snapshot and truncates the log."""
+        with self._lock:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            with self._disk_lock():
+                self._ensure_current() # Fold in appends from other processes rather than dropping them.
+                self._write_snapshot()
+
+    def _write_snapshot(self):
+        """Persists the in-memory entries as the snapshot and empties the log. Callers hold the disk lock."""
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": 1, "entries": self._entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.snapshot_path)
+        # Replaying put/del ops is idempotent, so a crash between these two steps is harmless.
+        with open(self.log_path, 'w'):
+            pass
+        self._snapshot_stamp = self._stamp(self.snapshot_path)
+        self._log_offset = 0
+        self._log_entries = 0
+
+    def _scan_payloads(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        if not self.root_dir.exists():
+            return
+        for item in self.root_dir.iterdir():
+            payload_file = item / "object_payload.json"
+            if item.is_dir() and payload_file.exists():
+                try:
+                    with open(payload_file, 'rb') as f:
+                        yield item.name, decode_value(f.read())
+                except Exception as e:
+                    log_internal_error("SecondaryIndex._scan_payloads", {"message": f"Skipping unreadable payload {payload_file}: {e}"})
+
+    # --- public API ------------------------------------------------------
+
+    def put(self, uid_hex: str, payload: Dict[str, Any]):
+        with self._lock:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            with self._disk_lock():
+                self._ensure_current()
+                self._append({"op": "put", "uid": uid_hex, "entry": self._extract(payload)})
+
+    def remove(self, uid_hex: str):
+        with self._lock:
+            with self._disk_lock():
+                self._ensure_current()
+                if uid_hex not in self._entries:
+                    return
+                self._append({"op": "del", "uid": uid_hex})
+
+    def rebuild(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Discards the current index and rebuilds it from (uid_hex, payload) pairs. Returns the entry count."""
+        with self._lock, self._disk_lock():
+            self._reset_memory()
+            for uid_hex, payload in items:
+                self._apply_put(uid_hex, self._extract(payload))
+            self._loaded = True
+            # Don't materialise a vault directory just to persist an empty index.
+            if self._entries or self.root_dir.exists():
+                self.root_dir.mkdir(parents=True, exist_ok=True)
+                self._write_snapshot()
+            log_internal_info("SecondaryIndex.rebuild", {"message": f"Rebuilt '{self.name}' index with {len(self._entries)} entries."})
+            return len(self._entries)
+
+    def rebuild_from_source(self) -> int:
+        """Rebuilds the index from its scan source (the stored objects). Returns the entry count."""
+        return self.rebuild(self._scan())
+
+    def is_indexed(self, query_key: str) -> bool:
+        return query_key in self.scalar_fields or query_key in self.list_fields
+
+    def all_uids(self) -> Set[str]:
+        with self._lock:
+            with self._disk_lock():
+                self._ensure_current()
+            return set(self._entries)
+
+    def lookup(self, criteria: Dict[str, Any]) -> Set[str]:
+        """
+        Returns the uid_hexes matching every indexed key in `criteria` (AND).
+        For a list field, a list value requires every member to be present.
+        Keys that are not indexed are ignored here; callers must post-filter them.
+        """
+        with self._lock:
+            with self._disk_lock():
+                self._ensure_current()
+            result: Optional[Set[str]] = None
+            # Intersect smallest posting lists first.
+            postings = []
+            for query_key, value in criteria.items():
+                if not self.is_indexed(query_key):
+                    continue
+                values = value if query_key in self.list_fields and isinstance(value, list) else [value]
+                for member in values:
+                    postings.append(self._postings.get(query_key, {}).get(_posting_key(member), set()))
+            for uids in sorted(postings, key=len):
+                result = set(uids) if result is None else result & uids
+                if not result:
+                    return set()
+            return set(self._entries) if result is None else result
@@ -1,11 +1,19 @@
 import json
 import uuid
 import os
-import shutil # For rmtree
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List # Added List for query results
+from typing import Optional, Dict, Any, Union, List, Tuple # Added List for query results
 from datetime import datetime, timezone
 
+from .lc_mem_cache import ObjectCache
+from .lc_mem_codec import resolve_codec
+from .lc_mem_index import SecondaryIndex
+from .lc_mem_storage import (
+    MemStorageBackend, create_backend,
+    NAMESPACE_OBJECTS, NAMESPACE_PBIS, NAMESPACE_AGENT_PROFILES
+)
+from .lc_logging import get_logger, log_info_sampled
+
 # Define a base path for the local MADA vault.
 # Using lab/.data/ as suggested by user feedback for persistent local data.
 # Ensure this path is resolved correctly relative to where the script might be run from,
@@ -24,15 +32,138 @@ AGENT_PROFILE_OBJECT_TYPE = "AgentProfile"
 AGENT_PROFILE_VAULT_DIR = MADA_VAULT_DIR / "agent_profiles"
 AGENT_PROFILE_VAULT_DIR.mkdir(parents=True, exist_ok=True)
 
-
-# Mock logging functions (can be replaced with a proper logger)
-def log_internal_error(func_name: str, params: dict): print(f"ERROR:{func_name}:{params}")
-def log_internal_info(func_name: str, params: dict): print(f"INFO:{func_name}:{params}")
+# Storage engine selection. 'directory' (default) keeps the <uid>/object_payload.json +
+# metadata.json layout under MADA_VAULT_DIR; 'sqlite' keeps everything in one WAL-mode database.
+# Can also be switched at runtime with set_storage_backend().
+LC_MEM_STORAGE_BACKEND = os.getenv("LC_MEM_STORAGE_BACKEND", "directory")
+LC_MEM_SQLITE_PATH = os.getenv("LC_MEM_SQLITE_PATH") # Defaults to MADA_VAULT_DIR / "mada_vault.sqlite3"
+# Directory backend writes are always atomic (temp file + rename, journaled payload/metadata pairs);
+# LC_MEM_FSYNC=1 additionally fsyncs each file before it is renamed into place.
+LC_MEM_FSYNC = os.getenv("LC_MEM_FSYNC", "0").lower() in ("1", "true", "yes")
+# Codec for new writes: 'json' (compact stdlib), 'orjson' or 'msgpack' (when installed).
+# Existing files are read in whatever format they were written, so changing this is safe;
+# use `python -m lc_python_core.services.lc_mem_storage convert` to rewrite a vault.
+LC_MEM_CODEC = os.getenv("LC_MEM_CODEC", "json")
+# Directory backend layout: 'flat' (<uid>/ under each namespace) or 'sharded' (<ab>/<cd>/<uid>/).
+# Objects are found in either layout, and writes move them into this one; use
+# `python -m lc_python_core.services.lc_mem_storage relayout` to migrate a vault in one pass.
+LC_MEM_VAULT_LAYOUT = os.getenv("LC_MEM_VAULT_LAYOUT", "flat")
+
+_storage_backend: Optional[MemStorageBackend] = None
+
+def get_storage_backend() -> MemStorageBackend:
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_backend(LC_MEM_STORAGE_BACKEND, MADA_VAULT_DIR, Path(LC_MEM_SQLITE_PATH) if LC_MEM_SQLITE_PATH else None,
+                                          fsync=LC_MEM_FSYNC, codec=resolve_codec(LC_MEM_CODEC), layout=LC_MEM_VAULT_LAYOUT)
+        try:
+            _storage_backend.recover() # Finish any write interrupted by a crash before serving reads
+        except Exception as e:
+            log_internal_error("get_storage_backend", {"message": f"Recovery pass failed: {e}"})
+        PBI_INDEX.relocate(_storage_backend.index_dir(NAMESPACE_PBIS))
+        OBJECT_TYPE_INDEX.relocate(_storage_backend.index_dir(NAMESPACE_OBJECTS))
+        AGENT_PROFILE_INDEX.relocate(_storage_backend.index_dir(NAMESPACE_AGENT_PROFILES))
+    return _storage_backend
+
+# Secondary index over PBI payloads so query_pbis only opens matching PBIs.
+# Keys are the query_params names; list fields match if the value is in the PBI's list.
+PBI_INDEX = SecondaryIndex(
+    PBI_VAULT_DIR, "pbi",
+    scalar_fields={
+        "status": "status",
+        "priority": "priority",
+        "pbi_type": "pbi_type",
+        "cynefin_domain_context": "cynefin_domain_context",
+    },
+    list_fields={
+        "related_oia_cycle_uid": "related_oia_cycle_uids",
+        "related_rdsotm_cycle_linkage_uid": "related_rdsotm_cycle_linkage_uids",
+        "related_rdsotm_component_uid": "related_rdsotm_component_uids",
+    },
+    scan=lambda: get_storage_backend().iter_payloads(NAMESPACE_PBIS),
+)
+
+def _agent_profile_index_doc(profile: Dict[str, Any]) -> Dict[str, Any]:
+    # Tools may be plain names or {"tool_name"/"name": ...} descriptors; index them by name.
+    tool_names = []
+    for tool in profile.get("tools") or []:
+        name = tool.get("tool_name", tool.get("name")) if isinstance(tool, dict) else tool
+        if name is not None:
+            tool_names.append(name)
+    doc = {"capabilities": list(profile.get("capabilities") or []), "tools": tool_names}
+    for key in ("agent_type", "model_name"):
+        if key in profile:
+            doc[key] = profile[key]
+    return doc
+
+# Inverted index over AgentProfiles (capability/tool -> profiles, plus agent_type and model_name),
+# so query_agent_profiles intersects posting sets and only loads matching profiles.
+AGENT_PROFILE_INDEX = SecondaryIndex(
+    AGENT_PROFILE_VAULT_DIR, "agent_profile",
+    scalar_fields={"agent_type": "agent_type", "model_name": "model_name"},
+    list_fields={"capabilities": "capabilities", "tools": "tools"},
+    scan=lambda: ((uid_hex, _agent_profile_index_doc(payload)) for uid_hex, payload in get_storage_backend().iter_payloads(NAMESPACE_AGENT_PROFILES)),
+)
+
+# Persisted object_type -> UID manifest for general MADA objects, so typed queries
+# (OIACycle, RDSOTMComponent, TextDocument, ...) don't read every object's metadata.
+# Typed queries trust it without scanning, so it relies on SecondaryIndex's file lock
+# to stay complete when several processes write to the same vault.
+OBJECT_TYPE_INDEX = SecondaryIndex(
+    MADA_VAULT_DIR, "object_type",
+    scalar_fields={"object_type": "object_type"},
+    scan=lambda: get_storage_backend().iter_metadata(NAMESPACE_OBJECTS),
+)
+
+def rebuild_indexes() -> Dict[str, int]:
+    """
+    Maintenance entry point: reconstructs the object-type manifest and the PBI and
+    AgentProfile indexes from the stored objects (e.g. after the vault was edited
+    by hand or by an older version). Returns the entry count of each index.
+    """
+    get_storage_backend() # Makes sure the indexes point at the active backend
+    counts = {index.name: index.rebuild_from_source() for index in (OBJECT_TYPE_INDEX, PBI_INDEX, AGENT_PROFILE_INDEX)}
+    log_internal_info("rebuild_indexes", {"message": f"Rebuilt lC.MEM.CORE indexes: {counts}"})
+    return counts
+
+# In-process LRU over decoded objects, PBIs and AgentProfiles. Entries are checked against the
+# backend's version token on every hit, so writes from other processes are picked up.
+# Set LC_MEM_CACHE_MAX_ENTRIES=0 to disable.
+OBJECT_CACHE = ObjectCache(
+    max_entries=int(os.getenv("LC_MEM_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("LC_MEM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+def set_storage_backend(backend: MemStorageBackend) -> MemStorageBackend:
+    """Switches every lC.MEM.CORE function to `backend`. Returns the previous backend."""
+    global _storage_backend
+    previous = get_storage_backend()
+    backend.recover()
+    _storage_backend = backend
+    PBI_INDEX.relocate(backend.index_dir(NAMESPACE_PBIS))
+    OBJECT_TYPE_INDEX.relocate(backend.index_dir(NAMESPACE_OBJECTS))
+    AGENT_PROFILE_INDEX.relocate(backend.index_dir(NAMESPACE_AGENT_PROFILES))
+    OBJECT_CACHE.clear()
+    return previous
+
+def get_object_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters and current size of the lC.MEM.CORE object cache."""
+    return OBJECT_CACHE.stats()
+
+def clear_object_cache():
+    OBJECT_CACHE.clear()
+
+
+_logger = get_logger(__name__)
+
+# Logging helpers (leveled, see services/lc_logging.py)
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+def log_internal_info(func_name: str, params: dict): log_info_sampled(_logger, func_name, "INFO:%s:%s", func_name, params)
 # Added missing log_internal_warning, assuming it's needed or was intended
-def log_internal_warning(func_name: str, params: dict): print(f"WARNING:{func_name}:{params}")
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
 
 def write_mada_object(mada: dict) -> dict:
-    print("[Stub] write_mada_object called")
+    _logger.debug("[Stub] write_mada_object called")
     return {"status": "stubbed", "received": mada}
 
 
@@ -57,30 +188,18 @@ def mock_lc_mem_core_create_object(object_uid: str, object_payload: Dict[str, An
         log_internal_error("mock_lc_mem_core_create_object", {"message": f"Invalid CRUX UID format for create: {object_uid}"})
         return False
     
-    # Instead of object_path and metadata_path directly under MADA_VAULT_DIR,
-    # create a directory for each UID to store its object and metadata.
-    uid_specific_dir_name = object_uid.split('::')[-1]
-    uid_specific_dir = MADA_VAULT_DIR / uid_specific_dir_name
+    # Each UID gets its own storage slot (a <uid_hex>/ directory in the directory backend)
+    # holding its object payload and metadata.
+    uid_hex = object_uid.split('::')[-1]
+    backend = get_storage_backend()
     
     try:
-        uid_specific_dir.mkdir(parents=True, exist_ok=True)
-        
-        object_file_path = uid_specific_dir / "object_payload.json"
-        metadata_file_path = uid_specific_dir / "metadata.json"
-
-        with open(object_file_path, 'w') as f:
-            json.dump(object_payload, f, indent=2)
+        meta_to_store = _initial_object_metadata(object_uid, object_payload, initial_metadata)
+        backend.write(NAMESPACE_OBJECTS, uid_hex, object_payload, meta_to_store)
+        _cache_invalidate(NAMESPACE_OBJECTS, uid_hex)
+        _object_type_index_put(uid_hex, meta_to_store)
         
-        meta_to_store = initial_metadata if initial_metadata else {}
-        meta_to_store['crux_uid'] = object_uid
-        meta_to_store['object_type'] = object_payload.get("type", "Unknown") # Example: try to get type from payload
-        meta_to_store['created_at'] = datetime.now(timezone.utc).isoformat() # Use timezone.utc
-        meta_to_store['version'] = meta_to_store.get('version', "0.1.0") # Default version
-
-        with open(metadata_file_path, 'w') as f:
-            json.dump(meta_to_store, f, indent=2)
-        
-        log_internal_info("mock_lc_mem_core_create_object", {"message": f"Object {object_uid} created successfully at {object_file_path}"})
+        log_internal_info("mock_lc_mem_core_create_object", {"message": f"Object {object_uid} created successfully at {backend.describe(NAMESPACE_OBJECTS, uid_hex)}"})
         return True
     except IOError as e:
         log_internal_error("mock_lc_mem_core_create_object", {"message": f"IOError creating object {object_uid}: {e}"})
@@ -94,17 +213,14 @@ def mock_lc_mem_core_get_object(object_uid: str, version_hint: Optional[str] = N
         log_internal_error("mock_lc_mem_core_get_object", {"message": f"Invalid CRUX UID format for get: {object_uid}"})
         return None
     
-    uid_specific_dir = MADA_VAULT_DIR / object_uid.split('::')[-1]
-    object_file_path = uid_specific_dir / "object_payload.json"
-    # metadata_file_path = uid_specific_dir / "metadata.json" # Metadata could also be returned if needed
-
-    if not object_file_path.exists():
-        log_internal_info("mock_lc_mem_core_get_object", {"message": f"Object {object_uid} not found at {object_file_path}"})
-        return None
+    uid_hex = object_uid.split('::')[-1]
+    backend = get_storage_backend()
     
     try:
-        with open(object_file_path, 'r') as f:
-            payload = json.load(f)
+        payload = _cached_read(backend, NAMESPACE_OBJECTS, uid_hex, with_metadata=False) # Metadata could also be returned if needed
+        if payload is None:
+            log_internal_info("mock_lc_mem_core_get_object", {"message": f"Object {object_uid} not found at {backend.describe(NAMESPACE_OBJECTS, uid_hex)}"})
+            return None
         log_internal_info("mock_lc_mem_core_get_object", {"message": f"Object {object_uid} retrieved successfully."})
         return payload
     except IOError as e:
@@ -122,44 +238,21 @@ def mock_lc_mem_core_update_object(object_uid: str, updated_object_payload: Dict
         log_internal_error("mock_lc_mem_core_update_object", {"message": f"Invalid CRUX UID format for update: {object_uid}"})
         return False
 
-    uid_specific_dir = MADA_VAULT_DIR / object_uid.split('::')[-1]
-    object_file_path = uid_specific_dir / "object_payload.json"
-    metadata_file_path = uid_specific_dir / "metadata.json"
+    uid_hex = object_uid.split('::')[-1]
+    backend = get_storage_backend()
 
-    if not object_file_path.exists() or not metadata_file_path.exists():
+    if not backend.exists(NAMESPACE_OBJECTS, uid_hex):
         log_internal_error("mock_lc_mem_core_update_object", {"message": f"Object {object_uid} not found for update."})
         return False
 
     try:
-        # Update payload
-        with open(object_file_path, 'w') as f:
-            json.dump(updated_object_payload, f, indent=2)
-        
         # Update metadata
-        current_meta = {}
-        with open(metadata_file_path, 'r') as f:
-            current_meta = json.load(f)
-        
-        current_meta['updated_at'] = datetime.now(timezone.utc).isoformat()
-        if update_metadata and 'version' in update_metadata:
-            current_meta['version'] = update_metadata['version']
-        elif 'version' in current_meta: # Basic increment if version exists
-            parts = str(current_meta['version']).split('.')
-            if len(parts) == 3 and all(p.isdigit() for p in parts):
-                parts[-1] = str(int(parts[-1]) + 1)
-                current_meta['version'] = ".".join(parts)
-            else: # Non-standard version, just mark updated
-                 current_meta['version'] = str(current_meta['version']) + "_updated"
-        else:
-            current_meta['version'] = "0.1.1" # Default next version from 0.1.0
-        
-        if update_metadata: # Merge any other metadata provided
-            for key, value in update_metadata.items():
-                if key not in ['crux_uid', 'created_at', 'updated_at']: # Avoid overwriting critical/managed meta
-                    current_meta[key] = value
+        current_meta = _next_object_metadata(backend.read_metadata(NAMESPACE_OBJECTS, uid_hex) or {}, update_metadata)
         
-        with open(metadata_file_path, 'w') as f:
-            json.dump(current_meta, f, indent=2)
+        # Payload and metadata are written together
+        backend.write(NAMESPACE_OBJECTS, uid_hex, updated_object_payload, current_meta)
+        _cache_invalidate(NAMESPACE_OBJECTS, uid_hex)
+        _object_type_index_put(uid_hex, current_meta) # update_metadata may change object_type
 
         log_internal_info("mock_lc_mem_core_update_object", {"message": f"Object {object_uid} updated successfully."})
         return True
@@ -175,18 +268,22 @@ def mock_lc_mem_core_delete_object(object_uid: str, requesting_persona_context:
         log_internal_error("mock_lc_mem_core_delete_object", {"message": f"Invalid CRUX UID format for delete: {object_uid}"})
         return False
 
-    uid_specific_dir = MADA_VAULT_DIR / object_uid.split('::')[-1]
-
-    if not uid_specific_dir.exists():
-        log_internal_info("mock_lc_mem_core_delete_object", {"message": f"Object directory {uid_specific_dir} for UID {object_uid} not found. Considered deleted."})
-        return True # Idempotent delete
+    uid_hex = object_uid.split('::')[-1]
+    backend = get_storage_backend()
+    location = backend.describe(NAMESPACE_OBJECTS, uid_hex)
     
     try:
-        shutil.rmtree(uid_specific_dir)
-        log_internal_info("mock_lc_mem_core_delete_object", {"message": f"Object {object_uid} and its directory {uid_specific_dir} deleted successfully. Rationale: {deletion_rationale or 'N/A'}"})
+        _cache_invalidate(NAMESPACE_OBJECTS, uid_hex)
+        deleted = backend.delete(NAMESPACE_OBJECTS, uid_hex)
+        # Unindexed only once the object is gone, so a failed delete leaves it queryable.
+        _object_type_index_remove(uid_hex)
+        if not deleted:
+            log_internal_info("mock_lc_mem_core_delete_object", {"message": f"Object {location} for UID {object_uid} not found. Considered deleted."})
+            return True # Idempotent delete
+        log_internal_info("mock_lc_mem_core_delete_object", {"message": f"Object {object_uid} at {location} deleted successfully. Rationale: {deletion_rationale or 'N/A'}"})
         return True
     except OSError as e:
-        log_internal_error("mock_lc_mem_core_delete_object", {"message": f"OSError deleting object directory {uid_specific_dir} for UID {object_uid}: {e}"})
+        log_internal_error("mock_lc_mem_core_delete_object", {"message": f"OSError deleting object {location} for UID {object_uid}: {e}"})
         return False
     except Exception as e:
         log_internal_error("mock_lc_mem_core_delete_object", {"message": f"Unexpected error deleting object {object_uid}: {e}"})
@@ -197,96 +294,52 @@ def mock_lc_mem_core_query_objects(query_parameters: Dict[str, Any], requesting_
     
     query_object_type = query_parameters.get("object_type")
     query_uid_list = query_parameters.get("object_uid_list")
+    backend = get_storage_backend()
 
     try:
         if query_object_type == PBI_OBJECT_TYPE:
             log_internal_info("mock_lc_mem_core_query_objects", {"message": f"Querying PBIs with params: {query_parameters}"})
-            if not PBI_VAULT_DIR.exists():
-                return []
-            for pbi_uid_dir in PBI_VAULT_DIR.iterdir():
-                if not pbi_uid_dir.is_dir():
-                    continue
-                
-                # Construct UID from directory name to fetch PBI data via get_pbi
-                pbi_uid_candidate = f"urn:crux:uid::{pbi_uid_dir.name}"
-                pbi_data = get_pbi(pbi_uid_candidate) # get_pbi already handles metadata check and returns payload
-
-                if pbi_data:
-                    match = True # Assume match until a filter fails
-                    
-                    # Status filter
-                    if "status" in query_params and pbi_data.get("status") != query_params["status"]:
-                        match = False
-                    
-                    # Priority filter
-                    if match and "priority" in query_params and pbi_data.get("priority") != query_params["priority"]:
-                        match = False
-
-                    # PBI Type filter
-                    if match and "pbi_type" in query_params and pbi_data.get("pbi_type") != query_params["pbi_type"]:
-                        match = False
-
-                    # Cynefin Domain filter
-                    if match and "cynefin_domain_context" in query_params and pbi_data.get("cynefin_domain_context") != query_params["cynefin_domain_context"]:
-                        match = False
-                    
-                    # Related OIA Cycle UID filter
-                    if match and "related_oia_cycle_uid" in query_params:
-                        if query_params["related_oia_cycle_uid"] not in pbi_data.get("related_oia_cycle_uids", []):
-                            match = False
-                    
-                    # Related RDSOTM Cycle Linkage UID filter
-                    if match and "related_rdsotm_cycle_linkage_uid" in query_params:
-                        if query_params["related_rdsotm_cycle_linkage_uid"] not in pbi_data.get("related_rdsotm_cycle_linkage_uids", []):
-                            match = False
-
-                    # Related RDSOTM Component UID filter
-                    if match and "related_rdsotm_component_uid" in query_params:
-                        if query_params["related_rdsotm_component_uid"] not in pbi_data.get("related_rdsotm_component_uids", []):
-                            match = False
-                    
-                    if match:
-                        results.append(pbi_data)
+            pbi_filters = {k: v for k, v in query_parameters.items() if k != "object_type"}
+            results.extend(_query_pbis_indexed(pbi_filters))
             # Keep existing logic for other object types or general MADA vault queries
         elif query_object_type and query_object_type != "*":
             log_internal_info("mock_lc_mem_core_query_objects", {"message": f"Querying generic object_type: {query_object_type}"})
-            for item in MADA_VAULT_DIR.iterdir(): # Iterate general MADA_VAULT_DIR, not PBI_VAULT_DIR
-                if item.is_dir(): 
-                    metadata_file = item / "metadata.json"
-                    if metadata_file.exists():
-                        try:
-                            with open(metadata_file, 'r') as f:
-                                meta = json.load(f)
-                            if meta.get("object_type") == query_object_type:
-                                results.append(meta.get("crux_uid", f"urn:crux:uid::{item.name}"))
-                        except Exception as e:
-                            log_internal_error("mock_lc_mem_core_query_objects", {"message": f"Error reading metadata for {item.name}: {e}"})
+            # General MADA objects only, not PBIs. Served from the object-type manifest, so the cost
+            # follows the number of matches rather than the size of the vault.
+            try:
+                uid_hexes = sorted(OBJECT_TYPE_INDEX.lookup({"object_type": query_object_type}))
+                results.extend(f"urn:crux:uid::{uid_hex}" for uid_hex in uid_hexes if backend.exists(NAMESPACE_OBJECTS, uid_hex))
+            except Exception as e:
+                log_internal_error("mock_lc_mem_core_query_objects", {"message": f"Object-type index unavailable, falling back to metadata scan: {e}"})
+                results.extend(backend.find_by_object_type(NAMESPACE_OBJECTS, query_object_type))
         elif query_uid_list and isinstance(query_uid_list, list):
             log_internal_info("mock_lc_mem_core_query_objects", {"message": f"Querying for UIDs in list: {query_uid_list}"})
-            for uid in query_uid_list:
-                # Determine if it's a PBI UID by checking if its hex part exists in PBI_VAULT_DIR
-                # This is a bit heuristic; ideally, object_type would be part of query_uid_list items or context
-                uid_hex = uid.split('::')[-1]
-                is_pbi_path = PBI_VAULT_DIR / uid_hex
-                obj = None
-                if is_pbi_path.exists() and is_pbi_path.is_dir(): # Check if it's a PBI by path
-                    obj = get_pbi(uid)
-                else: # Assume generic MADA object
-                    obj = mock_lc_mem_core_get_object(uid)
-                
-                if obj:
-                    results.append(obj)
+            # Determine if each UID is a PBI by checking whether it exists in the PBI namespace.
+            # This is a bit heuristic; ideally, object_type would be part of query_uid_list items or context.
+            # Both namespaces are read in one batch each rather than one object at a time.
+            found: Dict[int, Dict[str, Any]] = {}
+            generic_positions: List[int] = []
+            pbi_reads = _read_many_cached(backend, NAMESPACE_PBIS, [uid.split('::')[-1] for uid in query_uid_list])
+            for position, stored in enumerate(pbi_reads):
+                if stored is None: # Assume generic MADA object
+                    generic_positions.append(position)
+                elif isinstance(stored, Exception):
+                    log_internal_error("mock_lc_mem_core_query_objects", {"message": f"Error retrieving PBI {query_uid_list[position]}: {stored}"})
+                elif stored[1].get("object_type") == PBI_OBJECT_TYPE:
+                    found[position] = stored[0]
+            generic_results = get_objects_many([query_uid_list[position] for position in generic_positions])
+            for position, item in zip(generic_positions, generic_results):
+                if item["ok"]:
+                    found[position] = item["payload"]
+            results.extend(found[position] for position in sorted(found))
         elif query_object_type == "*": 
             log_internal_info("mock_lc_mem_core_query_objects", {"message": "Querying for all object UIDs ('*') in general MADA_VAULT_DIR."})
-            for item in MADA_VAULT_DIR.iterdir():
-                if item.is_dir() and item.name != "pbis": # Exclude PBI vault from general '*' unless specified
-                     results.append(f"urn:crux:uid::{item.name}")
+            # PBIs and AgentProfiles live in their own namespaces and are excluded from '*'
+            results.extend(f"urn:crux:uid::{uid_hex}" for uid_hex in backend.list_uid_hexes(NAMESPACE_OBJECTS))
         else: # Default or unspecified query
             log_internal_warning("mock_lc_mem_core_query_objects", {"message": f"Unsupported or generic query. Query: {query_parameters}. Consider specifying object_type."})
             # Optionally, list all UIDs from general MADA_VAULT_DIR (excluding pbis)
-            for item in MADA_VAULT_DIR.iterdir():
-                if item.is_dir() and item.name != "pbis":
-                     results.append(f"urn:crux:uid::{item.name}")
+            results.extend(f"urn:crux:uid::{uid_hex}" for uid_hex in backend.list_uid_hexes(NAMESPACE_OBJECTS))
 
     except Exception as e:
         log_internal_error("mock_lc_mem_core_query_objects", {"message": f"Error during query: {e}"})
@@ -295,6 +348,274 @@ def mock_lc_mem_core_query_objects(query_parameters: Dict[str, Any], requesting_
     log_internal_info("mock_lc_mem_core_query_objects", {"message": f"Query completed. Found {len(results)} results."})
     return results
 
+# Batch variants of get/create/update. Results come back in input order, one dict per item:
+# {"uid": ..., "ok": bool, "error": Optional[str]} (plus "payload" for reads). A failing item
+# never fails the rest of the batch.
+
+def get_objects_many(object_uids: List[str], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    backend = get_storage_backend()
+    results: List[Dict[str, Any]] = []
+    positions: List[int] = []
+    for i, uid in enumerate(object_uids):
+        results.append({"uid": uid, "ok": False, "payload": None, "error": None})
+        if isinstance(uid, str) and uid.startswith("urn:crux:uid::"):
+            positions.append(i)
+        else:
+            results[i]["error"] = f"Invalid CRUX UID format: {uid}"
+
+    try:
+        reads = _read_many_cached(backend, NAMESPACE_OBJECTS, [object_uids[i].split('::')[-1] for i in positions], with_metadata=False)
+    except Exception as e:
+        log_internal_error("get_objects_many", {"message": f"Batch read failed: {e}"})
+        reads = [e] * len(positions)
+
+    for i, payload in zip(positions, reads):
+        if isinstance(payload, Exception):
+            results[i]["error"] = f"Error reading object: {payload}"
+        elif payload is None:
+            results[i]["error"] = "Object not found."
+        else:
+            results[i]["ok"] = True
+            results[i]["payload"] = payload
+    log_internal_info("get_objects_many", {"message": f"Retrieved {sum(r['ok'] for r in results)}/{len(results)} objects."})
+    return results
+
+def create_objects_many(objects: List[Dict[str, Any]], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Creates many objects in one backend batch. Each item is
+    {"object_uid": ..., "object_payload": {...}, "initial_metadata": {...} (optional)}.
+    """
+    backend = get_storage_backend()
+    results: List[Dict[str, Any]] = []
+    pending: List[Tuple[int, Tuple[str, Dict[str, Any], Dict[str, Any]]]] = []
+    for item in objects:
+        object_uid = item.get("object_uid", "")
+        results.append({"uid": object_uid, "ok": False, "error": None})
+        if not isinstance(object_uid, str) or not object_uid.startswith("urn:crux:uid::"):
+            results[-1]["error"] = f"Invalid CRUX UID format for create: {object_uid}"
+            continue
+        try:
+            meta = _initial_object_metadata(object_uid, item["object_payload"], item.get("initial_metadata"))
+            pending.append((len(results) - 1, (object_uid.split('::')[-1], item["object_payload"], meta)))
+        except Exception as e:
+            results[-1]["error"] = f"Error preparing object: {e}"
+
+    _write_batch_into(backend, NAMESPACE_OBJECTS, pending, results, "create_objects_many")
+    return results
+
+def update_objects_many(updates: List[Dict[str, Any]], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Updates many existing objects with one batched metadata read and one batched write.
+    Each item is {"object_uid": ..., "updated_object_payload": {...}, "update_metadata": {...} (optional)}.
+    """
+    backend = get_storage_backend()
+    results: List[Dict[str, Any]] = []
+    candidates: List[int] = []
+    for item in updates:
+        object_uid = item.get("object_uid", "")
+        results.append({"uid": object_uid, "ok": False, "error": None})
+        if not isinstance(object_uid, str) or not object_uid.startswith("urn:crux:uid::"):
+            results[-1]["error"] = f"Invalid CRUX UID format for update: {object_uid}"
+        else:
+            candidates.append(len(results) - 1)
+
+    try:
+        stored = backend.read_batch(NAMESPACE_OBJECTS, [updates[i]["object_uid"].split('::')[-1] for i in candidates])
+    except Exception as e:
+        log_internal_error("update_objects_many", {"message": f"Batch read failed: {e}"})
+        stored = [e] * len(candidates)
+
+    pending: List[Tuple[int, Tuple[str, Dict[str, Any], Dict[str, Any]]]] = []
+    for i, current in zip(candidates, stored):
+        if isinstance(current, Exception):
+            results[i]["error"] = f"Error reading object for update: {current}"
+            continue
+        if current is None:
+            results[i]["error"] = "Object not found for update."
+            continue
+        try:
+            meta = _next_object_metadata(current[1], updates[i].get("update_metadata"))
+            pending.append((i, (updates[i]["object_uid"].split('::')[-1], updates[i]["updated_object_payload"], meta)))
+        except Exception as e:
+            results[i]["error"] = f"Error preparing update: {e}"
+
+    _write_batch_into(backend, NAMESPACE_OBJECTS, pending, results, "update_objects_many")
+    return results
+
+# Append-only per-object event logs. Appending an event is O(1) regardless of object size;
+# owners of an object type decide how events fold into the payload and when to compact.
+
+def mock_lc_mem_core_append_event(object_uid: str, event: Dict[str, Any], requesting_persona_context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Appends `event` to the object's log. Returns the event_id (assigned if missing), or None on failure."""
+    if not object_uid.startswith("urn:crux:uid::"):
+        log_internal_error("mock_lc_mem_core_append_event", {"message": f"Invalid CRUX UID format for append_event: {object_uid}"})
+        return None
+
+    uid_hex = object_uid.split('::')[-1]
+    backend = get_storage_backend()
+
+    if not backend.exists(NAMESPACE_OBJECTS, uid_hex):
+        log_internal_error("mock_lc_mem_core_append_event", {"message": f"Object {object_uid} not found for append_event."})
+        return None
+
+    try:
+        event = dict(event)
+        event.setdefault("event_id", uuid.uuid4().hex)
+        event.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        backend.append_event(NAMESPACE_OBJECTS, uid_hex, event)
+        return event["event_id"]
+    except Exception as e:
+        log_internal_error("mock_lc_mem_core_append_event", {"message": f"Error appending event to {object_uid}: {e}"})
+        return None
+
+def mock_lc_mem_core_get_events(object_uid: str, requesting_persona_context: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+    """Returns the object's pending (not yet compacted) events in order, or None on error."""
+    if not object_uid.startswith("urn:crux:uid::"):
+        log_internal_error("mock_lc_mem_core_get_events", {"message": f"Invalid CRUX UID format for get_events: {object_uid}"})
+        return None
+    try:
+        return get_storage_backend().read_events(NAMESPACE_OBJECTS, object_uid.split('::')[-1])
+    except Exception as e:
+        log_internal_error("mock_lc_mem_core_get_events", {"message": f"Error reading events for {object_uid}: {e}"})
+        return None
+
+def mock_lc_mem_core_count_events(object_uid: str, requesting_persona_context: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """Number of pending events in the object's log, without decoding them, or None on error."""
+    if not object_uid.startswith("urn:crux:uid::"):
+        log_internal_error("mock_lc_mem_core_count_events", {"message": f"Invalid CRUX UID format for count_events: {object_uid}"})
+        return None
+    try:
+        return get_storage_backend().count_events(NAMESPACE_OBJECTS, object_uid.split('::')[-1])
+    except Exception as e:
+        log_internal_error("mock_lc_mem_core_count_events", {"message": f"Error counting events for {object_uid}: {e}"})
+        return None
+
+def mock_lc_mem_core_trim_events(object_uid: str, through_event_id: str, requesting_persona_context: Optional[Dict[str, Any]] = None) -> bool:
+    """Drops events up to and including `through_event_id`, once they have been folded into the payload."""
+    if not object_uid.startswith("urn:crux:uid::"):
+        log_internal_error("mock_lc_mem_core_trim_events", {"message": f"Invalid CRUX UID format for trim_events: {object_uid}"})
+        return False
+    try:
+        removed = get_storage_backend().trim_events(NAMESPACE_OBJECTS, object_uid.split('::')[-1], through_event_id)
+        log_internal_info("mock_lc_mem_core_trim_events", {"message": f"Trimmed {removed} events from {object_uid}."})
+        return True
+    except Exception as e:
+        log_internal_error("mock_lc_mem_core_trim_events", {"message": f"Error trimming events for {object_uid}: {e}"})
+        return False
+
+def _cached_read(backend: MemStorageBackend, namespace: str, uid_hex: str, with_metadata: bool = True) -> Optional[Any]:
+    """
+    Read-through OBJECT_CACHE lookup. Returns what backend.read (or read_payload when
+    `with_metadata` is False) would, as a private copy the caller may mutate.
+    """
+    key = (namespace, uid_hex, with_metadata)
+    token = backend.version_token(namespace, uid_hex) if OBJECT_CACHE.enabled else None
+    if token is not None:
+        cached = OBJECT_CACHE.get(key, token)
+        if cached is not None:
+            return cached
+    stored = backend.read(namespace, uid_hex) if with_metadata else backend.read_payload(namespace, uid_hex)
+    if stored is not None:
+        OBJECT_CACHE.put(key, stored, token)
+    return stored
+
+def _read_many_cached(backend: MemStorageBackend, namespace: str, uid_hexes: List[str], with_metadata: bool = True) -> List[Any]:
+    """Batch form of _cached_read. Cache misses are fetched with one backend.read_batch call; per-item errors are returned as Exceptions."""
+    results: List[Any] = [None] * len(uid_hexes)
+    misses: List[int] = []
+    tokens: List[Any] = [None] * len(uid_hexes)
+    for i, uid_hex in enumerate(uid_hexes):
+        if OBJECT_CACHE.enabled:
+            try:
+                tokens[i] = backend.version_token(namespace, uid_hex)
+            except Exception:
+                tokens[i] = None
+            if tokens[i] is not None:
+                cached = OBJECT_CACHE.get((namespace, uid_hex, with_metadata), tokens[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+        misses.append(i)
+    if misses:
+        fetched = backend.read_batch(namespace, [uid_hexes[i] for i in misses], with_metadata)
+        for i, stored in zip(misses, fetched):
+            results[i] = stored
+            if stored is not None and not isinstance(stored, Exception):
+                OBJECT_CACHE.put((namespace, uid_hexes[i], with_metadata), stored, tokens[i])
+    return results
+
+def _write_batch_into(backend: MemStorageBackend, namespace: str, pending: List[Tuple[int, Tuple[str, Dict[str, Any], Dict[str, Any]]]],
+                      results: List[Dict[str, Any]], func_name: str):
+    """Writes the prepared (result position, (uid_hex, payload, metadata)) items and records per-item outcomes in `results`."""
+    if not pending:
+        return
+    try:
+        errors = backend.write_batch(namespace, [item for _, item in pending])
+    except Exception as e:
+        errors = [e] * len(pending)
+    for (i, (uid_hex, _, metadata)), error in zip(pending, errors):
+        _cache_invalidate(namespace, uid_hex)
+        if error is None:
+            results[i]["ok"] = True
+            if namespace == NAMESPACE_OBJECTS:
+                _object_type_index_put(uid_hex, metadata)
+        else:
+            results[i]["error"] = f"Error writing object: {error}"
+            log_internal_error(func_name, {"message": f"Failed to write {backend.describe(namespace, uid_hex)}: {error}"})
+    log_internal_info(func_name, {"message": f"Wrote {sum(error is None for error in errors)}/{len(pending)} objects."})
+
+def _initial_object_metadata(object_uid: str, object_payload: Dict[str, Any], initial_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    meta_to_store = initial_metadata if initial_metadata else {}
+    meta_to_store['crux_uid'] = object_uid
+    meta_to_store.setdefault('object_type', object_payload.get("type", "Unknown")) # Caller's object_type wins; else try the payload
+    meta_to_store['created_at'] = datetime.now(timezone.utc).isoformat() # Use timezone.utc
+    meta_to_store['version'] = meta_to_store.get('version', "0.1.0") # Default version
+    return meta_to_store
+
+def _next_object_metadata(current_meta: Dict[str, Any], update_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    current_meta['updated_at'] = datetime.now(timezone.utc).isoformat()
+    if update_metadata and 'version' in update_metadata:
+        current_meta['version'] = update_metadata['version']
+    elif 'version' in current_meta: # Basic increment if version exists
+        parts = str(current_meta['version']).split('.')
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            parts[-1] = str(int(parts[-1]) + 1)
+            current_meta['version'] = ".".join(parts)
+        else: # Non-standard version, just mark updated
+             current_meta['version'] = str(current_meta['version']) + "_updated"
+    else:
+        current_meta['version'] = "0.1.1" # Default next version from 0.1.0
+
+    if update_metadata: # Merge any other metadata provided
+        for key, value in update_metadata.items():
+            if key not in ['crux_uid', 'created_at', 'updated_at']: # Avoid overwriting critical/managed meta
+                current_meta[key] = value
+    return current_meta
+
+def _object_type_index_put(uid_hex: str, metadata: Dict[str, Any]):
+    # Index failures must not fail the write itself; rebuild_indexes() repairs a stale manifest.
+    try:
+        OBJECT_TYPE_INDEX.put(uid_hex, metadata)
+    except Exception as e:
+        log_internal_error("_object_type_index_put", {"message": f"Failed to index object {uid_hex}: {e}"})
+
+def _object_type_index_remove(uid_hex: str):
+    try:
+        OBJECT_TYPE_INDEX.remove(uid_hex)
+    except Exception as e:
+        log_internal_error("_object_type_index_remove", {"message": f"Failed to unindex object {uid_hex}: {e}"})
+
+def _cache_invalidate(namespace: str, uid_hex: str):
+    for with_metadata in (True, False):
+        OBJECT_CACHE.invalidate((namespace, uid_hex, with_metadata))
+
+def _discard_partial_object(backend: MemStorageBackend, namespace: str, uid_hex: str):
+    # Best-effort cleanup after a failed create so no half-written object is left behind.
+    try:
+        backend.delete(namespace, uid_hex)
+    except Exception as e:
+        log_internal_error("_discard_partial_object", {"message": f"Failed to clean up {backend.describe(namespace, uid_hex)}: {e}"})
+
 # END_OF_LC_MEM_SERVICE_FUNCTIONS_SEPARATOR_
 
 # ==============================================================================
@@ -318,16 +639,9 @@ def create_pbi(pbi_data: Dict[str, Any], requesting_persona_context: Optional[Di
     pbi_data_final.setdefault("priority", "Medium")
 
     uid_hex = pbi_uid.split('::')[-1]
-    pbi_specific_dir = PBI_VAULT_DIR / uid_hex
-    pbi_specific_dir.mkdir(parents=True, exist_ok=True)
-    
-    object_file_path = pbi_specific_dir / "object_payload.json"
-    metadata_file_path = pbi_specific_dir / "metadata.json"
+    backend = get_storage_backend()
 
     try:
-        with open(object_file_path, 'w') as f:
-            json.dump(pbi_data_final, f, indent=2)
-        
         pbi_metadata = {
             "crux_uid": pbi_uid,
             "object_type": PBI_OBJECT_TYPE,
@@ -338,16 +652,15 @@ def create_pbi(pbi_data: Dict[str, Any], requesting_persona_context: Optional[Di
             "status": pbi_data_final.get("status"),
             "priority": pbi_data_final.get("priority")
         }
-        with open(metadata_file_path, 'w') as f:
-            json.dump(pbi_metadata, f, indent=2)
-        
+        backend.write(NAMESPACE_PBIS, uid_hex, pbi_data_final, pbi_metadata)
+        _cache_invalidate(NAMESPACE_PBIS, uid_hex)
+
+        _pbi_index_put(uid_hex, pbi_data_final)
         log_internal_info("create_pbi", {"message": f"PBI {pbi_uid} created successfully."})
         return pbi_uid
     except Exception as e:
         log_internal_error("create_pbi", {"message": f"Error creating PBI {pbi_uid}: {e}"})
-        if object_file_path.exists(): object_file_path.unlink(missing_ok=True) # Python 3.8+
-        if metadata_file_path.exists(): metadata_file_path.unlink(missing_ok=True)
-        if pbi_specific_dir.exists() and not any(pbi_specific_dir.iterdir()): pbi_specific_dir.rmdir()
+        _discard_partial_object(backend, NAMESPACE_PBIS, uid_hex)
         return None
 
 def get_pbi(pbi_uid: str, requesting_persona_context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
@@ -356,23 +669,17 @@ def get_pbi(pbi_uid: str, requesting_persona_context: Optional[Dict[str, Any]] =
         return None
     
     uid_hex = pbi_uid.split('::')[-1]
-    pbi_dir = PBI_VAULT_DIR / uid_hex
-    object_file_path = pbi_dir / "object_payload.json"
-    metadata_file_path = pbi_dir / "metadata.json" # To verify object_type
-
-    if not object_file_path.exists() or not metadata_file_path.exists():
-        log_internal_info("get_pbi", {"message": f"PBI {pbi_uid} not found."})
-        return None
     
     try:
-        with open(metadata_file_path, 'r') as f:
-            meta = json.load(f)
+        stored = _cached_read(get_storage_backend(), NAMESPACE_PBIS, uid_hex) # Metadata is read to verify object_type
+        if stored is None:
+            log_internal_info("get_pbi", {"message": f"PBI {pbi_uid} not found."})
+            return None
+        payload, meta = stored
         if meta.get("object_type") != PBI_OBJECT_TYPE:
             log_internal_error("get_pbi", {"message": f"Object {pbi_uid} is not of type {PBI_OBJECT_TYPE}."})
             return None
 
-        with open(object_file_path, 'r') as f:
-            payload = json.load(f)
         log_internal_info("get_pbi", {"message": f"PBI {pbi_uid} retrieved successfully."})
         return payload
     except Exception as e:
@@ -385,19 +692,14 @@ def update_pbi(pbi_uid: str, updates: Dict[str, Any], requesting_persona_context
         return False
 
     uid_hex = pbi_uid.split('::')[-1]
-    pbi_dir = PBI_VAULT_DIR / uid_hex
-    object_file_path = pbi_dir / "object_payload.json"
-    metadata_file_path = pbi_dir / "metadata.json"
-
-    if not object_file_path.exists() or not metadata_file_path.exists():
-        log_internal_error("update_pbi", {"message": f"PBI {pbi_uid} not found for update."})
-        return False
+    backend = get_storage_backend()
 
     try:
-        with open(object_file_path, 'r') as f:
-            current_payload = json.load(f)
-        with open(metadata_file_path, 'r') as f:
-            current_metadata = json.load(f)
+        stored = backend.read(NAMESPACE_PBIS, uid_hex)
+        if stored is None:
+            log_internal_error("update_pbi", {"message": f"PBI {pbi_uid} not found for update."})
+            return False
+        current_payload, current_metadata = stored
 
         if current_metadata.get("object_type") != PBI_OBJECT_TYPE:
              log_internal_error("update_pbi", {"message": f"Object {pbi_uid} is not of type {PBI_OBJECT_TYPE}."})
@@ -413,19 +715,18 @@ def update_pbi(pbi_uid: str, updates: Dict[str, Any], requesting_persona_context
         
         if has_payload_updates or updates.get("status") or updates.get("priority") or updates.get("title"): # Check if metadata relevant fields changed
             current_payload["updated_at"] = datetime.now(timezone.utc).isoformat()
-            with open(object_file_path, 'w') as f:
-                json.dump(current_payload, f, indent=2)
 
-            # Update metadata file
+            # Update metadata alongside the payload
             current_metadata["updated_at"] = current_payload["updated_at"]
             if updates.get("title"): current_metadata["title"] = updates["title"]
             if updates.get("status"): current_metadata["status"] = updates["status"]
             if updates.get("priority"): current_metadata["priority"] = updates["priority"]
             if updates.get("pbi_schema_version"): current_metadata["pbi_schema_version"] = updates["pbi_schema_version"] # Allow schema version update
 
-            with open(metadata_file_path, 'w') as f:
-                json.dump(current_metadata, f, indent=2)
-            
+            backend.write(NAMESPACE_PBIS, uid_hex, current_payload, current_metadata)
+            _cache_invalidate(NAMESPACE_PBIS, uid_hex)
+
+            _pbi_index_put(uid_hex, current_payload)
             log_internal_info("update_pbi", {"message": f"PBI {pbi_uid} updated successfully."})
         else:
             log_internal_info("update_pbi", {"message": f"No effective updates for PBI {pbi_uid}."})
@@ -441,43 +742,71 @@ def delete_pbi(pbi_uid: str, requesting_persona_context: Optional[Dict[str, Any]
         return False
 
     uid_hex = pbi_uid.split('::')[-1]
-    pbi_dir = PBI_VAULT_DIR / uid_hex
-
-    if not pbi_dir.exists():
-        log_internal_info("delete_pbi", {"message": f"PBI directory {pbi_dir} for UID {pbi_uid} not found. Considered deleted."})
-        return True 
+    backend = get_storage_backend()
+    location = backend.describe(NAMESPACE_PBIS, uid_hex)
 
     try:
-        shutil.rmtree(pbi_dir)
-        log_internal_info("delete_pbi", {"message": f"PBI {pbi_uid} and its directory {pbi_dir} deleted successfully."})
+        _cache_invalidate(NAMESPACE_PBIS, uid_hex)
+        if not backend.delete(NAMESPACE_PBIS, uid_hex):
+            log_internal_info("delete_pbi", {"message": f"PBI {location} for UID {pbi_uid} not found. Considered deleted."})
+            return True 
+        _pbi_index_remove(uid_hex)
+        log_internal_info("delete_pbi", {"message": f"PBI {pbi_uid} at {location} deleted successfully."})
         return True
     except Exception as e:
         log_internal_error("delete_pbi", {"message": f"Error deleting PBI {pbi_uid}: {e}"})
         return False
 
-def query_pbis(query_params: Dict[str, Any], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+def _pbi_index_put(uid_hex: str, pbi_payload: Dict[str, Any]):
+    # Index failures must not fail the write itself; a stale index is repaired by rebuild.
+    try:
+        PBI_INDEX.put(uid_hex, pbi_payload)
+    except Exception as e:
+        log_internal_error("_pbi_index_put", {"message": f"Failed to index PBI {uid_hex}: {e}"})
+
+def _pbi_index_remove(uid_hex: str):
+    try:
+        PBI_INDEX.remove(uid_hex)
+    except Exception as e:
+        log_internal_error("_pbi_index_remove", {"message": f"Failed to unindex PBI {uid_hex}: {e}"})
+
+def _pbi_matches_query(pbi_data: Dict[str, Any], query_params: Dict[str, Any]) -> bool:
+    # Exact-match filters
+    for key in ["status", "priority", "pbi_type", "cynefin_domain_context"]:
+        if key in query_params and pbi_data.get(key) != query_params[key]:
+            return False
+    # Membership filters: query key -> PBI list field
+    for key, list_field in [("related_oia_cycle_uid", "related_oia_cycle_uids"),
+                            ("related_rdsotm_cycle_linkage_uid", "related_rdsotm_cycle_linkage_uids"),
+                            ("related_rdsotm_component_uid", "related_rdsotm_component_uids")]:
+        if key in query_params and query_params[key] not in pbi_data.get(list_field, []):
+            return False
+    return True
+
+def _query_pbis_indexed(query_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Resolves candidate PBIs from PBI_INDEX and only reads those payloads.
+    Every candidate is re-checked against the payload, so an entry left over from a
+    changed or deleted PBI only costs an extra read. A PBI the index never recorded (its
+    index write failed after the object was stored) is not found until rebuild_indexes()
+    runs. Falls back to a full scan if the index is unusable.
+    """
     results: List[Dict[str, Any]] = []
-    if not PBI_VAULT_DIR.exists():
-        return results
-
-    for pbi_uuid_dir in PBI_VAULT_DIR.iterdir():
-        if pbi_uuid_dir.is_dir():
-            pbi_uid = f"urn:crux:uid::{pbi_uuid_dir.name}"
-            pbi_data = get_pbi(pbi_uid) # This uses the get_pbi function which checks metadata for object_type
-            if pbi_data:
-                match = True
-                # Filter by status
-                if "status" in query_params and pbi_data.get("status") != query_params["status"]:
-                    match = False
-                # Filter by priority
-                if match and "priority" in query_params and pbi_data.get("priority") != query_params["priority"]:
-                    match = False
-                # Add more filters here as needed based on PBI schema and query_params structure
-                # e.g., assignee_persona_uids (check if value is in list), tags_keywords (any or all), etc.
-
-                if match:
-                    results.append(pbi_data)
-    
+
+    try:
+        candidate_hexes = sorted(PBI_INDEX.lookup(query_params))
+    except Exception as e:
+        log_internal_error("_query_pbis_indexed", {"message": f"PBI index unavailable, falling back to directory scan: {e}"})
+        candidate_hexes = sorted(get_storage_backend().list_uid_hexes(NAMESPACE_PBIS))
+
+    for uid_hex in candidate_hexes:
+        pbi_data = get_pbi(f"urn:crux:uid::{uid_hex}") # get_pbi checks metadata for object_type
+        if pbi_data and _pbi_matches_query(pbi_data, query_params):
+            results.append(pbi_data)
+    return results
+
+def query_pbis(query_params: Dict[str, Any], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    results = _query_pbis_indexed(query_params)
     log_internal_info("query_pbis", {"message": f"PBI Query completed. Found {len(results)} results for params: {query_params}"})
     return results
 
@@ -503,16 +832,9 @@ def create_agent_profile(profile_data: Dict[str, Any], requesting_persona_contex
 
 
     uid_hex = agent_profile_uid.split('::')[-1]
-    profile_specific_dir = AGENT_PROFILE_VAULT_DIR / uid_hex
-    profile_specific_dir.mkdir(parents=True, exist_ok=True)
-    
-    object_file_path = profile_specific_dir / "object_payload.json"
-    metadata_file_path = profile_specific_dir / "metadata.json"
+    backend = get_storage_backend()
 
     try:
-        with open(object_file_path, 'w') as f:
-            json.dump(profile_data_final, f, indent=2)
-        
         profile_metadata = {
             "crux_uid": agent_profile_uid,
             "object_type": AGENT_PROFILE_OBJECT_TYPE,
@@ -523,16 +845,15 @@ def create_agent_profile(profile_data: Dict[str, Any], requesting_persona_contex
             "agent_type": profile_data_final.get("agent_type"),
             "status": profile_data_final.get("status")
         }
-        with open(metadata_file_path, 'w') as f:
-            json.dump(profile_metadata, f, indent=2)
+        backend.write(NAMESPACE_AGENT_PROFILES, uid_hex, profile_data_final, profile_metadata)
+        _cache_invalidate(NAMESPACE_AGENT_PROFILES, uid_hex)
+        _agent_profile_index_put(uid_hex, profile_data_final)
         
         log_internal_info("create_agent_profile", {"message": f"AgentProfile {agent_profile_uid} created successfully."})
         return agent_profile_uid
     except Exception as e:
         log_internal_error("create_agent_profile", {"message": f"Error creating AgentProfile {agent_profile_uid}: {e}"})
-        if object_file_path.exists(): object_file_path.unlink(missing_ok=True)
-        if metadata_file_path.exists(): metadata_file_path.unlink(missing_ok=True)
-        if profile_specific_dir.exists() and not any(profile_specific_dir.iterdir()): profile_specific_dir.rmdir()
+        _discard_partial_object(backend, NAMESPACE_AGENT_PROFILES, uid_hex)
         return None
 
 def get_agent_profile(agent_profile_uid: str, requesting_persona_context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
@@ -541,23 +862,17 @@ def get_agent_profile(agent_profile_uid: str, requesting_persona_context: Option
         return None
     
     uid_hex = agent_profile_uid.split('::')[-1]
-    profile_dir = AGENT_PROFILE_VAULT_DIR / uid_hex
-    object_file_path = profile_dir / "object_payload.json"
-    metadata_file_path = profile_dir / "metadata.json"
-
-    if not object_file_path.exists() or not metadata_file_path.exists():
-        log_internal_info("get_agent_profile", {"message": f"AgentProfile {agent_profile_uid} not found."})
-        return None
     
     try:
-        with open(metadata_file_path, 'r') as f:
-            meta = json.load(f)
+        stored = _cached_read(get_storage_backend(), NAMESPACE_AGENT_PROFILES, uid_hex)
+        if stored is None:
+            log_internal_info("get_agent_profile", {"message": f"AgentProfile {agent_profile_uid} not found."})
+            return None
+        payload, meta = stored
         if meta.get("object_type") != AGENT_PROFILE_OBJECT_TYPE:
             log_internal_error("get_agent_profile", {"message": f"Object {agent_profile_uid} is not of type {AGENT_PROFILE_OBJECT_TYPE}."})
             return None
 
-        with open(object_file_path, 'r') as f:
-            payload = json.load(f)
         log_internal_info("get_agent_profile", {"message": f"AgentProfile {agent_profile_uid} retrieved successfully."})
         return payload
     except Exception as e:
@@ -570,19 +885,14 @@ def update_agent_profile(agent_profile_uid: str, updates: Dict[str, Any], reques
         return False
 
     uid_hex = agent_profile_uid.split('::')[-1]
-    profile_dir = AGENT_PROFILE_VAULT_DIR / uid_hex
-    object_file_path = profile_dir / "object_payload.json"
-    metadata_file_path = profile_dir / "metadata.json"
-
-    if not object_file_path.exists() or not metadata_file_path.exists():
-        log_internal_error("update_agent_profile", {"message": f"AgentProfile {agent_profile_uid} not found for update."})
-        return False
+    backend = get_storage_backend()
 
     try:
-        with open(object_file_path, 'r') as f:
-            current_payload = json.load(f)
-        with open(metadata_file_path, 'r') as f:
-            current_metadata = json.load(f)
+        stored = backend.read(NAMESPACE_AGENT_PROFILES, uid_hex)
+        if stored is None:
+            log_internal_error("update_agent_profile", {"message": f"AgentProfile {agent_profile_uid} not found for update."})
+            return False
+        current_payload, current_metadata = stored
 
         if current_metadata.get("object_type") != AGENT_PROFILE_OBJECT_TYPE:
              log_internal_error("update_agent_profile", {"message": f"Object {agent_profile_uid} is not of type {AGENT_PROFILE_OBJECT_TYPE}."})
@@ -601,16 +911,15 @@ def update_agent_profile(agent_profile_uid: str, updates: Dict[str, Any], reques
 
         if has_payload_updates or needs_metadata_update:
             current_payload["updated_at"] = datetime.now(timezone.utc).isoformat()
-            with open(object_file_path, 'w') as f:
-                json.dump(current_payload, f, indent=2)
 
             current_metadata["updated_at"] = current_payload["updated_at"]
             for field in metadata_updated_fields:
                 if updates.get(field) and updates.get(field) != current_metadata.get(field):
                      current_metadata[field] = updates[field]
             
-            with open(metadata_file_path, 'w') as f:
-                json.dump(current_metadata, f, indent=2)
+            backend.write(NAMESPACE_AGENT_PROFILES, uid_hex, current_payload, current_metadata)
+            _cache_invalidate(NAMESPACE_AGENT_PROFILES, uid_hex)
+            _agent_profile_index_put(uid_hex, current_payload)
             
             log_internal_info("update_agent_profile", {"message": f"AgentProfile {agent_profile_uid} updated successfully."})
         else:
@@ -627,47 +936,70 @@ def delete_agent_profile(agent_profile_uid: str, requesting_persona_context: Opt
         return False
 
     uid_hex = agent_profile_uid.split('::')[-1]
-    profile_dir = AGENT_PROFILE_VAULT_DIR / uid_hex
-
-    if not profile_dir.exists():
-        log_internal_info("delete_agent_profile", {"message": f"AgentProfile directory {profile_dir} for UID {agent_profile_uid} not found. Considered deleted."})
-        return True 
+    backend = get_storage_backend()
+    location = backend.describe(NAMESPACE_AGENT_PROFILES, uid_hex)
 
     try:
-        shutil.rmtree(profile_dir)
-        log_internal_info("delete_agent_profile", {"message": f"AgentProfile {agent_profile_uid} and its directory {profile_dir} deleted successfully."})
+        _cache_invalidate(NAMESPACE_AGENT_PROFILES, uid_hex)
+        if not backend.delete(NAMESPACE_AGENT_PROFILES, uid_hex):
+            log_internal_info("delete_agent_profile", {"message": f"AgentProfile {location} for UID {agent_profile_uid} not found. Considered deleted."})
+            return True 
+        _agent_profile_index_remove(uid_hex)
+        log_internal_info("delete_agent_profile", {"message": f"AgentProfile {agent_profile_uid} at {location} deleted successfully."})
         return True
     except Exception as e:
         log_internal_error("delete_agent_profile", {"message": f"Error deleting AgentProfile {agent_profile_uid}: {e}"})
         return False
 
+def _agent_profile_index_put(uid_hex: str, profile_payload: Dict[str, Any]):
+    # As with PBIs, index failures must not fail the write; queries re-verify every candidate.
+    try:
+        AGENT_PROFILE_INDEX.put(uid_hex, _agent_profile_index_doc(profile_payload))
+    except Exception as e:
+        log_internal_error("_agent_profile_index_put", {"message": f"Failed to index AgentProfile {uid_hex}: {e}"})
+
+def _agent_profile_index_remove(uid_hex: str):
+    try:
+        AGENT_PROFILE_INDEX.remove(uid_hex)
+    except Exception as e:
+        log_internal_error("_agent_profile_index_remove", {"message": f"Failed to unindex AgentProfile {uid_hex}: {e}"})
+
+def _agent_profile_matches_query(profile_data: Dict[str, Any], query_params: Dict[str, Any]) -> bool:
+    doc = _agent_profile_index_doc(profile_data)
+    for key in ("agent_type", "model_name"):
+        if key in query_params and profile_data.get(key) != query_params[key]:
+            return False
+    # Every required capability/tool must be present
+    for key in ("capabilities", "tools"):
+        if key in query_params:
+            required = query_params[key]
+            if isinstance(required, str): # Single capability/tool string
+                required = [required]
+            if not all(req in doc[key] for req in required):
+                return False
+    return True
+
 def query_agent_profiles(query_params: Dict[str, Any], requesting_persona_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
-    if not AGENT_PROFILE_VAULT_DIR.exists():
-        return results
-
-    for profile_uuid_dir in AGENT_PROFILE_VAULT_DIR.iterdir():
-        if profile_uuid_dir.is_dir():
-            profile_uid = f"urn:crux:uid::{profile_uuid_dir.name}"
-            profile_data = get_agent_profile(profile_uid) # Uses get_agent_profile which checks object_type
-            if profile_data:
-                match = True
-                
-                if "agent_type" in query_params and profile_data.get("agent_type") != query_params["agent_type"]:
-                    match = False
-                
-                if match and "capabilities" in query_params:
-                    required_caps = query_params["capabilities"]
-                    if isinstance(required_caps, str): # Single capability string
-                        required_caps = [required_caps]
-                    
-                    agent_caps = profile_data.get("capabilities", [])
-                    if not all(req_cap in agent_caps for req_cap in required_caps):
-                        match = False
-                
-                if match:
-                    results.append(profile_data)
-    
+    backend = get_storage_backend()
+
+    criteria = {key: [value] if key in ("capabilities", "tools") and isinstance(value, str) else value for key, value in query_params.items()}
+    try:
+        candidate_hexes = sorted(AGENT_PROFILE_INDEX.lookup(criteria))
+    except Exception as e:
+        log_internal_error("query_agent_profiles", {"message": f"AgentProfile index unavailable, falling back to full scan: {e}"})
+        candidate_hexes = sorted(backend.list_uid_hexes(NAMESPACE_AGENT_PROFILES))
+
+    # Only the candidates are loaded, in one batch; each is re-checked so a stale index cannot return a wrong profile.
+    for uid_hex, stored in zip(candidate_hexes, _read_many_cached(backend, NAMESPACE_AGENT_PROFILES, candidate_hexes)):
+        if isinstance(stored, Exception):
+            log_internal_error("query_agent_profiles", {"message": f"Error retrieving AgentProfile {uid_hex}: {stored}"})
+            continue
+        if stored is None or stored[1].get("object_type") != AGENT_PROFILE_OBJECT_TYPE:
+            continue
+        if _agent_profile_matches_query(stored[0], query_params):
+            results.append(stored[0])
+
     log_internal_info("query_agent_profiles", {"message": f"AgentProfile Query completed. Found {len(results)} results for params: {query_params}"})
     return results
 
@@ -0,0 +1,927 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Iterable, Union
+
+from .lc_mem_codec import Codec, JSON_CODEC, decode as decode_value, dumps_json_line, get_codec
+from .lc_logging import get_logger, log_info_sampled
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows; recover() then goes by file age alone.
+    fcntl = None
+
+# Pluggable storage engines for lC.MEM.CORE (see lc_mem_service.py).
+#
+# Objects are addressed by (namespace, uid_hex). The namespaces mirror the
+# vault layout: general MADA objects, PBIs and AgentProfiles. Every backend
+# stores a JSON payload plus a JSON metadata dict per object.
+
+NAMESPACE_OBJECTS = "objects"
+NAMESPACE_PBIS = "pbis"
+NAMESPACE_AGENT_PROFILES = "agent_profiles"
+NAMESPACES = [NAMESPACE_OBJECTS, NAMESPACE_PBIS, NAMESPACE_AGENT_PROFILES]
+
+# Worker threads used by the directory backend for batch reads/writes. File I/O
+# releases the GIL, so a small pool overlaps the per-object open/read latency.
+BATCH_IO_WORKERS = 8
+
+# recover() runs whenever a process opens the vault, possibly while another
+# process is writing to it. A writer holds an flock on its journal record until
+# the write is done, so recovery skips records that are still locked. It also
+# only clears uncommitted journal temp files older than this (and, without
+# fcntl, only replays committed records older than this).
+JOURNAL_GRACE_SECONDS = 60
+
+# Directory vault layouts. 'flat' keeps one directory per object directly under
+# its namespace directory; 'sharded' nests it two levels down under prefixes of
+# a hash of the uid (<ns>/ab/cd/<uid_hex>) so no directory grows past a few
+# thousand entries.
+LAYOUT_FLAT = "flat"
+LAYOUT_SHARDED = "sharded"
+LAYOUTS = [LAYOUT_FLAT, LAYOUT_SHARDED]
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+def log_internal_info(func_name: str, params: dict): log_info_sampled(_logger, func_name, "INFO:%s:%s", func_name, params)
+
+
+def _atomic_write_bytes(path: Path, data: bytes, fsync: bool = False):
+    """
+    Writes `data` to a temp file beside `path` and renames it into place, so
+    readers see either the old or the new file, never a truncated one. With
+    `fsync` the data is also flushed to disk before the rename.
+    """
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _unlink_if_exists(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class MemStorageBackend:
+    """
+    Interface every lC.MEM.CORE storage engine implements.
+
+    Reads return None for missing objects and raise on I/O or decode errors;
+    the service layer decides how to log and surface those.
+    """
+
+    name = "abstract"
+    codec: Codec = JSON_CODEC
+
+    def exists(self, namespace: str, uid_hex: str) -> bool:
+        raise NotImplementedError
+
+    def read_payload(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def read_metadata(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def read(self, namespace: str, uid_hex: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Returns (payload, metadata), or None unless both are present."""
+        payload = self.read_payload(namespace, uid_hex)
+        metadata = self.read_metadata(namespace, uid_hex)
+        if payload is None or metadata is None:
+            return None
+        return payload, metadata
+
+    def write(self, namespace: str, uid_hex: str, payload: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def write_many(self, namespace: str, items: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> int:
+        """Writes (uid_hex, payload, metadata) triples. Returns the number written."""
+        count = 0
+        for uid_hex, payload, metadata in items:
+            self.write(namespace, uid_hex, payload, metadata)
+            count += 1
+        return count
+
+    def read_batch(self, namespace: str, uid_hexes: List[str], with_metadata: bool = True) -> List[Union[None, Any, Exception]]:
+        """
+        Reads many objects. Returns one entry per uid_hex, in input order: what
+        read() (or read_payload() when `with_metadata` is False) would return, or
+        the Exception raised for that item.
+        """
+        results: List[Union[None, Any, Exception]] = []
+        for uid_hex in uid_hexes:
+            results.append(self._read_item(namespace, uid_hex, with_metadata))
+        return results
+
+    def write_batch(self, namespace: str, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Exception]]:
+        """
+        Writes (uid_hex, payload, metadata) triples. Returns one entry per item, in
+        input order: None on success or the Exception that item failed with.
+        """
+        return [self._write_item(namespace, item) for item in items]
+
+    def _read_item(self, namespace: str, uid_hex: str, with_metadata: bool) -> Union[None, Any, Exception]:
+        try:
+            return self.read(namespace, uid_hex) if with_metadata else self.read_payload(namespace, uid_hex)
+        except Exception as e:
+            return e
+
+    def _write_item(self, namespace: str, item: Tuple[str, Dict[str, Any], Dict[str, Any]]) -> Optional[Exception]:
+        uid_hex, payload, metadata = item
+        try:
+            self.write(namespace, uid_hex, payload, metadata)
+            return None
+        except Exception as e:
+            return e
+
+    def delete(self, namespace: str, uid_hex: str) -> bool:
+        """Removes the object. Returns False if it did not exist."""
+        raise NotImplementedError
+
+    def list_uid_hexes(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    # Per-object append-only event logs. Events are JSON dicts carrying a unique
+    # "event_id"; callers fold them over the object payload (see sop_oia_cycle_management).
+
+    def append_event(self, namespace: str, uid_hex: str, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def read_events(self, namespace: str, uid_hex: str) -> List[Dict[str, Any]]:
+        """Returns the object's events in append order ([] if it has none)."""
+        raise NotImplementedError
+
+    def count_events(self, namespace: str, uid_hex: str) -> int:
+        """Number of events in the object's log; backends override this to count without decoding them."""
+        return len(self.read_events(namespace, uid_hex))
+
+    def trim_events(self, namespace: str, uid_hex: str, through_event_id: str) -> int:
+        """Drops events up to and including `through_event_id`. Returns how many were removed."""
+        raise NotImplementedError
+
+    def find_by_object_type(self, namespace: str, object_type: str) -> List[str]:
+        """Returns the CRUX UIDs whose metadata object_type equals `object_type`."""
+        raise NotImplementedError
+
+    def iter_payloads(self, namespace: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self._iter_documents(namespace, self.read_payload, "iter_payloads")
+
+    def iter_metadata(self, namespace: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self._iter_documents(namespace, self.read_metadata, "iter_metadata")
+
+    def _iter_documents(self, namespace: str, reader, func_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for uid_hex in self.list_uid_hexes(namespace):
+            try:
+                document = reader(namespace, uid_hex)
+            except Exception as e:
+                log_internal_error(f"{type(self).__name__}.{func_name}", {"message": f"Skipping unreadable {namespace}/{uid_hex}: {e}"})
+                continue
+            if document is not None:
+                yield uid_hex, document
+
+    def index_dir(self, namespace: str) -> Path:
+        """Directory where on-disk secondary indexes for `namespace` are kept."""
+        raise NotImplementedError
+
+    def version_token(self, namespace: str, uid_hex: str) -> Optional[Any]:
+        """
+        Cheap value that changes whenever the stored object changes (including
+        writes by other processes). Used by the object cache for staleness checks.
+        None means "unknown / missing" and is never cached against.
+        """
+        return None
+
+    def recover(self) -> int:
+        """
+        Startup recovery pass: finishes or discards writes interrupted by a crash.
+        Returns the number of journaled writes replayed.
+        """
+        return 0
+
+    def describe(self, namespace: str, uid_hex: str) -> str:
+        """Human-readable location of an object, for log messages."""
+        return f"{self.name}:{namespace}/{uid_hex}"
+
+
+class DirectoryBackend(MemStorageBackend):
+    """
+    The original vault layout: one `<uid_hex>/` directory per object holding
+    `object_payload.json` and `metadata.json`. General objects live at the vault
+    root, PBIs under `pbis/` and AgentProfiles under `agent_profiles/`.
+
+    Each file is replaced atomically (temp file + os.replace). To keep the
+    payload/metadata pair consistent, a write first records both documents in
+    `.journal/<namespace>.<uid_hex>.json`, then replaces the two files, then
+    drops the journal entry; recover() replays any entry left by a crash.
+    Deletes rename the object directory into `.journal/` before removing it.
+
+    Files are encoded with `codec` (see lc_mem_codec.py) but keep their names;
+    reads sniff each file's format, so a vault may mix codecs.
+
+    With `layout='sharded'` object directories live at `<ns>/ab/cd/<uid_hex>`
+    (see shard_path). Reads, listings and deletes find an object in either
+    layout; writing an object that is still in the other layout moves it first,
+    so a vault migrates online. migrate_vault_layout() moves everything at once.
+    """
+
+    name = "directory"
+
+    def __init__(self, root_dir: Path, io_workers: int = BATCH_IO_WORKERS, fsync: bool = False, codec: Codec = JSON_CODEC,
+                 layout: str = LAYOUT_FLAT):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown lC.MEM.CORE vault layout '{layout}'. Expected one of {LAYOUTS}.")
+        self.root_dir = Path(root_dir)
+        self.io_workers = io_workers
+        self.fsync = fsync
+        self.codec = codec
+        self.layout = layout
+        # Serialises appends against trims within this process (trim rewrites the log file).
+        self._events_lock = threading.Lock()
+
+    def namespace_dir(self, namespace: str) -> Path:
+        if namespace == NAMESPACE_OBJECTS:
+            return self.root_dir
+        return self.root_dir / namespace
+
+    @staticmethod
+    def shard_path(uid_hex: str) -> Path:
+        digest = hashlib.sha1(uid_hex.encode("utf-8")).hexdigest()
+        return Path(digest[:2]) / digest[2:4] / uid_hex
+
+    def layout_dir(self, namespace: str, uid_hex: str, layout: str) -> Path:
+        if layout == LAYOUT_SHARDED:
+            return self.namespace_dir(namespace) / self.shard_path(uid_hex)
+        return self.namespace_dir(namespace) / uid_hex
+
+    def object_dir(self, namespace: str, uid_hex: str) -> Path:
+        """
+        Directory currently holding the object: the configured layout first, then
+        the other one. For an absent object this is where a write would put it.
+        """
+        primary = self.layout_dir(namespace, uid_hex, self.layout)
+        if primary.is_dir():
+            return primary
+        other = self.layout_dir(namespace, uid_hex, LAYOUT_FLAT if self.layout == LAYOUT_SHARDED else LAYOUT_SHARDED)
+        if other.is_dir():
+            return other
+        # A concurrent migration may have moved it between the two checks.
+        return primary
+
+    def _move_into_layout(self, namespace: str, uid_hex: str) -> Path:
+        # Moves the object into the configured layout if it is still in the other one.
+        target = self.layout_dir(namespace, uid_hex, self.layout)
+        current = self.object_dir(namespace, uid_hex)
+        if current != target:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(current, target)
+            except FileNotFoundError: # Moved (or deleted) by someone else meanwhile
+                pass
+        return target
+
+    @staticmethod
+    def _is_shard_name(name: str) -> bool:
+        return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+    def exists(self, namespace: str, uid_hex: str) -> bool:
+        obj_dir = self.object_dir(namespace, uid_hex)
+        return (obj_dir / "object_payload.json").exists() and (obj_dir / "metadata.json").exists()
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return decode_value(data)
+
+    def read_payload(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self.object_dir(namespace, uid_hex) / "object_payload.json")
+
+    def read_metadata(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self.object_dir(namespace, uid_hex) / "metadata.json")
+
+    @property
+    def journal_dir(self) -> Path:
+        return self.root_dir / ".journal"
+
+    def _journal_path(self, namespace: str, uid_hex: str) -> Path:
+        return self.journal_dir / f"{namespace}.{uid_hex}.json"
+
+    def _write_pair(self, namespace: str, uid_hex: str, payload_bytes: bytes, metadata_bytes: bytes):
+        obj_dir = self._move_into_layout(namespace, uid_hex)
+        obj_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write_bytes(obj_dir / "object_payload.json", payload_bytes, self.fsync)
+        _atomic_write_bytes(obj_dir / "metadata.json", metadata_bytes, self.fsync)
+
+    # Journal record: a JSON header line naming the object and the two section lengths,
+    # followed by the already-encoded payload and metadata bytes (any codec, no re-encoding).
+    _JOURNAL_MAGIC = b"lcmem-journal-1\n"
+
+    def write(self, namespace: str, uid_hex: str, payload: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        payload_bytes = self.codec.encode(payload)
+        metadata_bytes = self.codec.encode(metadata)
+        header = json.dumps({"namespace": namespace, "uid_hex": uid_hex, "payload_bytes": len(payload_bytes), "metadata_bytes": len(metadata_bytes)})
+        record = self._JOURNAL_MAGIC + header.encode("utf-8") + b"\n" + payload_bytes + metadata_bytes
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        with self._journaled(self._journal_path(namespace, uid_hex), record):
+            self._write_pair(namespace, uid_hex, payload_bytes, metadata_bytes)
+
+    @contextmanager
+    def _journaled(self, journal_path: Path, record: bytes):
+        """
+        Commits `record` at `journal_path` (temp file + rename), runs the body, then
+        drops the record. The record is flock()ed from before it becomes visible
+        until it is dropped, so recover() in another process never replays it
+        while this write is in progress. If the body raises, the record stays
+        for recover().
+        """
+        tmp_path = journal_path.with_name(f".{journal_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, 'wb') as f:
+            try:
+                f.write(record)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX) # Follows the inode through the rename
+                os.replace(tmp_path, journal_path)
+            except BaseException:
+                _unlink_if_exists(tmp_path)
+                raise
+            yield
+            _unlink_if_exists(journal_path) # Before the lock is released on close
+
+    def recover(self) -> int:
+        if not self.journal_dir.exists():
+            return 0
+        replayed = 0
+        for entry in self.journal_dir.iterdir():
+            try:
+                if entry.name.startswith("deleted-"): # Delete renamed the object away but did not finish removing it
+                    shutil.rmtree(entry, ignore_errors=True)
+                elif entry.name.endswith(".tmp"): # Journal record that was never committed
+                    if time.time() - entry.stat().st_mtime > JOURNAL_GRACE_SECONDS: # Else another process may still be writing it
+                        _unlink_if_exists(entry)
+                elif entry.suffix == ".json":
+                    if self._replay_abandoned_record(entry):
+                        replayed += 1
+            except Exception as e:
+                log_internal_error("DirectoryBackend.recover", {"message": f"Could not recover journal entry {entry}: {e}"})
+        if replayed:
+            log_internal_info("DirectoryBackend.recover", {"message": f"Replayed {replayed} interrupted writes under {self.root_dir}."})
+        return replayed
+
+    def _replay_abandoned_record(self, path: Path) -> bool:
+        """Replays and drops a committed journal record whose writer is gone. Returns False if the record is still in use."""
+        if fcntl is None:
+            if time.time() - path.stat().st_mtime <= JOURNAL_GRACE_SECONDS:
+                return False
+            with open(path, 'rb') as f:
+                self._replay_journal_record(f.read())
+            _unlink_if_exists(path)
+            return True
+        with open(path, 'rb') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError: # A live writer holds it
+                return False
+            try:
+                if os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                    return False # The writer finished and dropped (or replaced) the record after we opened it
+            except FileNotFoundError:
+                return False
+            self._replay_journal_record(f.read())
+            _unlink_if_exists(path)
+            return True
+
+    def _replay_journal_record(self, data: bytes):
+        if data.startswith(b"{"): # Earlier single-document JSON record
+            record = json.loads(data)
+            self._write_pair(record["namespace"], record["uid_hex"], self.codec.encode(record["payload"]), self.codec.encode(record["metadata"]))
+            return
+        if not data.startswith(self._JOURNAL_MAGIC):
+            raise ValueError("unrecognised journal record format")
+        header_end = data.index(b"\n", len(self._JOURNAL_MAGIC))
+        header = json.loads(data[len(self._JOURNAL_MAGIC):header_end])
+        body = data[header_end + 1:]
+        if len(body) != header["payload_bytes"] + header["metadata_bytes"]:
+            raise ValueError("journal record is incomplete")
+        split = header["payload_bytes"]
+        self._write_pair(header["namespace"], header["uid_hex"], body[:split], body[split:])
+
+    def _events_path(self, namespace: str, uid_hex: str) -> Path:
+        return self.object_dir(namespace, uid_hex) / "events.jsonl"
+
+    def append_event(self, namespace: str, uid_hex: str, event: Dict[str, Any]) -> None:
+        line = dumps_json_line(event) + b"\n"
+        with self._events_lock:
+            # A single write() of one line in append mode; readers ignore a torn last line.
+            with open(self._events_path(namespace, uid_hex), 'ab') as f:
+                f.write(line)
+
+    def read_events(self, namespace: str, uid_hex: str) -> List[Dict[str, Any]]:
+        path = self._events_path(namespace, uid_hex)
+        if not path.exists():
+            return []
+        with open(path, 'rb') as f:
+            lines = f.read().split(b"\n")
+        events = []
+        for i, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                events.append(decode_value(line))
+            except ValueError:
+                if i == len(lines) - 1: # Torn final line from an interrupted append
+                    break
+                raise
+        return events
+
+    def count_events(self, namespace: str, uid_hex: str) -> int:
+        # Every complete event ends in a newline; a torn final line does not count.
+        try:
+            with open(self._events_path(namespace, uid_hex), 'rb') as f:
+                return f.read().count(b"\n")
+        except FileNotFoundError:
+            return 0
+
+    def trim_events(self, namespace: str, uid_hex: str, through_event_id: str) -> int:
+        path = self._events_path(namespace, uid_hex)
+        with self._events_lock:
+            events = self.read_events(namespace, uid_hex)
+            ids = [event.get("event_id") for event in events]
+            if through_event_id not in ids:
+                return 0
+            keep = events[ids.index(through_event_id) + 1:]
+            _atomic_write_bytes(path, b"".join(dumps_json_line(event) + b"\n" for event in keep), self.fsync)
+            return len(events) - len(keep)
+
+    def read_batch(self, namespace: str, uid_hexes: List[str], with_metadata: bool = True) -> List[Union[None, Any, Exception]]:
+        if len(uid_hexes) <= 1 or self.io_workers <= 1:
+            return super().read_batch(namespace, uid_hexes, with_metadata)
+        with ThreadPoolExecutor(max_workers=min(self.io_workers, len(uid_hexes))) as pool:
+            return list(pool.map(lambda uid_hex: self._read_item(namespace, uid_hex, with_metadata), uid_hexes))
+
+    def write_batch(self, namespace: str, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Exception]]:
+        if len(items) <= 1 or self.io_workers <= 1:
+            return super().write_batch(namespace, items)
+        with ThreadPoolExecutor(max_workers=min(self.io_workers, len(items))) as pool:
+            return list(pool.map(lambda item: self._write_item(namespace, item), items))
+
+    def delete(self, namespace: str, uid_hex: str) -> bool:
+        obj_dir = self.object_dir(namespace, uid_hex)
+        if not obj_dir.exists():
+            return False
+        _unlink_if_exists(self._journal_path(namespace, uid_hex))
+        # Rename first so the object disappears atomically; a crash mid-rmtree leaves only journal debris.
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        doomed = self.journal_dir / f"deleted-{namespace}-{uid_hex}-{uuid.uuid4().hex[:8]}"
+        os.replace(obj_dir, doomed)
+        shutil.rmtree(doomed, ignore_errors=True)
+        return True
+
+    def list_uid_hexes(self, namespace: str) -> List[str]:
+        ns_dir = self.namespace_dir(namespace)
+        if not ns_dir.exists():
+            return []
+        # The vault root also holds the PBI/AgentProfile namespace directories; skip them for general objects.
+        reserved = set(NAMESPACES) if namespace == NAMESPACE_OBJECTS else set()
+        found: Dict[str, None] = {}
+        for item in ns_dir.iterdir():
+            if not item.is_dir() or item.name in reserved or item.name.startswith("."):
+                continue
+            if not self._is_shard_name(item.name):
+                found[item.name] = None
+                continue
+            for sub in item.iterdir():
+                if sub.is_dir() and self._is_shard_name(sub.name):
+                    found.update((obj.name, None) for obj in sub.iterdir() if obj.is_dir())
+        return list(found)
+
+    def find_by_object_type(self, namespace: str, object_type: str) -> List[str]:
+        results = []
+        for uid_hex in self.list_uid_hexes(namespace):
+            try:
+                meta = self.read_metadata(namespace, uid_hex)
+                if meta is None:
+                    continue
+                if meta.get("object_type") == object_type:
+                    results.append(meta.get("crux_uid", f"urn:crux:uid::{uid_hex}"))
+            except Exception as e:
+                log_internal_error("DirectoryBackend.find_by_object_type", {"message": f"Error reading metadata for {uid_hex}: {e}"})
+        return results
+
+    def index_dir(self, namespace: str) -> Path:
+        return self.namespace_dir(namespace)
+
+    def version_token(self, namespace: str, uid_hex: str) -> Optional[Any]:
+        # Writes replace each file with a new inode, so st_ino catches a same-size rewrite
+        # that lands within the filesystem's mtime granularity.
+        obj_dir = self.object_dir(namespace, uid_hex)
+        try:
+            payload_stat = (obj_dir / "object_payload.json").stat()
+        except FileNotFoundError:
+            return None
+        try:
+            metadata_stat = (obj_dir / "metadata.json").stat()
+            metadata_stamp = (metadata_stat.st_ino, metadata_stat.st_mtime_ns, metadata_stat.st_size)
+        except FileNotFoundError:
+            metadata_stamp = None
+        return (payload_stat.st_ino, payload_stat.st_mtime_ns, payload_stat.st_size, metadata_stamp)
+
+    def describe(self, namespace: str, uid_hex: str) -> str:
+        return str(self.object_dir(namespace, uid_hex))
+
+
+class SqliteBackend(MemStorageBackend):
+    """
+    Single-file SQLite store (stdlib `sqlite3`, WAL journal). Payload and
+    metadata columns hold `codec` output (JSON text for the JSON codecs, a
+    marked BLOB otherwise); object_type, status and the timestamps are lifted
+    into indexed columns so typed queries do not scan every row.
+    """
+
+    name = "sqlite"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS mada_objects (
+            namespace   TEXT NOT NULL,
+            uid_hex     TEXT NOT NULL,
+            crux_uid    TEXT,
+            object_type TEXT,
+            status      TEXT,
+            created_at  TEXT,
+            updated_at  TEXT,
+            payload     TEXT NOT NULL,
+            metadata    TEXT NOT NULL,
+            PRIMARY KEY (namespace, uid_hex)
+        );
+        CREATE INDEX IF NOT EXISTS idx_mada_objects_type ON mada_objects (namespace, object_type);
+        CREATE INDEX IF NOT EXISTS idx_mada_objects_status ON mada_objects (namespace, status);
+        CREATE INDEX IF NOT EXISTS idx_mada_objects_created ON mada_objects (created_at);
+        CREATE INDEX IF NOT EXISTS idx_mada_objects_updated ON mada_objects (updated_at);
+        CREATE TABLE IF NOT EXISTS mada_events (
+            seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+            namespace   TEXT NOT NULL,
+            uid_hex     TEXT NOT NULL,
+            event_id    TEXT,
+            event       TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_mada_events_object ON mada_events (namespace, uid_hex, seq);
+    """
+
+    def __init__(self, db_path: Path, codec: Codec = JSON_CODEC):
+        self.db_path = Path(db_path)
+        self.codec = codec
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite3 connections must not be shared across threads; keep one per thread.
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(self._SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _encode(self, value: Dict[str, Any]) -> Union[str, bytes]:
+        data = self.codec.encode(value)
+        return data.decode("utf-8") if self.codec.is_json else data
+
+    def _row(self, namespace: str, uid_hex: str, payload: Dict[str, Any], metadata: Dict[str, Any]) -> tuple:
+        return (
+            namespace, uid_hex,
+            metadata.get("crux_uid", f"urn:crux:uid::{uid_hex}"),
+            metadata.get("object_type"),
+            metadata.get("status", payload.get("status")),
+            metadata.get("created_at"),
+            metadata.get("updated_at"),
+            self._encode(payload),
+            self._encode(metadata),
+        )
+
+    _UPSERT = "INSERT OR REPLACE INTO mada_objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+    def exists(self, namespace: str, uid_hex: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM mada_objects WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex)).fetchone()
+        return row is not None
+
+    def _read_column(self, column: str, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            f"SELECT {column} FROM mada_objects WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex)).fetchone()
+        return decode_value(row[0]) if row else None
+
+    def read_payload(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        return self._read_column("payload", namespace, uid_hex)
+
+    def read_metadata(self, namespace: str, uid_hex: str) -> Optional[Dict[str, Any]]:
+        return self._read_column("metadata", namespace, uid_hex)
+
+    def read(self, namespace: str, uid_hex: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        row = self._connection().execute(
+            "SELECT payload, metadata FROM mada_objects WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex)).fetchone()
+        return (decode_value(row[0]), decode_value(row[1])) if row else None
+
+    def write(self, namespace: str, uid_hex: str, payload: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        with self._connection() as conn:  # commits, or rolls back on error
+            conn.execute(self._UPSERT, self._row(namespace, uid_hex, payload, metadata))
+
+    def write_many(self, namespace: str, items: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> int:
+        rows = [self._row(namespace, uid_hex, payload, metadata) for uid_hex, payload, metadata in items]
+        with self._connection() as conn:
+            conn.executemany(self._UPSERT, rows)
+        return len(rows)
+
+    # Stay well under SQLITE_MAX_VARIABLE_NUMBER (999 on older builds) for IN (...) lookups.
+    _READ_CHUNK = 500
+
+    def read_batch(self, namespace: str, uid_hexes: List[str], with_metadata: bool = True) -> List[Union[None, Any, Exception]]:
+        rows: Dict[str, tuple] = {}
+        unique = list(dict.fromkeys(uid_hexes))
+        conn = self._connection()
+        for start in range(0, len(unique), self._READ_CHUNK):
+            chunk = unique[start:start + self._READ_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for uid_hex, payload, metadata in conn.execute(
+                    f"SELECT uid_hex, payload, metadata FROM mada_objects WHERE namespace = ? AND uid_hex IN ({placeholders})",
+                    (namespace, *chunk)):
+                rows[uid_hex] = (payload, metadata)
+        results: List[Union[None, Any, Exception]] = []
+        for uid_hex in uid_hexes:
+            row = rows.get(uid_hex)
+            if row is None:
+                results.append(None)
+                continue
+            try:
+                payload = decode_value(row[0])
+                results.append((payload, decode_value(row[1])) if with_metadata else payload)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def write_batch(self, namespace: str, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Exception]]:
+        # Items that cannot be serialised fail on their own; the rest commit in one transaction.
+        results: List[Optional[Exception]] = [None] * len(items)
+        rows = []
+        for i, (uid_hex, payload, metadata) in enumerate(items):
+            try:
+                rows.append(self._row(namespace, uid_hex, payload, metadata))
+            except Exception as e:
+                results[i] = e
+        try:
+            with self._connection() as conn:
+                conn.executemany(self._UPSERT, rows)
+        except Exception as e:
+            results = [r if r is not None else e for r in results]
+        return results
+
+    def delete(self, namespace: str, uid_hex: str) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM mada_objects WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex))
+            conn.execute("DELETE FROM mada_events WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex))
+        return cursor.rowcount > 0
+
+    def append_event(self, namespace: str, uid_hex: str, event: Dict[str, Any]) -> None:
+        with self._connection() as conn:
+            conn.execute("INSERT INTO mada_events (namespace, uid_hex, event_id, event) VALUES (?, ?, ?, ?)",
+                         (namespace, uid_hex, event.get("event_id"), dumps_json_line(event).decode("utf-8")))
+
+    def read_events(self, namespace: str, uid_hex: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT event FROM mada_events WHERE namespace = ? AND uid_hex = ? ORDER BY seq", (namespace, uid_hex)).fetchall()
+        return [decode_value(row[0]) for row in rows]
+
+    def count_events(self, namespace: str, uid_hex: str) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM mada_events WHERE namespace = ? AND uid_hex = ?", (namespace, uid_hex)).fetchone()[0]
+
+    def trim_events(self, namespace: str, uid_hex: str, through_event_id: str) -> int:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM mada_events WHERE namespace = ? AND uid_hex = ? AND seq <= "
+                "(SELECT seq FROM mada_events WHERE namespace = ? AND uid_hex = ? AND event_id = ?)",
+                (namespace, uid_hex, namespace, uid_hex, through_event_id))
+        return cursor.rowcount
+
+    def list_uid_hexes(self, namespace: str) -> List[str]:
+        rows = self._connection().execute("SELECT uid_hex FROM mada_objects WHERE namespace = ?", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def find_by_object_type(self, namespace: str, object_type: str) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT crux_uid FROM mada_objects WHERE namespace = ? AND object_type = ?", (namespace, object_type)).fetchall()
+        return [row[0] for row in rows]
+
+    def iter_payloads(self, namespace: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self._connection().execute("SELECT uid_hex, payload FROM mada_objects WHERE namespace = ?", (namespace,)).fetchall()
+        for uid_hex, payload in rows:
+            yield uid_hex, decode_value(payload)
+
+    def iter_metadata(self, namespace: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self._connection().execute("SELECT uid_hex, metadata FROM mada_objects WHERE namespace = ?", (namespace,)).fetchall()
+        for uid_hex, metadata in rows:
+            yield uid_hex, decode_value(metadata)
+
+    def index_dir(self, namespace: str) -> Path:
+        return self.db_path.parent / f".{self.db_path.stem}_indexes" / namespace
+
+    def version_token(self, namespace: str, uid_hex: str) -> Optional[Any]:
+        # Probes the row without decoding it. REPLACE re-inserts the row, so a rewrite by
+        # another process shows up as a new rowid, updated_at or column length.
+        row = self._connection().execute(
+            "SELECT rowid, updated_at, length(payload), length(metadata) FROM mada_objects WHERE namespace = ? AND uid_hex = ?",
+            (namespace, uid_hex)).fetchone()
+        return tuple(row) if row else None
+
+    def describe(self, namespace: str, uid_hex: str) -> str:
+        return f"{self.db_path}:{namespace}/{uid_hex}"
+
+
+def create_backend(kind: str, vault_dir: Path, sqlite_path: Optional[Path] = None, fsync: bool = False, codec: Codec = JSON_CODEC,
+                   layout: str = LAYOUT_FLAT) -> MemStorageBackend:
+    """Builds a backend from its config name ('directory' or 'sqlite'). `layout` only applies to 'directory'."""
+    if kind == DirectoryBackend.name:
+        return DirectoryBackend(vault_dir, fsync=fsync, codec=codec, layout=layout)
+    if kind == SqliteBackend.name:
+        return SqliteBackend(sqlite_path or (Path(vault_dir) / "mada_vault.sqlite3"), codec=codec)
+    raise ValueError(f"Unknown lC.MEM.CORE storage backend '{kind}'. Expected 'directory' or 'sqlite'.")
+
+
+def import_directory_vault(source_vault_dir: Path, target: MemStorageBackend, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Bulk-copies an existing directory-layout vault (e.g. `mada_vault/`) into `target`.
+    Objects are written in batches of `batch_size` (one transaction each on SQLite).
+    Returns the number of objects imported per namespace.
+    """
+    source = DirectoryBackend(source_vault_dir)
+    counts: Dict[str, int] = {}
+    for namespace in NAMESPACES:
+        imported = 0
+        batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+        for uid_hex in source.list_uid_hexes(namespace):
+            try:
+                pair = source.read(namespace, uid_hex)
+            except Exception as e:
+                log_internal_error("import_directory_vault", {"message": f"Skipping unreadable {namespace}/{uid_hex}: {e}"})
+                continue
+            if pair is None:
+                continue
+            batch.append((uid_hex, pair[0], pair[1]))
+            for event in source.read_events(namespace, uid_hex):
+                target.append_event(namespace, uid_hex, event)
+            if len(batch) >= batch_size:
+                imported += target.write_many(namespace, batch)
+                batch = []
+        if batch:
+            imported += target.write_many(namespace, batch)
+        counts[namespace] = imported
+    log_internal_info("import_directory_vault", {"message": f"Imported {counts} from {source_vault_dir} into {target.name} backend."})
+    return counts
+
+
+def convert_vault(backend: MemStorageBackend, codec: Codec, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rewrites every object in `backend` with `codec` (and switches the backend to
+    it). Objects are read with whatever codec wrote them, so this also normalises
+    a mixed vault. Returns the number of objects rewritten per namespace.
+    """
+    backend.codec = codec
+    counts: Dict[str, int] = {}
+    for namespace in NAMESPACES:
+        uid_hexes = backend.list_uid_hexes(namespace)
+        converted = 0
+        for start in range(0, len(uid_hexes), batch_size):
+            chunk = uid_hexes[start:start + batch_size]
+            items = []
+            for uid_hex, stored in zip(chunk, backend.read_batch(namespace, chunk)):
+                if isinstance(stored, Exception):
+                    log_internal_error("convert_vault", {"message": f"Skipping unreadable {namespace}/{uid_hex}: {stored}"})
+                elif stored is not None:
+                    items.append((uid_hex, stored[0], stored[1]))
+            for (uid_hex, _, _), error in zip(items, backend.write_batch(namespace, items)):
+                if error is None:
+                    converted += 1
+                else:
+                    log_internal_error("convert_vault", {"message": f"Failed to rewrite {namespace}/{uid_hex}: {error}"})
+        counts[namespace] = converted
+    log_internal_info("convert_vault", {"message": f"Converted {counts} to codec '{codec.name}'."})
+    return counts
+
+
+def migrate_vault_layout(vault_dir: Path, layout: str) -> Dict[str, int]:
+    """
+    Moves every object of a directory vault into `layout` ('flat' or 'sharded')
+    with one rename per object. Safe to run while the vault is in use: readers
+    find objects in either layout throughout. Returns the number moved per namespace.
+    """
+    backend = DirectoryBackend(vault_dir, layout=layout)
+    backend.recover()
+    counts: Dict[str, int] = {}
+    for namespace in NAMESPACES:
+        moved = 0
+        for uid_hex in backend.list_uid_hexes(namespace):
+            try:
+                current = backend.object_dir(namespace, uid_hex)
+                if backend._move_into_layout(namespace, uid_hex) != current:
+                    moved += 1
+            except OSError as e:
+                log_internal_error("migrate_vault_layout", {"message": f"Could not move {namespace}/{uid_hex}: {e}"})
+        if layout == LAYOUT_FLAT:
+            _prune_empty_shards(backend.namespace_dir(namespace))
+        counts[namespace] = moved
+    log_internal_info("migrate_vault_layout", {"message": f"Moved {counts} into the '{layout}' layout under {vault_dir}."})
+    return counts
+
+
+def _prune_empty_shards(ns_dir: Path):
+    if not ns_dir.exists():
+        return
+    for item in ns_dir.iterdir():
+        if item.is_dir() and DirectoryBackend._is_shard_name(item.name):
+            for sub in item.iterdir():
+                if sub.is_dir() and DirectoryBackend._is_shard_name(sub.name):
+                    try:
+                        sub.rmdir()
+                    except OSError: # Not empty
+                        pass
+            try:
+                item.rmdir()
+            except OSError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="lC.MEM.CORE storage maintenance.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="Import a directory-layout mada_vault into a SQLite database.")
+    migrate.add_argument("--source", required=True, type=Path, help="Path to the existing mada_vault directory.")
+    migrate.add_argument("--db", required=True, type=Path, help="Path of the SQLite database to create or update.")
+    migrate.add_argument("--batch-size", type=int, default=500)
+    convert = subparsers.add_parser("convert", help="Rewrite every object in a vault with a different codec.")
+    convert.add_argument("--vault", type=Path, help="Path to a directory-layout mada_vault.")
+    convert.add_argument("--db", type=Path, help="Path to a SQLite vault (instead of --vault).")
+    convert.add_argument("--codec", required=True, help="Target codec: json, orjson or msgpack.")
+    convert.add_argument("--batch-size", type=int, default=500)
+    relayout = subparsers.add_parser("relayout", help="Move every object of a directory vault into the flat or sharded layout.")
+    relayout.add_argument("--vault", required=True, type=Path, help="Path to a directory-layout mada_vault.")
+    relayout.add_argument("--layout", required=True, choices=LAYOUTS)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        target = SqliteBackend(args.db)
+        counts = import_directory_vault(args.source, target, batch_size=args.batch_size)
+        target.close()
+        print(json.dumps(counts))
+    elif args.command == "convert":
+        if bool(args.vault) == bool(args.db):
+            parser.error("convert needs exactly one of --vault or --db")
+        codec = get_codec(args.codec)
+        backend = SqliteBackend(args.db) if args.db else DirectoryBackend(args.vault)
+        backend.recover()
+        counts = convert_vault(backend, codec, batch_size=args.batch_size)
+        if isinstance(backend, SqliteBackend):
+            backend.close()
+        print(json.dumps(counts))
+    elif args.command == "relayout":
+        print(json.dumps(migrate_vault_layout(args.vault, args.layout)))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
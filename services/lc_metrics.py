@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+from ..schemas.mada_schema import LayerTiming
+from .lc_logging import get_logger
+from .lc_llm_limiter import get_llm_limiter_stats
+
+# Per-layer instrumentation for the SOP pipeline.
+#
+# `instrument_layer("L3")` wraps a `*_process` function (sync or async) and records wall
+# time, CPU time, time spent waiting on the LLM, the optional tracemalloc peak and the
+# size of the returned seed. The numbers are written into the layer's trace
+# (`L3Trace.timing`), aggregated in METRICS, and optionally appended as JSON lines to
+# LC_METRICS_JSONL_PATH. `llm_wait(label)` wraps each LLM round trip; its time is added
+# to the layer that is running in the current context and tallied per helper.
+#
+# Everything is off unless LC_METRICS=1. CPU time is the calling thread's CPU time, so
+# for async layers it also includes other tasks that ran on the event loop meanwhile.
+
+METRICS_ENABLED = os.getenv("LC_METRICS", "0").lower() in ("1", "true", "yes")
+METRICS_TRACEMALLOC = os.getenv("LC_METRICS_TRACEMALLOC", "0").lower() in ("1", "true", "yes")
+METRICS_JSONL_PATH = os.getenv("LC_METRICS_JSONL_PATH")
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+
+
+class _LayerRun:
+    __slots__ = ("wall_start", "cpu_start", "memory_start", "llm_wait", "llm_calls")
+
+    def __init__(self):
+        self.llm_wait = 0.0
+        self.llm_calls = 0
+        self.memory_start = None
+        if METRICS_TRACEMALLOC:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak() # Process-wide: a bound, not exact, when layers overlap
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+
+_CURRENT_RUN: contextvars.ContextVar = contextvars.ContextVar("lc_metrics_layer_run", default=None)
+
+
+class MetricsRegistry:
+    """In-process totals per layer and per LLM helper label."""
+
+    _LAYER_COUNTERS = ("runs", "errors", "wall_seconds", "cpu_seconds", "llm_wait_seconds", "llm_calls")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._layers: Dict[str, Dict[str, float]] = {}
+            self._llm: Dict[str, Dict[str, float]] = {}
+
+    def record_layer(self, layer: str, record: Dict[str, Any]):
+        with self._lock:
+            totals = self._layers.setdefault(layer, {**{name: 0 for name in self._LAYER_COUNTERS}, "wall_seconds_max": 0.0, "tracemalloc_peak_bytes_max": 0})
+            totals["runs"] += 1
+            totals["errors"] += 0 if record["ok"] else 1
+            totals["wall_seconds"] += record["wall_ms"] / 1000
+            totals["cpu_seconds"] += record["cpu_ms"] / 1000
+            totals["llm_wait_seconds"] += record["llm_wait_ms"] / 1000
+            totals["llm_calls"] += record["llm_calls"]
+            totals["wall_seconds_max"] = max(totals["wall_seconds_max"], record["wall_ms"] / 1000)
+            totals["tracemalloc_peak_bytes_max"] = max(totals["tracemalloc_peak_bytes_max"], record.get("tracemalloc_peak_bytes") or 0)
+
+    def record_llm(self, label: str, seconds: float, ok: bool):
+        with self._lock:
+            totals = self._llm.setdefault(label, {"calls": 0, "errors": 0, "wait_seconds": 0.0})
+            totals["calls"] += 1
+            totals["errors"] += 0 if ok else 1
+            totals["wait_seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"layers": {layer: dict(totals) for layer, totals in self._layers.items()},
+                    "llm": {label: dict(totals) for label, totals in self._llm.items()}}
+
+    def to_prometheus_text(self) -> str:
+        """Renders the totals in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, label_name: str, rows: Dict[str, Dict[str, float]], key: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_value, totals in sorted(rows.items()):
+                escaped = label_value.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{{label_name}="{escaped}"}} {totals[key]}')
+
+        layers = snapshot["layers"]
+        family("lc_sop_layer_runs_total", "counter", "SOP layer invocations.", "layer", layers, "runs")
+        family("lc_sop_layer_errors_total", "counter", "SOP layer invocations that raised.", "layer", layers, "errors")
+        family("lc_sop_layer_wall_seconds_total", "counter", "Wall time spent in the layer.", "layer", layers, "wall_seconds")
+        family("lc_sop_layer_cpu_seconds_total", "counter", "CPU time of the thread running the layer.", "layer", layers, "cpu_seconds")
+        family("lc_sop_layer_llm_wait_seconds_total", "counter", "Time the layer spent waiting on LLM calls.", "layer", layers, "llm_wait_seconds")
+        family("lc_sop_layer_llm_calls_total", "counter", "LLM calls made by the layer.", "layer", layers, "llm_calls")
+        family("lc_sop_layer_wall_seconds_max", "gauge", "Slowest single run of the layer.", "layer", layers, "wall_seconds_max")
+        family("lc_sop_layer_tracemalloc_peak_bytes_max", "gauge", "Largest tracemalloc peak seen for the layer.", "layer", layers, "tracemalloc_peak_bytes_max")
+        llm = snapshot["llm"]
+        family("lc_llm_calls_total", "counter", "LLM calls per helper.", "helper", llm, "calls")
+        family("lc_llm_errors_total", "counter", "LLM calls per helper that raised.", "helper", llm, "errors")
+        family("lc_llm_wait_seconds_total", "counter", "Time spent waiting on LLM calls per helper.", "helper", llm, "wait_seconds")
+        limiter = get_llm_limiter_stats()
+        for name, kind, help_text, key in (("lc_llm_in_flight", "gauge", "LLM calls currently running.", "in_flight"),
+                                           ("lc_llm_queue_depth", "gauge", "LLM calls waiting for the rate limiter or a concurrency slot.", "queue_depth"),
+                                           ("lc_llm_concurrency_limit", "gauge", "Current adaptive (AIMD) LLM concurrency cap.", "concurrency_limit"),
+                                           ("lc_llm_throttled_total", "counter", "LLM calls rejected by the provider as throttled.", "throttled"),
+                                           ("lc_llm_retries_total", "counter", "Throttled LLM calls retried after backoff.", "retries")):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {limiter[key]}"])
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+_JSONL_LOCK = threading.Lock()
+
+
+def get_layer_metrics() -> Dict[str, Any]:
+    return METRICS.snapshot()
+
+
+def write_prometheus_text(path: Path) -> bool:
+    """Writes METRICS to `path` (atomically) for a node-exporter textfile collector or similar."""
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(METRICS.to_prometheus_text(), encoding="utf-8")
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        log_internal_error("write_prometheus_text", {"path": str(path), "message": str(e)})
+        return False
+
+
+def _append_jsonl(record: Dict[str, Any]):
+    try:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with _JSONL_LOCK, open(METRICS_JSONL_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+    except (OSError, TypeError, ValueError) as e:
+        log_internal_error("_append_jsonl", {"path": METRICS_JSONL_PATH, "message": str(e)})
+
+
+@contextmanager
+def llm_wait(label: str):
+    """Times one LLM round trip: `with llm_wait(helper_name): response = await ...`."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.record_llm(label, elapsed, ok)
+        run = _CURRENT_RUN.get()
+        if run is not None:
+            run.llm_wait += elapsed
+            run.llm_calls += 1
+
+
+def _finish_layer_run(layer: str, func_name: str, run: _LayerRun, result: Any, ok: bool):
+    """Records one layer run; instrumentation problems are logged, never raised into the pipeline."""
+    try:
+        timing = LayerTiming(
+            wall_ms=round((time.perf_counter() - run.wall_start) * 1000, 3),
+            cpu_ms=round((time.thread_time() - run.cpu_start) * 1000, 3),
+            llm_wait_ms=round(run.llm_wait * 1000, 3),
+            llm_calls=run.llm_calls,
+        )
+        if run.memory_start is not None:
+            timing.tracemalloc_peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - run.memory_start)
+        trace_id = None
+        if ok and hasattr(result, "model_dump_json"):
+            timing.seed_size_bytes = len(result.model_dump_json())
+        try:
+            trace_id = result.seed_id
+            getattr(result.trace_metadata, f"{layer}_trace").timing = timing
+        except AttributeError: # Layer failed before its trace was written
+            pass
+        record = {"ts": time.time(), "layer": layer, "function": func_name, "trace_id": trace_id, "ok": ok, **timing.model_dump()}
+        METRICS.record_layer(layer, record)
+        if METRICS_JSONL_PATH:
+            _append_jsonl(record)
+    except Exception as e:
+        log_internal_error("_finish_layer_run", {"layer": layer, "message": str(e)})
+
+
+def instrument_layer(layer: str) -> Callable:
+    """Decorator for a layer's `*_process` function; `layer` is "L1".."L7" and names its trace."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not METRICS_ENABLED:
+                    return await func(*args, **kwargs)
+                run, result, ok = _LayerRun(), None, False
+                token = _CURRENT_RUN.set(run)
+                try:
+                    result = await func(*args, **kwargs)
+                    ok = True
+                    return result
+                finally:
+                    _CURRENT_RUN.reset(token)
+                    _finish_layer_run(layer, func.__name__, run, result, ok)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return func(*args, **kwargs)
+            run, result, ok = _LayerRun(), None, False
+            token = _CURRENT_RUN.set(run)
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                _CURRENT_RUN.reset(token)
+                _finish_layer_run(layer, func.__name__, run, result, ok)
+        return wrapper
+    return decorator
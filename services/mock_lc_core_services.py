@@ -1,27 +1,31 @@
 import uuid
 from typing import Optional, Dict, Any, List, Union
 
+from .lc_logging import get_logger
+
+_logger = get_logger(__name__)
+
 # In-memory store for mock objects
 mock_mada_store: Dict[str, Any] = {}
 mock_policy_store: Dict[str, Dict[str, Any]] = {}
 
 def mock_lc_mem_core_get_object(object_uid: str, default_value: Any = None) -> Any:
-    print(f"[MOCK_MEM_CORE] Getting object: {object_uid}")
+    _logger.debug("[MOCK_MEM_CORE] Getting object: %s", object_uid)
     return mock_mada_store.get(object_uid, default_value)
 
 def mock_lc_mem_core_ensure_uid(type_hint: str, context_hint: dict) -> str:
     # This is the same as _startle_generate_crux_uid, kept for conceptual mapping
     # and to centralize UID generation logic if it were to become more complex.
-    print(f"[MOCK_MEM_CORE] Ensuring UID for type: {type_hint}, context: {context_hint}")
+    _logger.debug("[MOCK_MEM_CORE] Ensuring UID for type: %s, context: %s", type_hint, context_hint)
     return "urn:crux:uid::" + uuid.uuid4().hex
 
 def mock_lc_mem_core_create_object(object_uid: str, payload: dict) -> bool:
-    print(f"[MOCK_MEM_CORE] Creating object: {object_uid} with payload: {payload}")
+    _logger.debug("[MOCK_MEM_CORE] Creating object: %s with payload: %s", object_uid, payload)
     mock_mada_store[object_uid] = payload
     return True
 
 def mock_lc_gov_core_get_policy(policy_ref: str, default_policy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    print(f"[MOCK_GOV_CORE] Getting policy: {policy_ref}")
+    _logger.debug("[MOCK_GOV_CORE] Getting policy: %s", policy_ref)
     # Ensure default_policy is a dict if None is passed but a default is expected by the caller
     effective_default = default_policy if default_policy is not None else {"name": policy_ref, "rules": ["default_mock_rule_for_" + policy_ref]}
     return mock_policy_store.get(policy_ref, effective_default)
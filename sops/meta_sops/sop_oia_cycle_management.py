@@ -7,18 +7,35 @@ from lc_python_core.services.lc_mem_service import (
     mock_lc_mem_core_ensure_uid,
     mock_lc_mem_core_create_object,
     mock_lc_mem_core_get_object,
-    mock_lc_mem_core_update_object
+    mock_lc_mem_core_update_object,
+    mock_lc_mem_core_append_event,
+    mock_lc_mem_core_get_events,
+    mock_lc_mem_core_count_events,
+    mock_lc_mem_core_trim_events
 )
+from lc_python_core.services.lc_logging import get_logger, log_info_sampled
 # For Enums or Pydantic models if we define them for OIA components
 # from ...schemas.oia_cycle_schema import OIACycleState, ObservationComponent, etc. 
 # For now, we'll work with dicts based on the JSON schema proposed.
 
-# Mock logging functions (can be replaced with a proper logger)
-def log_internal_error(func_name: str, params: dict): print(f"ERROR:{func_name}:{params}")
-def log_internal_info(func_name: str, params: dict): print(f"INFO:{func_name}:{params}")
+_logger = get_logger(__name__)
+
+# Logging helpers (leveled, see services/lc_logging.py)
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+def log_internal_info(func_name: str, params: dict): log_info_sampled(_logger, func_name, "INFO:%s:%s", func_name, params)
 
 OIA_CYCLE_OBJECT_TYPE = "OIACycleState"
 
+# Changes to a cycle are appended to its MADA event log as small patches
+# ({"set": {...}, "append": {...}}) instead of rewriting the whole cycle object.
+# The stored object payload is the snapshot; get_oia_cycle_state folds the pending
+# events over it. Once OIA_EVENT_COMPACT_THRESHOLD events have piled up, the next
+# append (or read) writes the folded state back as the new snapshot and trims the log.
+# The snapshot records the last event folded into it under OIA_SNAPSHOT_EVENT_KEY;
+# that bookkeeping key is never part of the state returned to callers.
+OIA_EVENT_COMPACT_THRESHOLD = 200
+OIA_SNAPSHOT_EVENT_KEY = "last_applied_event_id"
+
 def _get_current_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -55,38 +72,52 @@ def initiate_oia_cycle(name: Optional[str] = None, initial_focus_prompt: Optiona
         log_internal_error("initiate_oia_cycle", {"message": f"Failed to create OIA cycle object for UID: {oia_cycle_uid}"})
         return None
 
-def _add_oia_component(oia_cycle_uid: str, component_type: str, component_data: Dict[str, Any]) -> Optional[str]:
-    oia_cycle_state_dict = mock_lc_mem_core_get_object(oia_cycle_uid)
-    if not oia_cycle_state_dict:
-        log_internal_error(f"_add_oia_component ({component_type})", {"message": f"OIA cycle {oia_cycle_uid} not found."})
-        return None
+def _apply_oia_event(state: Dict[str, Any], event: Dict[str, Any]):
+    for key, value in event.get("set", {}).items():
+        state[key] = value
+    for key, items in event.get("append", {}).items():
+        state.setdefault(key, []).extend(items)
+
+def _fold_oia_events(state: Dict[str, Any], events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Turns a stored snapshot into the current state in place: drops the snapshot's
+    bookkeeping key and applies `events`, skipping any already folded into the
+    snapshot. Returns the events applied.
+    """
+    applied_through = state.pop(OIA_SNAPSHOT_EVENT_KEY, None)
+    event_ids = [event.get("event_id") for event in events]
+    if applied_through in event_ids: # A compaction wrote the snapshot but did not get to trim the log
+        events = events[event_ids.index(applied_through) + 1:]
+    for event in events:
+        _apply_oia_event(state, event)
+    return events
 
+def _add_oia_component(oia_cycle_uid: str, component_type: str, component_data: Dict[str, Any]) -> Optional[str]:
     component_id = _generate_component_id(component_type.lower()[:3])
     component_data[f"{component_type.lower()}_id"] = component_id # e.g., observation_id
     component_data[f"{component_type.lower()}_at"] = _get_current_utc_iso() # e.g., observed_at
 
-    oia_cycle_state_dict.setdefault(f"{component_type.lower()}s", []).append(component_data)
-    
     # Update status based on component type
+    current_time = _get_current_utc_iso()
+    set_fields = {"last_updated_at": current_time}
     if component_type == "Observation":
-        oia_cycle_state_dict["status"] = "Observing"
+        set_fields["status"] = "Observing"
     elif component_type == "Interpretation":
-        oia_cycle_state_dict["status"] = "Interpreting"
+        set_fields["status"] = "Interpreting"
     elif component_type == "Application":
-        oia_cycle_state_dict["status"] = "Applying" # Or Completed_Applied if this is the final state for the action
-
-    current_time = _get_current_utc_iso()
-    oia_cycle_state_dict["last_updated_at"] = current_time
-    oia_cycle_state_dict.setdefault("log", []).append({
-        "timestamp": current_time,
-        "event_type": f"{component_type}Added",
-        "details": f"{component_type} {component_id} added."
-    })
-
-    if mock_lc_mem_core_update_object(oia_cycle_uid, oia_cycle_state_dict):
+        set_fields["status"] = "Applying" # Or Completed_Applied if this is the final state for the action
+
+    event = {
+        "set": set_fields,
+        "append": {
+            f"{component_type.lower()}s": [component_data],
+            "log": [{"timestamp": current_time, "event_type": f"{component_type}Added", "details": f"{component_type} {component_id} added."}]
+        }
+    }
+    if _append_oia_event(oia_cycle_uid, event):
         return component_id
     else:
-        log_internal_error(f"_add_oia_component ({component_type})", {"message": f"Failed to update OIA cycle {oia_cycle_uid}."})
+        log_internal_error(f"_add_oia_component ({component_type})", {"message": f"Failed to append {component_type} to OIA cycle {oia_cycle_uid}."})
         return None
 
 def add_observation_to_cycle(oia_cycle_uid: str, summary: str, data_source_mada_uid: Optional[str] = None, raw_observation_ref: Optional[str] = None) -> Optional[str]:
@@ -119,25 +150,55 @@ def add_application_to_cycle(oia_cycle_uid: str, summary_of_action_taken_or_plan
     return _add_oia_component(oia_cycle_uid, "Application", application_data)
 
 def update_oia_cycle_status(oia_cycle_uid: str, new_status: str, log_message: str) -> bool:
-    oia_cycle_state_dict = mock_lc_mem_core_get_object(oia_cycle_uid)
-    if not oia_cycle_state_dict:
-        log_internal_error("update_oia_cycle_status", {"message": f"OIA cycle {oia_cycle_uid} not found."})
-        return False
-
-    oia_cycle_state_dict["status"] = new_status
     current_time = _get_current_utc_iso()
-    oia_cycle_state_dict["last_updated_at"] = current_time
-    oia_cycle_state_dict.setdefault("log", []).append({
-        "timestamp": current_time,
-        "event_type": "StatusUpdate",
-        "details": log_message
-    })
-
-    return mock_lc_mem_core_update_object(oia_cycle_uid, oia_cycle_state_dict)
+    event = {
+        "set": {"status": new_status, "last_updated_at": current_time},
+        "append": {"log": [{"timestamp": current_time, "event_type": "StatusUpdate", "details": log_message}]}
+    }
+    if not _append_oia_event(oia_cycle_uid, event):
+        log_internal_error("update_oia_cycle_status", {"message": f"Failed to update status of OIA cycle {oia_cycle_uid}."})
+        return False
+    return True
 
 def get_oia_cycle_state(oia_cycle_uid: str) -> Optional[Dict[str, Any]]:
     state = mock_lc_mem_core_get_object(oia_cycle_uid)
     if not state:
          log_internal_info("get_oia_cycle_state", {"message": f"OIA Cycle {oia_cycle_uid} not found."})
          return None
+    events = mock_lc_mem_core_get_events(oia_cycle_uid) or []
+    applied = _fold_oia_events(state, events)
+    if len(applied) >= OIA_EVENT_COMPACT_THRESHOLD:
+        _write_oia_snapshot(oia_cycle_uid, state, applied[-1]["event_id"])
     return state
+
+def _append_oia_event(oia_cycle_uid: str, event: Dict[str, Any]) -> Optional[str]:
+    """Appends `event` to the cycle's log and compacts the log once it reaches the threshold. Returns the event_id."""
+    event_id = mock_lc_mem_core_append_event(oia_cycle_uid, event)
+    if event_id:
+        pending = mock_lc_mem_core_count_events(oia_cycle_uid) # Counted, not decoded: appends stay cheap as the log grows
+        if pending is not None and pending >= OIA_EVENT_COMPACT_THRESHOLD:
+            compact_oia_cycle(oia_cycle_uid) # The event is already durable; a failed compaction is retried later
+    return event_id
+
+def compact_oia_cycle(oia_cycle_uid: str, events: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """Folds the cycle's pending events (read from the log unless given) into its stored snapshot and trims the event log."""
+    state = mock_lc_mem_core_get_object(oia_cycle_uid)
+    if not state:
+        log_internal_error("compact_oia_cycle", {"message": f"OIA cycle {oia_cycle_uid} not found."})
+        return False
+    if events is None:
+        events = mock_lc_mem_core_get_events(oia_cycle_uid)
+        if events is None:
+            return False
+    applied = _fold_oia_events(state, events)
+    if not applied:
+        return True
+    return _write_oia_snapshot(oia_cycle_uid, state, applied[-1]["event_id"])
+
+def _write_oia_snapshot(oia_cycle_uid: str, state: Dict[str, Any], through_event_id: str) -> bool:
+    # Snapshot first, then trim: if we stop in between, the event id stored with the snapshot
+    # makes the next fold skip the events that are already in it.
+    if not mock_lc_mem_core_update_object(oia_cycle_uid, {**state, OIA_SNAPSHOT_EVENT_KEY: through_event_id}):
+        log_internal_error("_write_oia_snapshot", {"message": f"Failed to write snapshot for OIA cycle {oia_cycle_uid}."})
+        return False
+    return mock_lc_mem_core_trim_events(oia_cycle_uid, through_event_id)
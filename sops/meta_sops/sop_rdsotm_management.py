@@ -6,13 +6,17 @@ from lc_python_core.services.lc_mem_service import ( # Adjusted for potential de
     mock_lc_mem_core_ensure_uid,
     mock_lc_mem_core_create_object,
     mock_lc_mem_core_get_object,
-    mock_lc_mem_core_update_object
+    mock_lc_mem_core_update_object,
+    get_objects_many
 )
+from lc_python_core.services.lc_logging import get_logger, log_info_sampled
+
+_logger = get_logger(__name__)
 
 # Mock logging functions
-def log_internal_error(func_name: str, params: dict): print(f"ERROR:{func_name}:{params}")
-def log_internal_info(func_name: str, params: dict): print(f"INFO:{func_name}:{params}")
-def log_internal_warning(func_name: str, params: dict): print(f"WARNING:{func_name}:{params}")
+def log_internal_error(func_name: str, params: dict): _logger.error("ERROR:%s:%s", func_name, params)
+def log_internal_info(func_name: str, params: dict): log_info_sampled(_logger, func_name, "INFO:%s:%s", func_name, params)
+def log_internal_warning(func_name: str, params: dict): _logger.warning("WARNING:%s:%s", func_name, params)
 
 
 RDSOTM_CYCLE_LINKAGE_TYPE = "RDSOTMCycleLinkage"
@@ -197,20 +201,23 @@ def get_rdsotm_cycle_details(cycle_linkage_uid: str, resolve_component_summaries
         return None
 
     if resolve_component_summaries:
-        for ref_type in ["reality_input_refs", "strategy_refs", "operations_refs", "tactics_refs", "mission_refs", "oia_cycle_refs"]:
-            summary_key = f"{ref_type}_summaries"
-            cycle_data[summary_key] = []
-            for comp_uid in cycle_data.get(ref_type, []):
-                comp = get_rdsotm_component(comp_uid) # Not including content here for summary
-                if comp:
-                    cycle_data[summary_key].append({"uid": comp_uid, "name": comp.get("name"), "type": comp.get("rdsotm_component_type"), "status": comp.get("status")})
+        ref_types = ["reality_input_refs", "strategy_refs", "operations_refs", "tactics_refs", "mission_refs", "oia_cycle_refs"]
+        # Fetch every referenced component (content not included) in one batch read.
+        comp_uids = [comp_uid for ref_type in ref_types for comp_uid in cycle_data.get(ref_type, [])]
+        if cycle_data.get("doctrine_ref"):
+            comp_uids.append(cycle_data["doctrine_ref"])
+        components = {item["uid"]: item["payload"] for item in get_objects_many(list(dict.fromkeys(comp_uids))) if item["ok"]}
+
+        def _summary(comp_uid: str) -> Dict[str, Any]:
+            comp = components[comp_uid]
+            return {"uid": comp_uid, "name": comp.get("name"), "type": comp.get("rdsotm_component_type"), "status": comp.get("status")}
+
+        for ref_type in ref_types:
+            cycle_data[f"{ref_type}_summaries"] = [_summary(comp_uid) for comp_uid in cycle_data.get(ref_type, []) if comp_uid in components]
         
         # Handle single doctrine_ref
-        if cycle_data.get("doctrine_ref"):
-            doc_uid = cycle_data["doctrine_ref"]
-            doc_comp = get_rdsotm_component(doc_uid)
-            if doc_comp:
-                 cycle_data["doctrine_ref_summary"] = {"uid": doc_uid, "name": doc_comp.get("name"), "type": doc_comp.get("rdsotm_component_type"), "status": doc_comp.get("status")}
+        if cycle_data.get("doctrine_ref") in components:
+            cycle_data["doctrine_ref_summary"] = _summary(cycle_data["doctrine_ref"])
 
     return cycle_data
 
@@ -22,19 +22,23 @@ from ..schemas.mada_schema import (
     L7EpistemicStateEnum,
     SeedIntegrityStatusEnum,
 )
+from ..services.lc_metrics import instrument_layer
+from ..services.lc_logging import get_logger, log_info_sampled
 
-# Basic logging function placeholder
+_logger = get_logger(__name__)
+
+# Logging helpers (leveled, see services/lc_logging.py)
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # Helper function to generate UUIDs (as per pseudo-code's generate_system_uuidv4_primitive)
 def generate_system_uuidv4_primitive() -> uuid.UUID:
@@ -122,10 +126,11 @@ def _startle_process_input_components(input_data_components: List[Dict], trace_i
     return raw_signals_for_madaSeed, signal_meta_for_L1_context
 
 
-def _startle_create_initial_madaSeed_shell(seed_uid: str, trace_id_val: str, raw_signals_list: List[RawSignal]) -> MadaSeed:
+def _startle_build_madaSeed_shell(seed_uid: str, trace_id_val: str, raw_signals_list: List[RawSignal]) -> MadaSeed:
     """
-    Creates the top-level madaSeed structure with L1 trace_id and raw_signals.
-    L2-L7 content and trace objects are initialized with minimal placeholders.
+    Builds the top-level madaSeed structure with L1 trace_id and raw_signals, validating
+    every L2-L7 placeholder. Used once to build _MADA_SEED_TEMPLATE (and by the L1 benchmark);
+    per-event shells come from _startle_create_initial_madaSeed_shell.
     """
     # Placeholder objects for layers L2-L7, ensuring all required fields are set
     # Note: For enums, using the first valid enum value or a specific "Pending" if defined.
@@ -145,25 +150,38 @@ def _startle_create_initial_madaSeed_shell(seed_uid: str, trace_id_val: str, raw
     pending_l7_encoded_app = L7EncodedApplication(version_L7_payload="0.1.1", L7_backlog={"version":"0.1.0"}, seed_outputs=[])
 
 
+    # The L1 placeholders are overwritten by startle_process and cannot satisfy their own
+    # constraints (at least one signal component) before it runs, so they skip validation.
+    # So do the layer containers: their nested-layer fields are still annotated with the
+    # *Obj placeholder types in mada_schema.py. Every leaf placeholder below is validated.
+    pending_l1_context_obj = L1StartleContextObj.model_construct(
+        version="0.0.0", # Temp version
+        L1_epistemic_state_of_startle=L1EpistemicStateOfStartleEnum.LCL_FAILURE_INTERNAL_L1,
+        trace_creation_time_L1=dt.fromisoformat(_startle_get_current_timestamp_utc().replace('Z', '+00:00')), # Temp time
+        input_origin_L1=None, signal_components_metadata_L1=[], error_details=None # Temp list
+    )
+    pending_l1_trace = L1Trace.model_construct(
+        version_L1_trace_schema="0.0.0", sop_name="lC.SOP.startle",
+        completion_timestamp_L1=dt.fromisoformat(_startle_get_current_timestamp_utc().replace('Z', '+00:00')),
+        epistemic_state_L1=L1EpistemicStateOfStartleEnum.LCL_FAILURE_INTERNAL_L1,
+        L1_trace_creation_time_from_context=dt.fromisoformat(_startle_get_current_timestamp_utc().replace('Z', '+00:00')),
+        L1_signal_component_count=0
+    )
+
     shell = MadaSeed(
         version="0.3.0",
         seed_id=seed_uid,
         seed_content=SeedContent(
             raw_signals=raw_signals_list,
-            L1_startle_reflex=L1StartleReflex(
-                L1_startle_context_obj=L1StartleContextObj( # Placeholder, will be filled by L1 logic
-                    version="0.0.0", # Temp version
-                    L1_epistemic_state_of_startle=L1EpistemicStateOfStartleEnum.LCL_FAILURE_INTERNAL_L1,
-                    trace_creation_time_L1=_startle_get_current_timestamp_utc(), # Temp time
-                    signal_components_metadata_L1=[] # Temp list
-                ), 
-                L2_frame_type=L2FrameType( # Nesting L2 placeholder
+            L1_startle_reflex=L1StartleReflex.model_construct(
+                L1_startle_context_obj=pending_l1_context_obj, # Placeholder, will be filled by L1 logic
+                L2_frame_type=L2FrameType.model_construct( # Nesting L2 placeholder
                     L2_frame_type_obj=pending_l2_frame_obj,
-                    L3_surface_keymap=L3SurfaceKeymap( # Nesting L3 placeholder
+                    L3_surface_keymap=L3SurfaceKeymap.model_construct( # Nesting L3 placeholder
                         L3_surface_keymap_obj=pending_l3_keymap_obj,
-                        L4_anchor_state=L4AnchorState( # Nesting L4 placeholder
+                        L4_anchor_state=L4AnchorState.model_construct( # Nesting L4 placeholder
                             L4_anchor_state_obj=pending_l4_anchor_obj,
-                            L5_field_state=L5FieldState( # Nesting L5 placeholder
+                            L5_field_state=L5FieldState.model_construct( # Nesting L5 placeholder
                                 L5_field_state_obj=pending_l5_field_obj,
                                 L6_reflection_payload=L6ReflectionPayload( # Nesting L6 placeholder
                                     L6_reflection_payload_obj=pending_l6_reflection_payload_obj,
@@ -177,13 +195,7 @@ def _startle_create_initial_madaSeed_shell(seed_uid: str, trace_id_val: str, raw
         ),
         trace_metadata=TraceMetadata(
             trace_id=trace_id_val,
-            L1_trace=L1Trace( # Placeholder, will be filled by L1 logic
-                version_L1_trace_schema="0.0.0", sop_name="lC.SOP.startle", 
-                completion_timestamp_L1=_startle_get_current_timestamp_utc(), 
-                epistemic_state_L1=L1EpistemicStateOfStartleEnum.LCL_FAILURE_INTERNAL_L1,
-                L1_trace_creation_time_from_context=_startle_get_current_timestamp_utc(),
-                L1_signal_component_count=0
-            ), 
+            L1_trace=pending_l1_trace, # Placeholder, will be filled by L1 logic
             L2_trace=L2Trace(version_L2_trace_schema="0.1.0", sop_name="lC.SOP.frame_click", completion_timestamp_L2=_startle_get_current_timestamp_utc(), epistemic_state_L2=L2EpistemicStateOfFramingEnum.LCL_FAILURE_INTERNAL_L2, error_detail="Pending_L2"),
             L3_trace=L3Trace(version_L3_trace_schema="0.1.0", sop_name="lC.SOP.keymap_click", completion_timestamp_L3=_startle_get_current_timestamp_utc(), epistemic_state_L3="Pending_L3"),
             L4_trace=L4Trace(version_L4_trace_schema="0.1.0", sop_name="lC.SOP.anchor_click", completion_timestamp_L4=_startle_get_current_timestamp_utc(), epistemic_state_L4=L4EpistemicStateOfAnchoringEnum.LCL_FAILURE_INTERNAL_L4, error_details="Pending_L4"),
@@ -196,8 +208,66 @@ def _startle_create_initial_madaSeed_shell(seed_uid: str, trace_id_val: str, raw
     )
     return shell
 
+# Built and validated once, then cloned per event: the L2-L7 placeholders are constants,
+# so re-running Pydantic validation over the whole tree on every event buys nothing.
+_MADA_SEED_TEMPLATE: Optional[MadaSeed] = None
+
+def _startle_get_madaSeed_template() -> MadaSeed:
+    global _MADA_SEED_TEMPLATE
+    if _MADA_SEED_TEMPLATE is None:
+        _MADA_SEED_TEMPLATE = _startle_build_madaSeed_shell("urn:crux:uid::template", "urn:crux:uid::template", [])
+    return _MADA_SEED_TEMPLATE
+
+def _startle_create_initial_madaSeed_shell(seed_uid: str, trace_id_val: str, raw_signals_list: List[RawSignal]) -> MadaSeed:
+    """
+    Creates the top-level madaSeed structure with L1 trace_id and raw_signals.
+    L2-L7 content and trace objects are initialized with minimal placeholders.
+
+    The shell is a structural copy of the prebuilt template: every container and placeholder
+    object is a fresh shallow copy (so assigning to any of them never touches the template),
+    and only IDs, timestamps and raw signals are substituted. Later layers replace the
+    placeholders rather than mutating their nested contents.
+    """
+    template = _startle_get_madaSeed_template()
+    current_time_dt = dt.fromisoformat(_startle_get_current_timestamp_utc().replace('Z', '+00:00'))
+
+    l1_reflex = template.seed_content.L1_startle_reflex
+    l2 = l1_reflex.L2_frame_type
+    l3 = l2.L3_surface_keymap
+    l4 = l3.L4_anchor_state
+    l5 = l4.L5_field_state
+    l6 = l5.L6_reflection_payload
+    l6_payload_obj = l6.L6_reflection_payload_obj
+    l6_copy = l6.model_copy(update={
+        "L6_reflection_payload_obj": l6_payload_obj.model_copy(update={"payload_metadata": l6_payload_obj.payload_metadata.model_copy(
+            update={"source_trace_id": trace_id_val, "generation_timestamp": current_time_dt})}),
+        "L7_encoded_application": l6.L7_encoded_application.model_copy(),
+    })
+    l5_copy = l5.model_copy(update={"L5_field_state_obj": l5.L5_field_state_obj.model_copy(), "L6_reflection_payload": l6_copy})
+    l4_copy = l4.model_copy(update={"L4_anchor_state_obj": l4.L4_anchor_state_obj.model_copy(), "L5_field_state": l5_copy})
+    l3_copy = l3.model_copy(update={"L3_surface_keymap_obj": l3.L3_surface_keymap_obj.model_copy(), "L4_anchor_state": l4_copy})
+    l2_copy = l2.model_copy(update={"L2_frame_type_obj": l2.L2_frame_type_obj.model_copy(), "L3_surface_keymap": l3_copy})
+    l1_reflex_copy = l1_reflex.model_copy(update={
+        "L1_startle_context_obj": l1_reflex.L1_startle_context_obj.model_copy(update={"trace_creation_time_L1": current_time_dt, "signal_components_metadata_L1": []}),
+        "L2_frame_type": l2_copy,
+    })
+
+    trace_updates: Dict[str, Any] = {"trace_id": trace_id_val}
+    for layer in range(1, 8):
+        trace = getattr(template.trace_metadata, f"L{layer}_trace")
+        trace_updates[f"L{layer}_trace"] = trace.model_copy(update={f"completion_timestamp_L{layer}": current_time_dt})
+    trace_updates["L1_trace"] = trace_updates["L1_trace"].model_copy(update={"L1_trace_creation_time_from_context": current_time_dt})
+
+    return template.model_copy(update={
+        "seed_id": seed_uid,
+        "seed_content": template.seed_content.model_copy(update={"raw_signals": list(raw_signals_list), "L1_startle_reflex": l1_reflex_copy}),
+        "trace_metadata": template.trace_metadata.model_copy(update=trace_updates),
+        "seed_QA_QC": template.seed_QA_QC.model_copy(update={"qa_qc_assessment_timestamp": current_time_dt}),
+    })
+
 # --- Main startle Process Function ---
 
+@instrument_layer("L1")
 def startle_process(input_event: Dict[str, Any]) -> MadaSeed:
     """
     Defines the mandatory epistemic reflex initiating a processing loop upon detection of any raw input signal event.
@@ -214,7 +284,7 @@ def startle_process(input_event: Dict[str, Any]) -> MadaSeed:
     # Initialize madaSeed with error state in case of early failure
     # This shell must be valid according to Pydantic models from the start.
     error_seed_shell = _startle_create_initial_madaSeed_shell("ERROR_SEED_ID", "ERROR_TRACE_ID", [])
-    error_seed_shell.trace_metadata.L1_trace = L1Trace(
+    error_seed_shell.trace_metadata.L1_trace = L1Trace.model_construct( # No components yet, so the count cannot satisfy ge=1
         version_L1_trace_schema="0.1.0", sop_name="lC.SOP.startle", 
         completion_timestamp_L1=current_time_init_fail_dt,
         epistemic_state_L1=L1EpistemicStateOfStartleEnum.LCL_FAILURE_INTERNAL_L1,
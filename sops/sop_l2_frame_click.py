@@ -3,25 +3,31 @@ from typing import List, Dict, Tuple, Any, Optional
 
 # Corrected imports to point to lc_python_core.mada_seed_types
 from lc_python_core.mada_seed_types import (
-    MadaSeed, L1StartleContext, L2FrameTypeObj, L2Trace, TemporalHintL2,
+    MadaSeed, L1StartleContext, L2FrameTypeObj, TemporalHintL2,
     CommunicationContextL2, L1Trace, # Added L1Trace for completeness
     L2EpistemicStateOfFramingEnum, InputClassL2Enum,
     TemporalHintProvenanceL2Enum, L2ValidationStatusOfFrameEnum,
     PYDANTIC_AVAILABLE # Import PYDANTIC_AVAILABLE flag
 )
+# The trace is written with the madaSeed schema model so a dumped seed validates back
+from lc_python_core.schemas.mada_schema import L2Trace
+from ..services.lc_metrics import instrument_layer
+from ..services.lc_logging import get_logger, log_info_sampled
+
+_logger = get_logger(__name__)
 
 # Basic logging function placeholder (reuse from L1 or define if separate)
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # --- Internal Helper Function Definitions ---
 
@@ -253,6 +259,7 @@ def _frame_extract_temporal_hint_l2(
 
 # --- Main frame_click Process Function ---
 
+@instrument_layer("L2")
 def frame_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
     """
     Processes the madaSeed object from L1 (startle) to populate L2 framing information.
@@ -267,12 +274,11 @@ def frame_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
         # Update L2 trace and content with error state
         if mada_seed_input: # Ensure mada_seed_input is not None before trying to update
             mada_seed_input.trace_metadata.L2_trace = L2Trace(
-                version_Lx_trace_schema="0.1.0", # field from PlaceholderTraceObj
+                version_L2_trace_schema="0.1.0",
                 sop_name="lC.SOP.frame_click",
-                completion_timestamp_Lx=current_timestamp_utc, # field from PlaceholderTraceObj
-                epistemic_state_Lx=L2EpistemicStateOfFramingEnum.LCL_FAILURE_INTERNAL_L2.value, # Use .value for string field
-                error_details=error_detail_msg # field from PlaceholderTraceObj
-                # Add any L2Trace specific fields with defaults if not covered by PlaceholderTraceObj
+                completion_timestamp_L2=current_timestamp_utc,
+                epistemic_state_L2=L2EpistemicStateOfFramingEnum.LCL_FAILURE_INTERNAL_L2.value,
+                error_details=error_detail_msg
             )
             # Update L2 content part
             mada_seed_input.seed_content.L1_startle_reflex.L2_frame_type.L2_frame_type_obj = L2FrameTypeObj(
@@ -379,11 +385,11 @@ def frame_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
         # --- Populate L2_trace ---
         # current_time_l2_final_dt = dt.fromisoformat(_frame_get_current_timestamp_utc().replace('Z', '+00:00')) # Replaced by current_timestamp_utc
         l2_trace_obj = L2Trace(
-            version_Lx_trace_schema="0.1.0", # field from PlaceholderTraceObj
+            version_L2_trace_schema="0.1.0",
             sop_name="lC.SOP.frame_click", 
-            completion_timestamp_Lx=current_timestamp_utc, # field from PlaceholderTraceObj, use current_timestamp_utc
-            epistemic_state_Lx=final_l2_epistemic_state.value, # Use .value for string field
-            # L2Trace specific fields (ensure these are defined in L2Trace or set via **kwargs if PlaceholderTraceObj is flexible)
+            completion_timestamp_L2=current_timestamp_utc,
+            epistemic_state_L2=final_l2_epistemic_state.value,
+            # L2Trace specific fields
             L2_input_class_determined_in_trace=working_l2_frame_type_obj.input_class_L2.value if working_l2_frame_type_obj.input_class_L2 else None, # Use .value
             L2_frame_type_determined_in_trace=working_l2_frame_type_obj.frame_type_L2, # Assuming this is already a string or None
             L2_temporal_hint_provenance_in_trace=working_l2_frame_type_obj.temporal_hint_L2.provenance.value if (working_l2_frame_type_obj.temporal_hint_L2 and working_l2_frame_type_obj.temporal_hint_L2.provenance) else None, # Use .value
@@ -396,7 +402,7 @@ def frame_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
             L2_validation_status_in_trace=working_l2_frame_type_obj.L2_validation_status_of_frame.value if working_l2_frame_type_obj.L2_validation_status_of_frame else None, # Use .value
             L2_anomaly_flags_count=len(working_l2_frame_type_obj.L2_anomaly_flags_from_framing or []),
             L2_applied_policy_refs=[], # Explicitly set to empty list as per schema/default
-            error_details=working_l2_frame_type_obj.error_details # field from PlaceholderTraceObj
+            error_details=working_l2_frame_type_obj.error_details
         )
         mada_seed_input.trace_metadata.L2_trace = l2_trace_obj
         
@@ -419,15 +425,15 @@ def frame_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
         
         # Update L2_trace with critical error information
         mada_seed_input.trace_metadata.L2_trace = L2Trace(
-             version_Lx_trace_schema="0.1.0", # field from PlaceholderTraceObj
+             version_L2_trace_schema="0.1.0",
              sop_name="lC.SOP.frame_click",
-             completion_timestamp_Lx=current_timestamp_utc, # field from PlaceholderTraceObj, use current_timestamp_utc
-             epistemic_state_Lx=L2EpistemicStateOfFramingEnum.LCL_FAILURE_INTERNAL_L2.value, # Use .value for string field
+             completion_timestamp_L2=current_timestamp_utc,
+             epistemic_state_L2=L2EpistemicStateOfFramingEnum.LCL_FAILURE_INTERNAL_L2.value,
              # L2Trace specific fields
              L2_input_class_determined_in_trace=working_l2_frame_type_obj.input_class_L2.value if working_l2_frame_type_obj.input_class_L2 else None, # Use .value
              L2_frame_type_determined_in_trace=working_l2_frame_type_obj.frame_type_L2,
              L2_validation_status_in_trace=L2ValidationStatusOfFrameEnum.FAILURE_INTERNALERROR.value if L2ValidationStatusOfFrameEnum.FAILURE_INTERNALERROR else None, # Use .value
-             error_details=error_msg, # field from PlaceholderTraceObj
+             error_details=error_msg,
              L2_applied_policy_refs=[] # Default for error case
         )
         return mada_seed_input
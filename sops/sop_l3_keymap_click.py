@@ -12,36 +12,71 @@ from ..schemas.mada_schema import ( # Corrected path
     L3Flags, L3FlagDetail, GriceanViolationHints, 
     EncodingStatusL1Enum
 )
-from pydantic import BaseModel, ValidationError # Added for helper
+from ..services.lc_metrics import instrument_layer, llm_wait
+from pydantic import BaseModel, ValidationError, TypeAdapter # Added for helper
 from typing import Type # Added for helper
 
+import contextvars
 import json
+import os
 import asyncio
 
-from ..services.adk_llm_service import AdkLlmService
+from ..services.lc_llm_registry import get_llm_service
+from ..services.lc_llm_cache import LLM_RESPONSE_CACHE, make_cache_key
 from ..services.mock_lc_core_services import mock_lc_mem_core_get_object # Corrected path
+from .sop_l3_local_extractors import BINARY_PLACEHOLDER, extract_local_features
+from ..services.lc_logging import get_logger, log_info_sampled
 
 # Basic logging function placeholder
-# Initialize ADK LLM Service (module level)
-try:
-    llm_service = AdkLlmService()
-except Exception as e:
-    # If service initialization fails, log and set to None.
-    # Dependent functions will need to handle this.
-    print(f"CRITICAL: Failed to initialize AdkLlmService at module level: {e}")
-    llm_service = None
+# LLM service used by the extractors. By default it is the process-wide service from
+# services/lc_llm_registry.py, created on first use (not at import). keymap_click_process
+# (llm_service=...) injects one for a single run; assigning this attribute (e.g. patching it
+# with a mock, or None for "no LLM") overrides it for the whole module.
+_LLM_SERVICE_FROM_REGISTRY = object()
+llm_service = _LLM_SERVICE_FROM_REGISTRY
+_L3_RUN_LLM_SERVICE: contextvars.ContextVar = contextvars.ContextVar("l3_llm_service", default=None)
+
+def _keymap_llm_service():
+    injected = _L3_RUN_LLM_SERVICE.get()
+    if injected is not None:
+        return injected
+    return get_llm_service() if llm_service is _LLM_SERVICE_FROM_REGISTRY else llm_service
+
+# Upper bound on L3 extractor LLM calls in flight at once for one keymap_click_process run.
+# Override with LC_L3_MAX_CONCURRENCY (1 restores strictly sequential calls).
+L3_MAX_CONCURRENCY = int(os.getenv("LC_L3_MAX_CONCURRENCY", "4"))
+
+# How L3 prompts the LLM. 'per_helper' (default) sends one prompt per extractor, each with
+# the full content. 'consolidated' sends the content once and asks for every section in a
+# single JSON document; only sections that come back missing or invalid are re-asked
+# through their individual helpers. Override with LC_L3_PROMPT_MODE.
+L3_PROMPT_MODE_PER_HELPER = "per_helper"
+L3_PROMPT_MODE_CONSOLIDATED = "consolidated"
+L3_PROMPT_MODE = os.getenv("LC_L3_PROMPT_MODE", L3_PROMPT_MODE_PER_HELPER)
+
+# Where L3 keymap fields come from (see sop_l3_local_extractors.py). 'llm' (default) asks
+# the LLM for everything. 'local' fills what the deterministic extractors can and makes no
+# LLM calls at all. 'local_first' runs the local extractors, then asks the LLM only for the
+# sections and fields they leave empty. Override with LC_L3_EXTRACTION_POLICY.
+L3_EXTRACTION_POLICY_LLM = "llm"
+L3_EXTRACTION_POLICY_LOCAL = "local"
+L3_EXTRACTION_POLICY_LOCAL_FIRST = "local_first"
+L3_EXTRACTION_POLICIES = [L3_EXTRACTION_POLICY_LLM, L3_EXTRACTION_POLICY_LOCAL, L3_EXTRACTION_POLICY_LOCAL_FIRST]
+L3_EXTRACTION_POLICY = os.getenv("LC_L3_EXTRACTION_POLICY", L3_EXTRACTION_POLICY_LLM)
+
+_logger = get_logger(__name__)
 
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # --- Internal Helper Function Definitions ---
 
@@ -135,16 +170,32 @@ async def _call_llm_for_pydantic_model(
     default_empty_model: BaseModel,
     helper_name_for_logging: str,
     primary_content_str_for_logging: Optional[str] = None,
-    l2_frame_type_str_for_logging: Optional[str] = None
+    l2_frame_type_str_for_logging: Optional[str] = None,
+    bypass_cache: bool = False
 ) -> BaseModel:
     """
     Generic helper to call LLM, parse response, and validate against a Pydantic model.
     Returns the parsed model or the default_empty_model on any error.
+    Validated responses are cached in LLM_RESPONSE_CACHE (when enabled) keyed by the
+    prompt, model name and target type; `bypass_cache` forces a fresh model call.
     """
-    if not llm_service:
+    service = _keymap_llm_service()
+    if not service:
         log_internal_error(helper_name_for_logging, {"error": "AdkLlmService is not available."})
         return default_empty_model
 
+    cache_key = None
+    if LLM_RESPONSE_CACHE.enabled and not bypass_cache:
+        model_name = getattr(service, "model_name", None)
+        cache_key = make_cache_key(prompt_text, model_name if isinstance(model_name, str) else None,
+                                   f"{target_model_type.__module__}.{target_model_type.__qualname__}")
+        cached_data = LLM_RESPONSE_CACHE.get(cache_key, label=helper_name_for_logging)
+        if cached_data is not None:
+            try:
+                return target_model_type.model_validate(cached_data)
+            except ValidationError: # Cached under an older schema; ask the model again
+                log_internal_warning(helper_name_for_logging, {"warning": f"Cached response no longer validates as {target_model_type.__name__}, refreshing."})
+
     try:
         # Shorten content string for logging if it's too long
         logged_content = primary_content_str_for_logging
@@ -155,7 +206,8 @@ async def _call_llm_for_pydantic_model(
             "info": f"Sending prompt to LLM for text: '{logged_content if logged_content else 'N/A'}' (Frame type: {l2_frame_type_str_for_logging})",
             # "prompt": prompt_text # Optionally log the full prompt for debugging, can be very verbose
         })
-        llm_response_str = await llm_service.prompt_llm(prompt_text)
+        with llm_wait(helper_name_for_logging):
+            llm_response_str = await service.prompt_llm(prompt_text)
 
         if not llm_response_str:
             log_internal_warning(helper_name_for_logging, {"warning": "LLM returned empty response."})
@@ -165,6 +217,8 @@ async def _call_llm_for_pydantic_model(
 
         parsed_model = target_model_type.model_validate(llm_data)
         log_internal_info(helper_name_for_logging, {"info": f"Successfully parsed LLM response for {target_model_type.__name__}."})
+        if cache_key is not None: # Only validated responses are cached
+            LLM_RESPONSE_CACHE.put(cache_key, parsed_model.model_dump(mode="json"), label=helper_name_for_logging)
         return parsed_model
 
     except json.JSONDecodeError as e:
@@ -223,7 +277,9 @@ Text to analyze:
 
 
 def _keymap_check_encoding(primary_content_str: Optional[str]) -> ContentEncodingStatusL3Enum:
-    if primary_content_str == "[[BINARY_CONTENT_PLACEHOLDER]]":
+    # The local and local_first policies refine this with the local encoding check
+    # (replacement or control characters -> POSSIBLEENCODINGISSUE), see _keymap_apply_local_features.
+    if primary_content_str == BINARY_PLACEHOLDER:
         return ContentEncodingStatusL3Enum.BINARYDETECTED
     return ContentEncodingStatusL3Enum.CONFIRMEDUTF8
 
@@ -559,15 +615,18 @@ Text to analyze (consider also frame type: {l2_frame_type_str}):
     return llm_derived_stats_model
 
 
-async def _keymap_identify_anomalies(primary_content_str: Optional[str], l2_frame_type_str: Optional[str], working_l3_surface_keymap_obj: L3SurfaceKeymapObj) -> L3Flags: # Made async, added context params
-    """Identifies anomalies using LLM, with context from prior analysis."""
-    default_empty_flags = L3Flags(
+def _keymap_empty_flags() -> L3Flags:
+    return L3Flags(
         internal_contradiction_hint=L3FlagDetail(detected=False),
         mixed_affect_signal=L3FlagDetail(detected=False),
         multivalent_cue_detected=L3FlagDetail(detected=False),
         low_confidence_overall_flag=L3FlagDetail(detected=False),
         gricean_violation_hints=GriceanViolationHints(detected=[])
     )
+
+async def _keymap_identify_anomalies(primary_content_str: Optional[str], l2_frame_type_str: Optional[str], working_l3_surface_keymap_obj: L3SurfaceKeymapObj) -> L3Flags: # Made async, added context params
+    """Identifies anomalies using LLM, with context from prior analysis."""
+    default_empty_flags = _keymap_empty_flags()
     if not primary_content_str or primary_content_str == "[[BINARY_CONTENT_PLACEHOLDER]]" or primary_content_str.strip() == "":
         log_internal_info("Helper:_keymap_identify_anomalies", {"info": "Primary content is empty or placeholder, returning default flags."})
         # Potentially analyze working_l3_surface_keymap_obj for anomalies even without primary_content, but for now, require content.
@@ -668,12 +727,208 @@ def _keymap_validate_and_determine_outcome(working_l3_surface_keymap_obj: L3Surf
     return "Keymapped_Successfully"
 
 
+# Keymap sections requested by the consolidated prompt (L3SurfaceKeymapObj field names).
+_KEYMAP_CONSOLIDATED_SECTIONS = [
+    "detected_languages", "explicit_metadata", "content_structure_markers", "lexical_affordances",
+    "syntactic_hints", "pragmatic_affective_affordances", "relational_linking_markers", "statistical_properties",
+]
+_CONSOLIDATED_SECTION_ADAPTERS = {field_name: TypeAdapter(L3SurfaceKeymapObj.model_fields[field_name].annotation) for field_name in _KEYMAP_CONSOLIDATED_SECTIONS}
+
+def _keymap_build_consolidated_prompt(primary_content_str: str, l2_frame_type_str: Optional[str]) -> str:
+    return f"""Analyze the following text and produce its complete L3 surface keymap in ONE response.
+Return a single VALID JSON object with exactly the keys below. Do NOT include comments or trailing commas.
+If a category has no items, use an empty list or object for it. All confidence scores are floats between 0.0 and 1.0.
+{{
+  "detected_languages": [{{"language_code": "en", "confidence": 0.9, "language_name": "English (optional)"}}],
+  "explicit_metadata": [{{"metadata_key": "Author", "metadata_value": "John Doe", "confidence": 0.X, "details": "optional context"}}],
+  "content_structure_markers": ["Heading: Introduction", "List item: * Point A"],
+  "lexical_affordances": {{
+    "keyword_mentions": [{{"term": "example_term", "confidence": 0.X}}],
+    "entity_mentions_raw": [{{"mention": "Example Mention", "confidence": 0.X, "possible_types": ["type1"]}}],
+    "numerical_quantity_mentions": [{{"value_string": "123", "value_numeric": 123, "unit_mention": "kg", "confidence": 0.X}}],
+    "temporal_expression_mentions": [{{"expression": "next week", "confidence": 0.X}}],
+    "quantifier_qualifier_mentions": [{{"term": "many", "type": "quantifier", "confidence": 0.X}}],
+    "negation_markers": [{{"term": "not", "scope": "following phrase", "confidence": 0.X}}]
+  }},
+  "syntactic_hints": {{
+    "sentence_type_distribution": {{"declarative": 0, "interrogative": 0, "exclamatory": 0, "imperative": 0, "other": 0}},
+    "pos_tagging_candidate_flag": true,
+    "punctuation_analysis": {{"period_count": 0, "question_mark_count": 0, "exclamation_mark_count": 0, "comma_count": 0, "quote_count": 0, "other_punctuation_count": 0}},
+    "capitalization_analysis": {{"all_caps_word_count": 0, "sentence_initial_caps_count": 0, "proper_noun_candidate_caps_count": 0}},
+    "emoji_mentions": [{{"emoji_char": "😊", "count": 1, "description": "smiling face", "sentiment_hint": "positive", "confidence": 0.8}}]
+  }},
+  "pragmatic_affective_affordances": {{
+    "formality_hint": {{"level": "neutral", "confidence": 0.X, "markers": []}},
+    "sentiment_hint": {{"polarity": "positive", "confidence": 0.X, "markers": [], "magnitude": 0.X, "scope": "document"}},
+    "politeness_markers": {{"level": "polite", "confidence": 0.X, "markers": []}},
+    "urgency_markers": {{"is_urgent": false, "confidence": 0.X, "markers": [], "level": "low"}},
+    "power_dynamic_markers": {{"direction": "equal", "confidence": 0.X, "markers": []}},
+    "interaction_pattern_affordance": {{"pattern_type": "statement-elaboration", "confidence": 0.X}},
+    "shallow_goal_intent_affordance": {{"goal_type": "inform", "confidence": 0.X}},
+    "actor_role_hint": {{"roles_identified": [], "confidence": 0.X}}
+  }},
+  "relational_linking_markers": {{
+    "explicit_relational_phrases": {{"detected": [{{"phrase": "because of that", "confidence": 0.X, "type": "causal"}}]}},
+    "explicit_reference_markers": {{"detected": [{{"marker": "the aforementioned", "confidence": 0.X}}]}},
+    "url_mentions": {{"detected_urls": [{{"url": "http://example.com", "confidence": 0.X}}]}},
+    "prior_trace_references": []
+  }},
+  "statistical_properties": {{
+    "token_count": {{"value": 150, "confidence": 0.9, "calculation_method": "LLM_estimate"}},
+    "sentence_count": {{"value": 5, "confidence": 0.8, "calculation_method": "LLM_estimate"}},
+    "word_frequency": [{{"word": "example", "count": 3}}],
+    "readability_scores": [{{"score_name": "Flesch_Kincaid_Grade_Level", "score_value": 8.5, "confidence": 0.7}}]
+  }}
+}}
+
+Text to analyze (consider also frame type: {l2_frame_type_str}):
+---
+{primary_content_str}
+---
+"""
+
+async def _keymap_extract_consolidated(primary_content_str: Optional[str], l2_frame_type_str: Optional[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Asks the LLM for every keymap section in one request and validates each section
+    on its own against the matching L3SurfaceKeymapObj field. Returns
+    (valid sections by field name, names of sections that were missing or invalid).
+    The validated sections are cached in LLM_RESPONSE_CACHE like the per-helper responses.
+    """
+    helper_name = "Helper:_keymap_extract_consolidated"
+    if not primary_content_str or primary_content_str == "[[BINARY_CONTENT_PLACEHOLDER]]" or primary_content_str.strip() == "":
+        # The individual helpers return their empty defaults without calling the LLM.
+        return {}, list(_KEYMAP_CONSOLIDATED_SECTIONS)
+    service = _keymap_llm_service()
+    if not service:
+        log_internal_error(helper_name, {"error": "AdkLlmService is not available."})
+        return {}, list(_KEYMAP_CONSOLIDATED_SECTIONS)
+
+    prompt_text = _keymap_build_consolidated_prompt(primary_content_str, l2_frame_type_str)
+    cache_key = None
+    if LLM_RESPONSE_CACHE.enabled:
+        model_name = getattr(service, "model_name", None)
+        cache_key = make_cache_key(prompt_text, model_name if isinstance(model_name, str) else None, "L3SurfaceKeymapObj")
+        cached_data = LLM_RESPONSE_CACHE.get(cache_key, label=helper_name) # Only the sections that validated
+        if isinstance(cached_data, dict):
+            try:
+                sections = {field_name: _CONSOLIDATED_SECTION_ADAPTERS[field_name].validate_python(value) for field_name, value in cached_data.items()}
+                failed = [field_name for field_name in _KEYMAP_CONSOLIDATED_SECTIONS if field_name not in sections]
+                return _keymap_finish_consolidated(helper_name, primary_content_str, sections, failed)
+            except (KeyError, ValidationError): # Cached under an older schema; ask the model again
+                log_internal_warning(helper_name, {"warning": "Cached consolidated response no longer validates, refreshing."})
+
+    try:
+        with llm_wait(helper_name):
+            llm_response_str = await service.prompt_llm(prompt_text)
+        llm_data = json.loads(llm_response_str) if llm_response_str else None
+    except json.JSONDecodeError as e:
+        log_internal_warning(helper_name, {"warning": f"Failed to parse consolidated LLM JSON response: {e}"})
+        return {}, list(_KEYMAP_CONSOLIDATED_SECTIONS)
+    except Exception as e:
+        log_internal_error(helper_name, {"error": f"Consolidated LLM call failed: {e}"})
+        return {}, list(_KEYMAP_CONSOLIDATED_SECTIONS)
+    if not isinstance(llm_data, dict):
+        log_internal_warning(helper_name, {"warning": "Consolidated LLM response was not a JSON object."})
+        return {}, list(_KEYMAP_CONSOLIDATED_SECTIONS)
+
+    sections: Dict[str, Any] = {}
+    failed: List[str] = []
+    for field_name in _KEYMAP_CONSOLIDATED_SECTIONS:
+        if llm_data.get(field_name) is None:
+            failed.append(field_name)
+            continue
+        try:
+            sections[field_name] = _CONSOLIDATED_SECTION_ADAPTERS[field_name].validate_python(llm_data[field_name])
+        except ValidationError as e:
+            log_internal_warning(helper_name, {"warning": f"Section '{field_name}' failed validation, falling back to its helper: {e}"})
+            failed.append(field_name)
+    if cache_key is not None and sections:
+        LLM_RESPONSE_CACHE.put(cache_key, {field_name: _CONSOLIDATED_SECTION_ADAPTERS[field_name].dump_python(value, mode="json") for field_name, value in sections.items()},
+                               label=helper_name)
+    return _keymap_finish_consolidated(helper_name, primary_content_str, sections, failed)
+
+
+def _keymap_finish_consolidated(helper_name: str, primary_content_str: str, sections: Dict[str, Any], failed: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    stats = sections.get("statistical_properties")
+    if stats is not None and not stats.token_count: # Same guarantee as _keymap_calculate_stats
+        stats.token_count = StatisticalValue(value=len(primary_content_str.split()), calculation_method="simple_whitespace_split_python")
+    log_internal_info(helper_name, {"info": f"Consolidated response provided {len(sections)} sections; falling back for {failed}."})
+    return sections, failed
+
+
+def _keymap_is_empty(value: Any) -> bool:
+    """True for None, empty containers, and models whose every field is empty."""
+    if value is None:
+        return True
+    if isinstance(value, (list, dict, str)):
+        return len(value) == 0
+    if isinstance(value, BaseModel):
+        return all(_keymap_is_empty(getattr(value, field_name)) for field_name in type(value).model_fields)
+    return False
+
+def _keymap_apply_local_features(working_l3_surface_keymap_obj: L3SurfaceKeymapObj, local_features: Dict[str, Any]):
+    """
+    Merges the local extractor output into the keymap. A local value wins when it is
+    non-empty or when nothing else filled the field; otherwise the LLM value is kept.
+    """
+    def merge(target: BaseModel, field_name: str, local_value: Any):
+        if not _keymap_is_empty(local_value) or _keymap_is_empty(getattr(target, field_name)):
+            setattr(target, field_name, local_value)
+
+    if "content_encoding_status" in local_features:
+        working_l3_surface_keymap_obj.content_encoding_status = local_features["content_encoding_status"]
+    for field_name in ("content_structure_markers", "statistical_properties", "relational_linking_markers"):
+        if field_name in local_features:
+            merge(working_l3_surface_keymap_obj, field_name, local_features[field_name])
+    for field_name, local_value in local_features.get("lexical", {}).items():
+        merge(working_l3_surface_keymap_obj.lexical_affordances, field_name, local_value)
+    if "emoji_mentions" in local_features:
+        merge(working_l3_surface_keymap_obj.syntactic_hints, "emoji_mentions", local_features["emoji_mentions"])
+
+async def _keymap_run_extractors(extractors: Dict[str, Any], primary_content_str: Optional[str], l2_frame_type_str: Optional[str], max_concurrency: int) -> Dict[str, Any]:
+    """
+    Runs independent extractor helpers (keymap field -> async helper(content, frame_type))
+    concurrently, with at most `max_concurrency` in flight. Returns field -> result.
+    If any helper raises, the first error is re-raised once all helpers have finished.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_one(helper):
+        async with semaphore:
+            return await helper(primary_content_str, l2_frame_type_str)
+
+    results = await asyncio.gather(*(run_one(helper) for helper in extractors.values()), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(extractors, results))
+
+
 # --- Main keymap_click Process Function ---
 
-async def keymap_click_process(mada_seed_input: MadaSeed) -> MadaSeed: # Made async
+@instrument_layer("L3")
+async def keymap_click_process(mada_seed_input: MadaSeed, max_concurrency: Optional[int] = None, prompt_mode: Optional[str] = None,
+                               extraction_policy: Optional[str] = None, llm_service: Optional[Any] = None) -> MadaSeed: # Made async
     """
     Processes the madaSeed object from L2 (frame_click) to populate L3 surface keymap information.
+    The LLM-backed extractors run concurrently, at most `max_concurrency` (default
+    L3_MAX_CONCURRENCY) at a time; anomaly detection runs last on the assembled keymap.
+    `prompt_mode` (default L3_PROMPT_MODE) selects per-helper or consolidated prompting.
+    `extraction_policy` (default L3_EXTRACTION_POLICY) selects LLM-only, local-only or
+    local-first extraction. `llm_service` (anything with `async prompt_llm(prompt_text)`)
+    is used for this run instead of the module's service, e.g. a pooled client or a stub.
     """
+    if llm_service is None:
+        return await _keymap_click_process(mada_seed_input, max_concurrency, prompt_mode, extraction_policy)
+    token = _L3_RUN_LLM_SERVICE.set(llm_service) # Inherited by the extractor tasks
+    try:
+        return await _keymap_click_process(mada_seed_input, max_concurrency, prompt_mode, extraction_policy)
+    finally:
+        _L3_RUN_LLM_SERVICE.reset(token)
+
+
+async def _keymap_click_process(mada_seed_input: MadaSeed, max_concurrency: Optional[int], prompt_mode: Optional[str],
+                                extraction_policy: Optional[str]) -> MadaSeed:
     current_time_fail_dt = dt.fromisoformat(_keymap_get_current_timestamp_utc().replace('Z', '+00:00'))
 
     if not _keymap_validate_l2_data_in_madaSeed(mada_seed_input):
@@ -711,35 +966,50 @@ async def keymap_click_process(mada_seed_input: MadaSeed) -> MadaSeed: # Made as
                 raise ValueError("Missing primary text content for L3 keymapping and not identified as binary.")
 
         # --- Populate surface_map (working_l3_surface_keymap_obj) ---
-        # All helper calls below need to be awaited if they are async.
-        
-        # _keymap_detect_language is now async
-        working_l3_surface_keymap_obj.detected_languages = await _keymap_detect_language(primary_content_for_l3, input_frame_type_from_l2)
-        
-        working_l3_surface_keymap_obj.content_encoding_status = _keymap_check_encoding(primary_content_for_l3) # Stays sync
-        
-        # _keymap_extract_explicit_meta will be async (in a later patch)
-        working_l3_surface_keymap_obj.explicit_metadata = _keymap_extract_explicit_meta(primary_content_for_l3, input_frame_type_from_l2) # Stays sync for now
-        
-        # _keymap_extract_structure_markers will be async (in a later patch)
-        working_l3_surface_keymap_obj.content_structure_markers = _keymap_extract_structure_markers(primary_content_for_l3, input_frame_type_from_l2) # Stays sync for now
-        
-        lexical_data = await _keymap_extract_lexical(primary_content_for_l3, input_frame_type_from_l2) # Already async, refactored to helper
-        working_l3_surface_keymap_obj.lexical_affordances = lexical_data
-        
-        syntactic_data = await _keymap_derive_syntactic(primary_content_for_l3, input_frame_type_from_l2) # Now async, uses LLM & helper
-        working_l3_surface_keymap_obj.syntactic_hints = syntactic_data
-        
-        # _keymap_derive_pragmatic_affective will be async and use primary_content_for_l3 (in a later patch)
-        # For now, its signature and call site remain unchanged.
-        working_l3_surface_keymap_obj.pragmatic_affective_affordances = _keymap_derive_pragmatic_affective(lexical_data, syntactic_data) # Stays sync for now
-        
-        # _keymap_extract_relational_linking will be async (in a later patch)
-        working_l3_surface_keymap_obj.relational_linking_markers = _keymap_extract_relational_linking(primary_content_for_l3) # Stays sync for now
-        
-        # _keymap_calculate_stats will be async (in a later patch)
-        working_l3_surface_keymap_obj.statistical_properties = _keymap_calculate_stats(primary_content_for_l3, input_frame_type_from_l2) # Stays sync for now
-        working_l3_surface_keymap_obj.L3_flags = _keymap_identify_anomalies(working_l3_surface_keymap_obj)
+        working_l3_surface_keymap_obj.content_encoding_status = _keymap_check_encoding(primary_content_for_l3) # Sync, no LLM
+
+        # Dependency graph: every extractor below needs only the primary content and the
+        # L2 frame type, so they run concurrently. Anomaly detection reads the assembled
+        # keymap and therefore runs after all of them.
+        extractors = {
+            "detected_languages": _keymap_detect_language,
+            "explicit_metadata": _keymap_extract_explicit_meta,
+            "content_structure_markers": _keymap_extract_structure_markers,
+            "lexical_affordances": _keymap_extract_lexical,
+            "syntactic_hints": _keymap_derive_syntactic,
+            "pragmatic_affective_affordances": _keymap_derive_pragmatic_affective,
+            "relational_linking_markers": _keymap_extract_relational_linking,
+            "statistical_properties": _keymap_calculate_stats,
+        }
+        policy = extraction_policy or L3_EXTRACTION_POLICY
+        if policy not in L3_EXTRACTION_POLICIES:
+            log_internal_warning("keymap_click_process", {"warning": f"Unknown L3 extraction policy '{policy}', using '{L3_EXTRACTION_POLICY_LLM}'."})
+            policy = L3_EXTRACTION_POLICY_LLM
+        local_features: Dict[str, Any] = {}
+        if policy != L3_EXTRACTION_POLICY_LLM:
+            local_features = extract_local_features(primary_content_for_l3)
+        if policy == L3_EXTRACTION_POLICY_LOCAL:
+            extractors = {}
+        elif policy == L3_EXTRACTION_POLICY_LOCAL_FIRST: # Only sections the local pass left empty go to the LLM
+            extractors = {field_name: helper for field_name, helper in extractors.items() if _keymap_is_empty(local_features.get(field_name))}
+        mode = prompt_mode or L3_PROMPT_MODE
+        extracted: Dict[str, Any] = {}
+        if mode == L3_PROMPT_MODE_CONSOLIDATED and extractors:
+            extracted, failed_sections = await _keymap_extract_consolidated(primary_content_for_l3, input_frame_type_from_l2)
+            extractors = {field_name: helper for field_name, helper in extractors.items() if field_name in failed_sections}
+        elif mode != L3_PROMPT_MODE_PER_HELPER:
+            log_internal_warning("keymap_click_process", {"warning": f"Unknown L3 prompt mode '{mode}', using '{L3_PROMPT_MODE_PER_HELPER}'."})
+        extracted.update(await _keymap_run_extractors(extractors, primary_content_for_l3, input_frame_type_from_l2,
+                                                      max_concurrency if max_concurrency is not None else L3_MAX_CONCURRENCY))
+        for field_name, value in extracted.items():
+            setattr(working_l3_surface_keymap_obj, field_name, value)
+        if local_features:
+            _keymap_apply_local_features(working_l3_surface_keymap_obj, local_features)
+
+        if policy == L3_EXTRACTION_POLICY_LOCAL:
+            working_l3_surface_keymap_obj.L3_flags = _keymap_empty_flags() # Anomaly detection needs the LLM
+        else:
+            working_l3_surface_keymap_obj.L3_flags = await _keymap_identify_anomalies(primary_content_for_l3, input_frame_type_from_l2, working_l3_surface_keymap_obj)
 
         # --- Validate surface_map & Determine L3 Outcome ---
         final_l3_epistemic_state_str = _keymap_validate_and_determine_outcome(working_l3_surface_keymap_obj)
@@ -818,7 +1088,7 @@ if __name__ == '__main__':
     # 3. Pass L2 MadaSeed to keymap_click_process (now async)
     print("\nCalling keymap_click_process with L2 MadaSeed...")
     # Use asyncio.run() to execute the async keymap_click_process
-    if llm_service: # Only run if service initialized
+    if _keymap_llm_service(): # Only run if service initialized
         l3_seed = asyncio.run(keymap_click_process(l2_seed))
     else:
         print("Skipping keymap_click_process run because AdkLlmService failed to initialize.")
@@ -847,7 +1117,7 @@ if __name__ == '__main__':
     l1_seed_bin = startle_process(example_input_event_binary)
     l2_seed_bin = frame_click_process(l1_seed_bin) # sync
     print("\nCalling keymap_click_process with L2 MadaSeed (Binary Hint)...")
-    if llm_service: # Only run if service initialized
+    if _keymap_llm_service(): # Only run if service initialized
         l3_seed_bin = asyncio.run(keymap_click_process(l2_seed_bin)) # async
     else:
         print("Skipping keymap_click_process run (binary) because AdkLlmService failed to initialize.")
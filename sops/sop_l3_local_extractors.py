@@ -0,0 +1,188 @@
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+from ..schemas.mada_schema import (
+    ContentEncodingStatusL3Enum,
+    NumericalQuantityMention, TemporalExpressionMention, QuantifierQualifierMention, NegationMarker,
+    QuantifierQualifierTypeEnum, EmojiMention,
+    RelationalLinkingMarkers, ExplicitRelationalPhrases, ExplicitReferenceMarkers, UrlMentions,
+    PriorTraceReference, PriorTraceReferenceTypeEnum,
+    StatisticalProperties, StatisticalValue, StatisticalScore,
+)
+
+# Deterministic L3 extractors (compiled regexes and word lists, no LLM) used by
+# sop_l3_keymap_click.py. They cover the keymap fields that are mechanical to
+# compute: counts and statistics, URLs, emoji, numbers, negations, quantifiers,
+# simple temporal expressions, connectives, structure markers and the encoding
+# check. Everything here runs in microseconds on typical message sizes.
+
+BINARY_PLACEHOLDER = "[[BINARY_CONTENT_PLACEHOLDER]]"
+
+# Confidence reported for regex matches: the match itself is certain, its reading is not.
+LOCAL_CONFIDENCE = 0.9
+
+_WORD_RE = re.compile(r"\b\w+(?:['’-]\w+)*\b", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+_URL_RE = re.compile(r"\b(?:https?://|www\.)[^\s<>\"']+", re.IGNORECASE)
+_URL_TRAILING_PUNCTUATION = ".,;:!?)]}'\""
+_EMOJI_RE = re.compile(
+    "[\U0001F1E6-\U0001F1FF\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF"
+    "\U0001F900-\U0001F9FF\U0001FA70-\U0001FAFF☀-⛿✀-➿]"
+)
+_NUMBER_RE = re.compile(
+    r"(?P<currency>[$€£])?(?<![\w.])(?P<number>[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)"
+    r"(?:\s?(?P<unit>%|percent\b|kg\b|km\b|cm\b|mm\b|m\b|g\b|mg\b|lbs?\b|mi\b|ft\b|kb\b|mb\b|gb\b|tb\b|ms\b|s\b|secs?\b|seconds?\b"
+    r"|mins?\b|minutes?\b|h\b|hrs?\b|hours?\b|days?\b|weeks?\b|months?\b|years?\b|usd\b|eur\b|gbp\b))?",
+    re.IGNORECASE,
+)
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|none|nobody|nothing|nowhere|neither|nor|cannot|without|\w+n['’]t)\b", re.IGNORECASE)
+_QUANTIFIERS = ["all", "every", "each", "some", "any", "many", "much", "few", "several", "most", "none", "both", "numerous"]
+_QUALIFIERS = ["very", "quite", "rather", "somewhat", "slightly", "extremely", "fairly", "probably", "possibly", "perhaps", "likely", "maybe", "almost", "nearly"]
+_QUANTIFIER_RE = re.compile(r"\b(?:" + "|".join(_QUANTIFIERS) + r")\b", re.IGNORECASE)
+_QUALIFIER_RE = re.compile(r"\b(?:" + "|".join(_QUALIFIERS) + r")\b", re.IGNORECASE)
+_MONTHS = "january|february|march|april|may|june|july|august|september|october|november|december|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec"
+_WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+_TEMPORAL_RE = re.compile(
+    r"\b(?:\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?Z?)?"
+    r"|\d{1,2}/\d{1,2}/\d{2,4}"
+    r"|\d{1,2}:\d{2}\s?(?:am|pm)?"
+    r"|(?:" + _MONTHS + r")\.?\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?"
+    r"|today|tonight|tomorrow|yesterday|now|asap"
+    r"|(?:next|last|this)\s+(?:week|month|year|quarter|" + _WEEKDAYS + r")"
+    r"|(?:" + _WEEKDAYS + r"))\b",
+    re.IGNORECASE,
+)
+_RELATIONAL_PHRASE_RE = re.compile(
+    r"\b(?:because(?: of)?|therefore|thus|hence|consequently|as a result|so that|however|although|whereas|"
+    r"nevertheless|on the other hand|in contrast|in addition|furthermore|moreover|for example|for instance|such as|"
+    r"in order to|due to|unless|otherwise)\b",
+    re.IGNORECASE,
+)
+_REFERENCE_MARKER_RE = re.compile(
+    r"\b(?:as mentioned(?: (?:above|below|before|earlier))?|as noted|as discussed|as stated|see (?:above|below)|"
+    r"the aforementioned|the above|the following|previously|earlier)\b",
+    re.IGNORECASE,
+)
+_TRACE_ID_RE = re.compile(r"\burn:crux:uid::[0-9a-fA-F]+|\btrace[_ -]?id[:=\s]+[\w-]+", re.IGNORECASE)
+_RELATIVE_TRACE_RE = re.compile(r"\b(?:my|your|the) (?:previous|last|earlier) (?:message|request|question|reply|trace)\b", re.IGNORECASE)
+_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+_LIST_ITEM_RE = re.compile(r"^\s*([-*+•]|\d+[.)])\s+(.+)$")
+_SEPARATOR_RE = re.compile(r"^\s*(-{3,}|\*{3,}|_{3,}|={3,})\s*$")
+_CODE_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_CONTROL_CHAR_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def is_text_content(primary_content_str: Optional[str]) -> bool:
+    return bool(primary_content_str) and primary_content_str != BINARY_PLACEHOLDER and primary_content_str.strip() != ""
+
+
+def tokenize_words(text: str) -> List[str]:
+    return _WORD_RE.findall(text)
+
+
+def local_encoding_status(primary_content_str: Optional[str]) -> ContentEncodingStatusL3Enum:
+    if primary_content_str == BINARY_PLACEHOLDER:
+        return ContentEncodingStatusL3Enum.BINARYDETECTED
+    if primary_content_str and ("�" in primary_content_str or _CONTROL_CHAR_RE.search(primary_content_str)):
+        return ContentEncodingStatusL3Enum.POSSIBLEENCODINGISSUE
+    return ContentEncodingStatusL3Enum.CONFIRMEDUTF8
+
+
+def local_statistics(text: str) -> StatisticalProperties:
+    words = [word.lower() for word in tokenize_words(text)]
+    sentence_count = len(_SENTENCE_END_RE.findall(text))
+    if words and not text.rstrip().endswith((".", "!", "?")):
+        sentence_count += 1 # Trailing sentence without terminal punctuation
+    stats = StatisticalProperties(token_count=StatisticalValue(value=len(words)), sentence_count=StatisticalValue(value=sentence_count))
+    if words:
+        counts = Counter(words)
+        stats.lexical_diversity = StatisticalScore(score=round(len(counts) / len(words), 4))
+        stats.entropy_score = StatisticalScore(score=round(-sum((n / len(words)) * math.log2(n / len(words)) for n in counts.values()), 4))
+    return stats
+
+
+def local_numerical_quantities(text: str) -> List[NumericalQuantityMention]:
+    mentions = []
+    for match in _NUMBER_RE.finditer(text):
+        unit = match.group("unit") or match.group("currency")
+        mentions.append(NumericalQuantityMention(value_string=match.group("number"), confidence=LOCAL_CONFIDENCE, unit_mention=unit))
+    return mentions
+
+
+def local_negation_markers(text: str) -> List[NegationMarker]:
+    return [NegationMarker(term=match.group(0), confidence=LOCAL_CONFIDENCE, scope_hint_indices=[match.start(), match.end()])
+            for match in _NEGATION_RE.finditer(text)]
+
+
+def local_quantifier_qualifiers(text: str) -> List[QuantifierQualifierMention]:
+    mentions = [(match.start(), match.group(0), QuantifierQualifierTypeEnum.QUANTIFIER) for match in _QUANTIFIER_RE.finditer(text)]
+    mentions += [(match.start(), match.group(0), QuantifierQualifierTypeEnum.QUALIFIER) for match in _QUALIFIER_RE.finditer(text)]
+    return [QuantifierQualifierMention(term=term, type=kind, confidence=LOCAL_CONFIDENCE) for _, term, kind in sorted(mentions, key=lambda m: m[0])]
+
+
+def local_temporal_expressions(text: str) -> List[TemporalExpressionMention]:
+    return [TemporalExpressionMention(expression=match.group(0), confidence=LOCAL_CONFIDENCE) for match in _TEMPORAL_RE.finditer(text)]
+
+
+def local_urls(text: str) -> List[str]:
+    return [match.group(0).rstrip(_URL_TRAILING_PUNCTUATION) for match in _URL_RE.finditer(text)]
+
+
+def local_emoji_mentions(text: str) -> List[EmojiMention]:
+    counts = Counter(_EMOJI_RE.findall(text))
+    return [EmojiMention(emoji=emoji, count=count) for emoji, count in counts.items()]
+
+
+def local_relational_linking(text: str) -> RelationalLinkingMarkers:
+    prior_refs = [PriorTraceReference(reference_type=PriorTraceReferenceTypeEnum.TRACE_ID_MENTION, reference_value=match.group(0), confidence=LOCAL_CONFIDENCE)
+                  for match in _TRACE_ID_RE.finditer(text)]
+    prior_refs += [PriorTraceReference(reference_type=PriorTraceReferenceTypeEnum.RELATIVE_MENTION, reference_value=match.group(0), confidence=0.7)
+                   for match in _RELATIVE_TRACE_RE.finditer(text)]
+    return RelationalLinkingMarkers(
+        explicit_relational_phrases=ExplicitRelationalPhrases(detected=[match.group(0) for match in _RELATIONAL_PHRASE_RE.finditer(text)]),
+        explicit_reference_markers=ExplicitReferenceMarkers(detected=[match.group(0) for match in _REFERENCE_MARKER_RE.finditer(text)]),
+        url_mentions=UrlMentions(detected_urls=local_urls(text)),
+        prior_trace_references=prior_refs,
+    )
+
+
+def local_structure_markers(text: str) -> List[str]:
+    markers = []
+    for line in text.splitlines():
+        if _CODE_FENCE_RE.match(line):
+            markers.append(f"Code fence: {line.strip()}")
+        elif _SEPARATOR_RE.match(line):
+            markers.append(f"Separator: {line.strip()}")
+        elif _HEADING_RE.match(line):
+            markers.append(f"Heading: {_HEADING_RE.match(line).group(2)}")
+        elif _LIST_ITEM_RE.match(line):
+            markers.append(f"List item: {line.strip()}")
+    return markers
+
+
+def extract_local_features(primary_content_str: Optional[str]) -> Dict[str, Any]:
+    """
+    Runs every local extractor over the content. Returns a dict with the
+    L3SurfaceKeymapObj sections it can fill ('content_encoding_status',
+    'content_structure_markers', 'statistical_properties',
+    'relational_linking_markers'), the LexicalAffordances fields that need no
+    LLM under 'lexical', and 'emoji_mentions' for SyntacticHints. Non-text
+    content yields only the encoding status.
+    """
+    features: Dict[str, Any] = {"content_encoding_status": local_encoding_status(primary_content_str)}
+    if not is_text_content(primary_content_str):
+        return features
+    text = primary_content_str
+    features["content_structure_markers"] = local_structure_markers(text)
+    features["statistical_properties"] = local_statistics(text)
+    features["relational_linking_markers"] = local_relational_linking(text)
+    features["lexical"] = {
+        "numerical_quantity_mentions": local_numerical_quantities(text),
+        "temporal_expression_mentions": local_temporal_expressions(text),
+        "quantifier_qualifier_mentions": local_quantifier_qualifiers(text),
+        "negation_markers": local_negation_markers(text),
+    }
+    features["emoji_mentions"] = local_emoji_mentions(text)
+    return features
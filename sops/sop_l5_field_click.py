@@ -19,19 +19,23 @@ from ..schemas.mada_schema import ( # Corrected path
     # Enums for L4 validation
     L4EpistemicStateOfAnchoringEnum
 )
+from ..services.lc_metrics import instrument_layer
+from ..services.lc_logging import get_logger, log_info_sampled
 
-# Basic logging function placeholder
+_logger = get_logger(__name__)
+
+# Logging helpers (leveled, see services/lc_logging.py)
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # --- Internal Helper Function Definitions ---
 
@@ -293,6 +297,7 @@ def _field_determine_final_l5_outcome(working_field_state_obj: L5FieldStateObj)
 
 # --- Main field_click Process Function ---
 
+@instrument_layer("L5")
 def field_click_process(mada_seed_input: MadaSeed) -> MadaSeed:
     """
     Processes the madaSeed object from L4 (anchor_click) to populate L5 field state information.
@@ -16,19 +16,23 @@ from ..schemas.mada_schema import ( # Corrected path
     FieldMaturity, AACFieldReadiness, MomentumProfile, DialogueContext, BraveSpaceDynamics, FieldRiskAssessment, # For L5 diagnostics selection
     IGDStageAssessmentEnum # For L5 session_maturity
 )
+from ..services.lc_metrics import instrument_layer
+from ..services.lc_logging import get_logger, log_info_sampled
 
-# Basic logging function placeholder
+_logger = get_logger(__name__)
+
+# Logging helpers (leveled, see services/lc_logging.py)
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # --- Internal Helper Function Definitions ---
 
@@ -252,6 +256,7 @@ def _reflect_assemble_hr_payload_parts(policies: Dict, redaction_obj_model: Reda
     return transformation_meta_model, reflection_surf_model, persona_alignment_snapshot_obj_model, persona_flags
 
 # --- Main reflect_boom Process Function ---
+@instrument_layer("L6")
 def reflect_boom_process(mada_seed_input: MadaSeed) -> MadaSeed:
     current_time_fail_dt = dt.fromisoformat(_reflect_get_current_timestamp_utc().replace('Z', '+00:00'))
     if not _reflect_validate_l5_data_in_madaSeed(mada_seed_input):
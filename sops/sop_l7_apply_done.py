@@ -9,23 +9,31 @@ from ..schemas.mada_schema import (
     L7OutputConsumerTypeEnum, L7OutputModalityEnum, L7PbiTypeEnum, L7TemporalPlaneEnum, L7DimensionalPlaneEnum,
     PayloadMetadataTarget, ConsumerTypeEnum
 )
+from ..services.lc_metrics import instrument_layer
 # The next line was duplicated and corrected, ensure only one import for mada_schema components
 # from ..schemas.mada_schema import MadaSeed, L6ReflectionPayloadObj, L6Trace, L7EncodedApplication, L7Trace as L7TraceModel, SeedQAQC, IntegrityFinding, SeedOutputItem, L7Backlog, PBIEntry, AlignmentVector, L7EpistemicStateEnum, SeedIntegrityStatusEnum, QAQCCheckCategoryCodeEnum, QAQCSeverityLevelEnum, L7OutputConsumerTypeEnum, L7OutputModalityEnum, L7PbiTypeEnum, L7TemporalPlaneEnum, L7DimensionalPlaneEnum, PayloadMetadataTarget # Ensure all models are imported via relative path
 from ..services.mock_lc_core_services import mock_lc_gov_core_get_policy
-from lc_python_core.lc_adk_agent.main import process_with_lc_core_tool # Added for ADK agent
+from ..services.lc_logging import get_logger, log_info_sampled
 
-# Basic logging function placeholder
+_logger = get_logger(__name__)
+
+def process_with_lc_core_tool(user_query: str) -> str: # Added for ADK agent
+    # Imported on first use: the agent module loads google.adk, which only this L7 action needs.
+    from lc_python_core.lc_adk_agent.main import process_with_lc_core_tool as adk_process_with_lc_core_tool
+    return adk_process_with_lc_core_tool(user_query=user_query)
+
+# Logging helpers (leveled, see services/lc_logging.py)
 def log_internal_error(helper_name: str, error_info: Dict):
-    print(f"ERROR in {helper_name}: {error_info}")
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
 
 def log_internal_warning(helper_name: str, warning_info: Dict):
-    print(f"WARNING in {helper_name}: {warning_info}")
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
 
 def log_internal_info(helper_name: str, info: Dict):
-    print(f"INFO in {helper_name}: {info}")
+    log_info_sampled(_logger, helper_name, "INFO in %s: %s", helper_name, info)
 
 def log_critical_error(process_name: str, error_info: Dict):
-    print(f"CRITICAL ERROR in {process_name}: {error_info}")
+    _logger.critical("CRITICAL ERROR in %s: %s", process_name, error_info)
 
 # --- Internal Helper Function Definitions ---
 
@@ -377,6 +385,7 @@ def _apply_finalize_l7_trace_and_qa_qc(
 
 # --- Main apply_done Process Function ---
 
+@instrument_layer("L7")
 def apply_done_process(mada_seed_input: MadaSeed, l7_action_intent_override: Optional[str] = None) -> MadaSeed: # Added l7_action_intent_override
     """
     Processes the madaSeed from L6 (reflect_boom) to perform L7 application and finalize the seed.
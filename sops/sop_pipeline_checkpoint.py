@@ -0,0 +1,72 @@
+import os
+import uuid
+from typing import Dict, Optional, Tuple
+
+from pydantic import ValidationError
+from pydantic_core import PydanticSerializationError
+
+from ..schemas.mada_schema import MadaSeed
+from ..services.lc_mem_service import mock_lc_mem_core_create_object, mock_lc_mem_core_get_object, mock_lc_mem_core_delete_object
+from ..services.lc_logging import get_logger
+
+# Per-layer checkpoints of a MadaSeed in the MEM vault, so a failed event can be resumed
+# from its last completed layer instead of being replayed from L1 (see
+# sop_pipeline_runner.resume_pipeline). Each checkpoint is one vault object whose UID is
+# derived from (seed_id, layer), so saving the same layer again overwrites it.
+#
+# The seed is stored as model_dump(mode="json") output and read back with
+# MadaSeed.model_validate, so a checkpoint is plain data: loading one never runs code from
+# the vault, and a payload that does not fit the schema is rejected like a missing one.
+
+PIPELINE_CHECKPOINT_ENABLED = os.getenv("LC_PIPELINE_CHECKPOINT", "0").lower() in ("1", "true", "yes")
+CHECKPOINT_OBJECT_TYPE = "MadaSeedCheckpoint"
+CHECKPOINT_LAYERS = ["L1", "L2", "L3", "L4", "L5", "L6", "L7"]
+
+_CHECKPOINT_UID_NAMESPACE = uuid.UUID("6f1d7c5e-2b0a-4e43-9f7e-4c1a8d2e5b90")
+
+
+_logger = get_logger(__name__)
+
+def log_internal_error(helper_name: str, error_info: Dict):
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
+
+
+def checkpoint_uid(seed_id: str, layer: str) -> str:
+    return f"urn:crux:uid::{uuid.uuid5(_CHECKPOINT_UID_NAMESPACE, f'{seed_id}/{layer}').hex}"
+
+
+def save_seed_checkpoint(mada_seed: MadaSeed, layer: str) -> bool:
+    """Stores `mada_seed` as the checkpoint after `layer` ("L1".."L7"). Failures are logged, not raised."""
+    try:
+        payload = {"seed_id": mada_seed.seed_id, "layer": layer, "seed": mada_seed.model_dump(mode="json")}
+    except (AttributeError, PydanticSerializationError, TypeError) as e:
+        log_internal_error("save_seed_checkpoint", {"seed_id": getattr(mada_seed, "seed_id", None), "layer": layer, "error": f"{type(e).__name__}: {e}"})
+        return False
+    return mock_lc_mem_core_create_object(checkpoint_uid(mada_seed.seed_id, layer), payload, initial_metadata={"object_type": CHECKPOINT_OBJECT_TYPE})
+
+
+def load_seed_checkpoint(seed_id: str, layer: str) -> Optional[MadaSeed]:
+    """The seed as it was after `layer`, or None if there is no (readable) checkpoint."""
+    payload = mock_lc_mem_core_get_object(checkpoint_uid(seed_id, layer))
+    if not payload:
+        return None
+    try:
+        return MadaSeed.model_validate(payload["seed"])
+    except (KeyError, TypeError, ValidationError) as e: # Corrupt payload, or written by an incompatible version of the schema
+        log_internal_error("load_seed_checkpoint", {"seed_id": seed_id, "layer": layer, "error": f"{type(e).__name__}: {e}"})
+        return None
+
+
+def latest_seed_checkpoint(seed_id: str) -> Tuple[Optional[str], Optional[MadaSeed]]:
+    """(layer, seed) for the last layer with a checkpoint, or (None, None)."""
+    for layer in reversed(CHECKPOINT_LAYERS):
+        mada_seed = load_seed_checkpoint(seed_id, layer)
+        if mada_seed is not None:
+            return layer, mada_seed
+    return None, None
+
+
+def clear_seed_checkpoints(seed_id: str, from_layer: str = "L1") -> bool:
+    """Deletes the checkpoints for `from_layer` and every later layer."""
+    layers = CHECKPOINT_LAYERS[CHECKPOINT_LAYERS.index(from_layer):]
+    return all([mock_lc_mem_core_delete_object(checkpoint_uid(seed_id, layer)) for layer in layers])
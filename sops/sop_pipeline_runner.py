@@ -0,0 +1,226 @@
+import asyncio
+import importlib
+import itertools
+import os
+import pickle
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, Optional, Iterable, AsyncIterator, Tuple
+
+from ..schemas.mada_schema import MadaSeed
+from ..services.mock_lc_core_services import mock_lc_mem_core_get_object, mock_lc_mem_core_create_object
+from .sop_l1_startle import startle_process
+from .sop_l2_frame_click import frame_click_process
+from .sop_l3_keymap_click import keymap_click_process
+from .sop_l4_anchor_click import anchor_click_process
+from .sop_l5_field_click import field_click_process
+from .sop_l6_reflect_boom import reflect_boom_process
+from .sop_l7_apply_done import apply_done_process
+from .sop_pipeline_checkpoint import (
+    PIPELINE_CHECKPOINT_ENABLED, CHECKPOINT_LAYERS, save_seed_checkpoint, load_seed_checkpoint,
+    latest_seed_checkpoint, clear_seed_checkpoints
+)
+from ..services.lc_logging import get_logger
+
+# Batch runner for the L1-L7 SOP chain. Each event runs the layers in order; across
+# events the work overlaps:
+#   - L3 (async, LLM-bound) runs on the event loop, with at most PIPELINE_L3_MAX_IN_FLIGHT
+#     events keymapping at once (each of them still bounded by L3_MAX_CONCURRENCY), and
+#   - the synchronous layers (L1, L2, L4-L7) run in a worker pool so they do not block
+#     the loop while other events wait on the LLM.
+# Events are pulled lazily from the input, at most PIPELINE_MAX_IN_FLIGHT at a time.
+#
+# The worker pool is either threads (default) or processes. Threads keep everything in one
+# interpreter, so the Pydantic-heavy layers still share one core. In 'process' mode the seed
+# is pickled to a warm worker process, run through the layer and sent back the same way, so
+# throughput scales with cores. (Pickle rather than JSON because some layers still hold
+# mada_seed_types placeholder objects, which a model_validate round trip would convert to
+# the schema models; the workers are our own processes.) Only L3 touches the in-process
+# MADA mock store, and L3 always runs in the parent.
+#
+# With checkpointing on (LC_PIPELINE_CHECKPOINT=1 or checkpoint=True) the seed is saved to
+# the MEM vault after every completed layer; resume_pipeline(seed_id) picks up after the last
+# one, e.g. to retry an L3 LLM timeout, or to rerun L4-L7 without paying for L3 again.
+
+PIPELINE_MAX_IN_FLIGHT = int(os.getenv("LC_PIPELINE_MAX_IN_FLIGHT", "16"))
+PIPELINE_L3_MAX_IN_FLIGHT = int(os.getenv("LC_PIPELINE_L3_MAX_IN_FLIGHT", "8"))
+PIPELINE_CPU_WORKERS = int(os.getenv("LC_PIPELINE_CPU_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+PIPELINE_EXECUTION_THREAD = "thread"
+PIPELINE_EXECUTION_PROCESS = "process"
+PIPELINE_EXECUTION_MODES = [PIPELINE_EXECUTION_THREAD, PIPELINE_EXECUTION_PROCESS]
+PIPELINE_EXECUTION_MODE = os.getenv("LC_PIPELINE_EXECUTION_MODE", PIPELINE_EXECUTION_THREAD)
+
+_PIPELINE_STAGES = [("L1", "startle_process"), ("L2", "frame_click_process"), ("L3", "keymap_click_process"), ("L4", "anchor_click_process"),
+                    ("L5", "field_click_process"), ("L6", "reflect_boom_process"), ("L7", "apply_done_process")]
+
+_logger = get_logger(__name__)
+
+def log_internal_error(helper_name: str, error_info: Dict):
+    _logger.error("ERROR in %s: %s", helper_name, error_info)
+
+def log_internal_warning(helper_name: str, warning_info: Dict):
+    _logger.warning("WARNING in %s: %s", helper_name, warning_info)
+
+
+def _pipeline_register_raw_signals(mada_seed: MadaSeed):
+    """L3 reads the primary content through the MADA store; make sure L1's raw signals are there."""
+    try:
+        for raw_signal in mada_seed.seed_content.raw_signals:
+            if mock_lc_mem_core_get_object(raw_signal.raw_input_id) is None:
+                mock_lc_mem_core_create_object(raw_signal.raw_input_id, str(raw_signal.raw_input_signal))
+    except AttributeError as e:
+        log_internal_warning("Helper:_pipeline_register_raw_signals", {"warning": f"Seed has no raw signals to register: {e}"})
+
+
+def _pipeline_worker_init():
+    """Process-pool initializer: import the schema and every layer once, before the first seed arrives."""
+    package = __package__.rsplit(".", 1)[0]
+    importlib.import_module(f"{package}.schemas.mada_schema")
+    for module_name in ("sop_l1_startle", "sop_l2_frame_click", "sop_l4_anchor_click", "sop_l5_field_click", "sop_l6_reflect_boom", "sop_l7_apply_done"):
+        importlib.import_module(f"{__package__}.{module_name}")
+
+
+def _pipeline_process_stage(stage_name: str, payload: bytes, *args) -> bytes:
+    """Runs in a worker process: unpickles the stage input, runs one layer, returns the pickled seed."""
+    return pickle.dumps(globals()[stage_name](pickle.loads(payload), *args), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def create_pipeline_executor(execution_mode: Optional[str] = None, max_workers: Optional[int] = None) -> Executor:
+    """Worker pool for the synchronous layers; `execution_mode` defaults to PIPELINE_EXECUTION_MODE."""
+    mode = execution_mode or PIPELINE_EXECUTION_MODE
+    workers = max(1, max_workers if max_workers is not None else PIPELINE_CPU_WORKERS)
+    if mode == PIPELINE_EXECUTION_PROCESS:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_pipeline_worker_init)
+    if mode != PIPELINE_EXECUTION_THREAD:
+        log_internal_warning("create_pipeline_executor", {"warning": f"Unknown execution mode '{mode}', using '{PIPELINE_EXECUTION_THREAD}'."})
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lc-pipeline")
+
+
+async def _pipeline_call_stage(executor: Executor, stage_name: str, stage_input: Any, *args) -> MadaSeed:
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        payload = pickle.dumps(stage_input, protocol=pickle.HIGHEST_PROTOCOL)
+        return pickle.loads(await loop.run_in_executor(executor, _pipeline_process_stage, stage_name, payload, *args))
+    return await loop.run_in_executor(executor, globals()[stage_name], stage_input, *args) # Resolved per call so the layers stay patchable
+
+
+async def _pipeline_run_stages(stage_input: Any, first_layer: str, executor: Executor, l3_semaphore: asyncio.Semaphore, l3_options: Dict[str, Any],
+                               l7_action_intent_override: Optional[str], checkpoint: bool) -> Tuple[Optional[MadaSeed], Optional[str], Optional[Exception]]:
+    """Runs the layers from `first_layer` (an input event for L1, else the seed) to L7: (seed, failed layer, error)."""
+    loop = asyncio.get_running_loop()
+    layer, seed = first_layer, (None if first_layer == "L1" else stage_input)
+    try:
+        if first_layer in ("L2", "L3"): # Resuming: the raw signals may not be in this process's store yet
+            _pipeline_register_raw_signals(seed)
+        for layer, stage_name in _PIPELINE_STAGES[CHECKPOINT_LAYERS.index(first_layer):]:
+            if layer == "L1":
+                seed = await _pipeline_call_stage(executor, stage_name, stage_input)
+                _pipeline_register_raw_signals(seed)
+            elif layer == "L3":
+                async with l3_semaphore:
+                    seed = await globals()[stage_name](seed, **l3_options)
+            elif layer == "L7":
+                seed = await _pipeline_call_stage(executor, stage_name, seed, l7_action_intent_override)
+            else:
+                seed = await _pipeline_call_stage(executor, stage_name, seed)
+            if checkpoint:
+                await loop.run_in_executor(None, save_seed_checkpoint, seed, layer) # Vault I/O stays off the event loop
+        return seed, None, None
+    except Exception as e:
+        return seed, layer, e
+
+
+async def _pipeline_run_event(index: int, input_event: Dict[str, Any], executor: Executor, l3_semaphore: asyncio.Semaphore,
+                              l3_options: Dict[str, Any], l7_action_intent_override: Optional[str], checkpoint: bool = False) -> Dict[str, Any]:
+    seed, failed_layer, error = await _pipeline_run_stages(input_event, "L1", executor, l3_semaphore, l3_options, l7_action_intent_override, checkpoint)
+    if error is None:
+        return {"index": index, "ok": True, "seed": seed, "error": None, "failed_layer": None}
+    log_internal_error("_pipeline_run_event", {"index": index, "layer": failed_layer, "error": f"{type(error).__name__}: {error}"})
+    return {"index": index, "ok": False, "seed": seed, "error": f"{type(error).__name__}: {error}", "failed_layer": failed_layer}
+
+
+async def run_pipeline_batch(events: Iterable[Dict[str, Any]], max_in_flight: Optional[int] = None, l3_max_in_flight: Optional[int] = None,
+                             executor: Optional[Executor] = None, l3_options: Optional[Dict[str, Any]] = None,
+                             l7_action_intent_override: Optional[str] = None, execution_mode: Optional[str] = None,
+                             checkpoint: Optional[bool] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs every input event through startle -> frame_click -> keymap_click -> anchor_click ->
+    field_click -> reflect_boom -> apply_done and yields one result per event, in completion order:
+    {"index", "ok", "seed", "error", "failed_layer"}. `index` is the event's position in `events`.
+    A failing event does not affect the others; its result carries the error, the layer that
+    raised ("L1".."L7") and the seed as of the last completed layer (None if L1 failed).
+
+    `max_in_flight` / `l3_max_in_flight` default to PIPELINE_MAX_IN_FLIGHT /
+    PIPELINE_L3_MAX_IN_FLIGHT. The synchronous layers run on `executor`; when omitted, one is
+    created for the batch with create_pipeline_executor(execution_mode) ('thread' or
+    'process'). Reuse an executor across batches to keep process workers warm. `l3_options` is passed to
+    keymap_click_process (max_concurrency, prompt_mode, extraction_policy, llm_service - e.g. a
+    pooled client or a stub for this batch). `checkpoint`
+    (default PIPELINE_CHECKPOINT_ENABLED) saves the seed to the MEM vault after every layer.
+
+        async for result in run_pipeline_batch(events):
+            if result["ok"]: handle(result["seed"])
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = create_pipeline_executor(execution_mode)
+    l3_semaphore = asyncio.Semaphore(max(1, l3_max_in_flight if l3_max_in_flight is not None else PIPELINE_L3_MAX_IN_FLIGHT))
+    checkpoint = PIPELINE_CHECKPOINT_ENABLED if checkpoint is None else checkpoint
+    limit = max(1, max_in_flight if max_in_flight is not None else PIPELINE_MAX_IN_FLIGHT)
+    indexed_events = enumerate(events)
+    pending = set()
+    try:
+        while True:
+            for index, input_event in itertools.islice(indexed_events, limit - len(pending)):
+                pending.add(asyncio.ensure_future(_pipeline_run_event(index, input_event, executor, l3_semaphore, l3_options or {}, l7_action_intent_override, checkpoint)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending: # Consumer stopped early
+            task.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+async def resume_pipeline(seed_id: str, from_layer: Optional[str] = None, executor: Optional[Executor] = None, l3_options: Optional[Dict[str, Any]] = None,
+                          l7_action_intent_override: Optional[str] = None, execution_mode: Optional[str] = None, checkpoint: bool = True) -> Dict[str, Any]:
+    """
+    Reruns a checkpointed seed from `from_layer` ("L2".."L7") to L7, starting from the checkpoint of
+    the layer before it; by default, from the layer after the last checkpoint. Returns
+    {"ok", "seed", "error", "failed_layer", "resumed_from"}. Checkpoints from `from_layer` on are
+    dropped first (they are stale) and, with `checkpoint`, rewritten as the layers complete.
+    L1 cannot be resumed: it needs the original input event.
+
+        result = await resume_pipeline(seed_id)                   # retry after e.g. an L3 timeout
+        result = await resume_pipeline(seed_id, from_layer="L4")  # new policies, same L3 output
+    """
+    if from_layer is None:
+        last_layer, seed = latest_seed_checkpoint(seed_id)
+        if last_layer == "L7":
+            return {"ok": True, "seed": seed, "error": None, "failed_layer": None, "resumed_from": None}
+        from_layer = CHECKPOINT_LAYERS[CHECKPOINT_LAYERS.index(last_layer) + 1] if last_layer else "L2"
+    elif from_layer not in CHECKPOINT_LAYERS[1:]:
+        raise ValueError(f"from_layer must be one of {CHECKPOINT_LAYERS[1:]}, got {from_layer!r}")
+    else:
+        seed = load_seed_checkpoint(seed_id, CHECKPOINT_LAYERS[CHECKPOINT_LAYERS.index(from_layer) - 1])
+    if seed is None:
+        error = f"No checkpoint for seed {seed_id} to resume {from_layer} from."
+        log_internal_warning("resume_pipeline", {"warning": error})
+        return {"ok": False, "seed": None, "error": error, "failed_layer": from_layer, "resumed_from": from_layer}
+
+    clear_seed_checkpoints(seed_id, from_layer)
+    own_executor = executor is None
+    if own_executor:
+        executor = create_pipeline_executor(execution_mode)
+    try:
+        seed, failed_layer, error = await _pipeline_run_stages(seed, from_layer, executor, asyncio.Semaphore(1), l3_options or {}, l7_action_intent_override, checkpoint)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+    if error is None:
+        return {"ok": True, "seed": seed, "error": None, "failed_layer": None, "resumed_from": from_layer}
+    log_internal_error("resume_pipeline", {"seed_id": seed_id, "layer": failed_layer, "error": f"{type(error).__name__}: {error}"})
+    return {"ok": False, "seed": seed, "error": f"{type(error).__name__}: {error}", "failed_layer": failed_layer, "resumed_from": from_layer}
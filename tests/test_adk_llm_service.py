@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..services import adk_llm_service
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import adk_llm_service
+
+try:
+    from google.adk.events import Event
+    from google.genai import types as genai_types
+except ImportError:
+    Event = None
+
+
+class _FakeRunner:
+    """Stands in for the ADK Runner: records the prompt and a reply in the session, like a real turn."""
+
+    app_name = "lc_adk_llm_service_app"
+
+    def __init__(self, session_service):
+        self.session_service = session_service
+        self.history_lengths = []
+
+    async def run_async(self, user_id, session_id, new_message):
+        session = await self.session_service.get_session(app_name=self.app_name, user_id=user_id, session_id=session_id)
+        self.history_lengths.append(len(session.events))
+        reply = genai_types.Content(role="model", parts=[genai_types.Part(text=" ok ")])
+        for author, content in (("user", new_message), ("adk_llm_service_agent", reply)):
+            await self.session_service.append_event(session, Event(author=author, content=content))
+        yield SimpleNamespace(is_final_response=lambda: True, content=reply)
+
+
+@unittest.skipIf(Event is None, "google-adk is not installed")
+class TestAdkLlmServiceSessions(unittest.TestCase):
+
+    def setUp(self):
+        self.service = adk_llm_service.AdkLlmService()
+        self.runner = self.service.runner = _FakeRunner(self.service.session_service)
+
+    def _sessions(self, user_id="adk_service_user"):
+        return self.service.session_service.sessions.get(self.runner.app_name, {}).get(user_id, {})
+
+    def test_01_stateless_calls_leave_no_sessions(self):
+        async def run():
+            return await asyncio.gather(*[self.service.prompt_llm(f"prompt {i}") for i in range(20)])
+        self.assertEqual(asyncio.run(run()), ["ok"] * 20)
+        self.assertEqual(self.runner.history_lengths, [0] * 20)
+        self.assertEqual(self._sessions(), {})
+
+    def test_02_stateful_history_cap_and_eviction(self):
+        async def run():
+            for _ in range(10):
+                await self.service.prompt_llm("again", session_id="conversation")
+            for i in range(3):
+                await self.service.prompt_llm("other", session_id=f"other_{i}")
+        with patch.object(adk_llm_service, "ADK_SESSION_MAX_HISTORY_EVENTS", 4), patch.object(adk_llm_service, "ADK_MAX_STATEFUL_SESSIONS", 2):
+            asyncio.run(run())
+        self.assertEqual(self.runner.history_lengths[:10], [0, 2, 4, 4, 4, 4, 4, 4, 4, 4])
+        self.assertEqual(sorted(self._sessions()), ["other_1", "other_2"])
+
+    def test_03_failed_session_delete_is_logged(self):
+        with patch.object(self.service.session_service, "delete_session", side_effect=KeyError("gone")), \
+                self.assertLogs(adk_llm_service._logger, "WARNING") as logs:
+            self.assertEqual(asyncio.run(self.service.prompt_llm("prompt")), "ok")
+        self.assertIn("AdkLlmService._delete_session", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
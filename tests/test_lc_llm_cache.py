@@ -0,0 +1,78 @@
+import unittest
+import tempfile
+import time
+from pathlib import Path
+
+# Adjust import paths for testing
+try:
+    from ..services.lc_llm_cache import LlmResponseCache, make_cache_key
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services.lc_llm_cache import LlmResponseCache, make_cache_key
+
+
+class TestLcLlmResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "llm_cache.sqlite3"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_01_key_covers_prompt_model_and_type(self):
+        key = make_cache_key("prompt", "model-a", "pkg.Type")
+        self.assertEqual(key, make_cache_key("prompt", "model-a", "pkg.Type"))
+        self.assertNotEqual(key, make_cache_key("prompt2", "model-a", "pkg.Type"))
+        self.assertNotEqual(key, make_cache_key("prompt", "model-b", "pkg.Type"))
+        self.assertNotEqual(key, make_cache_key("prompt", "model-a", "pkg.Other"))
+
+    def test_02_memory_hit_and_per_label_stats(self):
+        cache = LlmResponseCache()
+        self.assertIsNone(cache.get("k", label="Helper:a"))
+        cache.put("k", {"x": [1, 2]}, label="Helper:a")
+        self.assertEqual(cache.get("k", label="Helper:a"), {"x": [1, 2]})
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"], stats["memory_hits"]), (1, 1, 1, 1))
+        self.assertEqual(stats["by_label"]["Helper:a"], {"hits": 1, "misses": 1, "stores": 1})
+
+    def test_03_disabled_cache_never_stores(self):
+        cache = LlmResponseCache(enabled=False)
+        cache.put("k", {"x": 1})
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_04_ttl_expiry(self):
+        cache = LlmResponseCache(ttl_seconds=0.05, sqlite_path=self.db_path)
+        cache.put("k", {"x": 1})
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expired"], 1)
+        self.assertIsNone(LlmResponseCache(ttl_seconds=0.05, sqlite_path=self.db_path).get("k"))
+
+    def test_05_disk_tier_shared_across_instances(self):
+        LlmResponseCache(sqlite_path=self.db_path).put("k", {"x": 1})
+        other = LlmResponseCache(sqlite_path=self.db_path)
+        self.assertEqual(other.get("k"), {"x": 1})
+        self.assertEqual(other.get("k"), {"x": 1})
+        stats = other.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"]), (1, 1))
+        other.clear()
+        self.assertIsNone(LlmResponseCache(sqlite_path=self.db_path).get("k"))
+
+    def test_06_lru_bounds(self):
+        cache = LlmResponseCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"key": key})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"key": "c"})
+        self.assertEqual(cache.stats()["evictions"], 1)
+        small = LlmResponseCache(max_bytes=10)
+        small.put("big", {"text": "x" * 100})
+        self.assertIsNone(small.get("big"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Adjust import paths for testing
+try:
+    from ..services import lc_api_agent_service
+    from ..services.lc_llm_cassette import LlmCassette
+    from ..services.lc_llm_limiter import is_throttle_error
+except ImportError:
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import lc_api_agent_service
+    from lc_python_core.services.lc_llm_cassette import LlmCassette
+    from lc_python_core.services.lc_llm_limiter import is_throttle_error
+
+try:
+    from ..services import adk_llm_service
+except ImportError:
+    try:
+        from lc_python_core.services import adk_llm_service
+    except ImportError: # google-adk is not installed
+        adk_llm_service = None
+
+
+class TestLlmCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "traffic.jsonl"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _record_prompts(self):
+        recorder = LlmCassette("record", self.path)
+
+        async def answer(text, delay=0.0):
+            await asyncio.sleep(delay)
+            return text
+
+        async def throttled():
+            raise RuntimeError("AdkLlmService call failed") from RuntimeError("429 RESOURCE_EXHAUSTED")
+
+        async def run():
+            await recorder.prompt_llm(lambda: answer('{"a": 1}', 0.05), "prompt one", "gemini-test")
+            with self.assertRaises(RuntimeError):
+                await recorder.prompt_llm(throttled, "prompt two", "gemini-test")
+            await recorder.prompt_llm(lambda: answer('{"b": 2}'), "prompt two", "gemini-test")
+        asyncio.run(run())
+        recorder.close()
+        self.assertEqual(recorder.stats()["recorded"], 3)
+
+    def test_01_record_then_replay_prompts(self):
+        self._record_prompts()
+        entries = [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([entry["request"] for entry in entries], ["prompt one", "prompt two", "prompt two"])
+        self.assertGreaterEqual(entries[0]["latency_ms"], 45)
+
+        player = LlmCassette("replay", self.path)
+        live_call = MagicMock(side_effect=AssertionError("replay must not call the model"))
+
+        async def run():
+            self.assertEqual(await player.prompt_llm(live_call, "prompt one"), '{"a": 1}')
+            with self.assertRaises(RuntimeError) as raised: # Recorded order: the throttled attempt first
+                await player.prompt_llm(live_call, "prompt two")
+            self.assertTrue(is_throttle_error(raised.exception))
+            self.assertEqual(await player.prompt_llm(live_call, "prompt two"), '{"b": 2}')
+            self.assertEqual(await player.prompt_llm(live_call, "prompt two"), '{"b": 2}') # Last recording repeats
+            with self.assertRaises(LookupError):
+                await player.prompt_llm(live_call, "never recorded")
+        asyncio.run(run())
+        self.assertEqual(player.stats()["replayed"], 4)
+        self.assertEqual(player.stats()["misses"], 1)
+        live_call.assert_not_called()
+
+    def test_02_replay_keeps_recorded_latency_when_asked(self):
+        self._record_prompts()
+        player = LlmCassette("replay", self.path, replay_latency=True)
+        start = time.perf_counter()
+        asyncio.run(player.prompt_llm(None, "prompt one"))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+        with self.assertRaises(ValueError):
+            LlmCassette("replay")
+
+    @patch.dict(os.environ, {"TEST_CASSETTE_API_KEY": "secret-key-123"})
+    def test_03_execute_api_call_record_and_replay(self):
+        response = MagicMock(ok=True, status_code=200, text='{"text": "hello"}')
+        response.json.return_value = {"text": "hello"}
+        call_args = dict(api_endpoint_url="https://llm.example.com/v1", prompt_text="Say hello", api_key_env_var="TEST_CASSETTE_API_KEY")
+
+        with patch.object(lc_api_agent_service, "LLM_CASSETTE", LlmCassette("record", self.path)) as recorder, \
+                patch.object(lc_api_agent_service.requests, "post", return_value=response):
+            recorded = lc_api_agent_service.execute_api_call(**call_args)
+            recorder.close()
+        self.assertEqual(recorded["agent_response_text"], "hello")
+        self.assertNotIn("secret-key-123", self.path.read_text(encoding="utf-8"))
+
+        with patch.object(lc_api_agent_service, "LLM_CASSETTE", LlmCassette("replay", self.path)), \
+                patch.object(lc_api_agent_service.requests, "post", side_effect=AssertionError("replay must not hit the network")):
+            self.assertEqual(lc_api_agent_service.execute_api_call(**call_args), recorded)
+            missed = lc_api_agent_service.execute_api_call(**{**call_args, "prompt_text": "Say goodbye"})
+        self.assertTrue(missed["status"].startswith("Error: No cassette entry"))
+
+    @unittest.skipIf(adk_llm_service is None, "google-adk is not installed")
+    def test_04_adk_llm_service_replays_without_the_runner(self):
+        self._record_prompts()
+        service = adk_llm_service.AdkLlmService()
+        service.runner = MagicMock(app_name="lc_adk_llm_service_app", run_async=MagicMock(side_effect=AssertionError("replay must not run the agent")))
+        with patch.object(adk_llm_service, "LLM_CASSETTE", LlmCassette("replay", self.path)):
+            self.assertEqual(asyncio.run(service.prompt_llm("prompt one")), '{"a": 1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+from pathlib import Path
+
+# Adjust import paths for testing
+try:
+    from ..services.lc_llm_limiter import LlmRateLimiter, TokenBucket, is_throttle_error
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services.lc_llm_limiter import LlmRateLimiter, TokenBucket, is_throttle_error
+
+
+class TestLlmRateLimiter(unittest.TestCase):
+
+    def test_01_token_bucket_spaces_out_bursts(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=2) # 10/s
+        waits = [bucket.reserve(1) for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, places=2)
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+        self.assertEqual(TokenBucket(rate_per_minute=0).reserve(10**6), 0.0)
+
+    def test_02_concurrency_cap_and_queue_depth(self):
+        limiter = LlmRateLimiter(initial_concurrency=2, max_concurrency=2)
+        active, peak, depths = [0], [0], []
+
+        async def call():
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            depths.append(limiter.stats()["queue_depth"])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return "ok"
+
+        async def run():
+            return await asyncio.gather(*[limiter.run(call, prompt_text="x") for _ in range(8)])
+        self.assertEqual(asyncio.run(run()), ["ok"] * 8)
+        self.assertEqual(peak[0], 2)
+        self.assertGreaterEqual(max(depths), 4) # Calls waiting while two run
+        stats = limiter.stats()
+        self.assertEqual((stats["in_flight"], stats["queue_depth"], stats["calls"]), (0, 0, 8))
+
+    def test_03_throttled_calls_back_off_and_halve_the_cap(self):
+        limiter = LlmRateLimiter(initial_concurrency=8, max_retries=3, backoff_base_seconds=0.001)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("AdkLlmService call failed: 429 RESOURCE_EXHAUSTED")
+            return "ok"
+
+        self.assertEqual(asyncio.run(limiter.run(call)), "ok")
+        stats = limiter.stats()
+        self.assertEqual((stats["retries"], stats["throttled"], stats["failures"]), (2, 2, 0))
+        self.assertLess(stats["concurrency_limit"], 8) # Halved once (cooldown), then grew by 1/limit
+
+        async def broken():
+            raise ValueError("bad prompt")
+        with self.assertRaises(ValueError):
+            asyncio.run(limiter.run(broken))
+        self.assertEqual(limiter.stats()["retries"], 2) # Not retried
+        self.assertFalse(is_throttle_error(ValueError("bad prompt")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..services import lc_llm_registry
+    from ..sops import sop_l3_keymap_click
+except ImportError:
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import lc_llm_registry
+    from lc_python_core.sops import sop_l3_keymap_click
+
+
+class _StubService:
+    async def prompt_llm(self, prompt_text):
+        return "{}"
+
+
+class TestLcLlmRegistry(unittest.TestCase):
+
+    def tearDown(self):
+        lc_llm_registry.reset_llm_service()
+
+    def test_01_lazy_single_instance_and_remembered_failure(self):
+        built = []
+        lc_llm_registry.set_llm_service_factory(lambda: built.append(1) or _StubService())
+        self.assertFalse(lc_llm_registry.is_llm_service_created())
+        first = lc_llm_registry.get_llm_service()
+        self.assertIs(lc_llm_registry.get_llm_service(), first)
+        self.assertEqual(len(built), 1)
+
+        def broken():
+            built.append(1)
+            raise ConnectionError("no ADK")
+        lc_llm_registry.set_llm_service_factory(broken)
+        self.assertIsNone(lc_llm_registry.get_llm_service())
+        self.assertIsNone(lc_llm_registry.get_llm_service())
+        self.assertEqual(len(built), 2) # Not retried on every call
+
+    def test_02_keymap_uses_registry_module_override_and_per_run_injection(self):
+        shared, injected = _StubService(), _StubService()
+        lc_llm_registry.set_llm_service(shared)
+        self.assertIs(sop_l3_keymap_click._keymap_llm_service(), shared)
+        with patch.object(sop_l3_keymap_click, "llm_service", None):
+            self.assertIsNone(sop_l3_keymap_click._keymap_llm_service())
+
+        seen = []
+        async def fake_process(*args):
+            await asyncio.gather(*[asyncio.sleep(0) for _ in range(2)])
+            seen.append(sop_l3_keymap_click._keymap_llm_service())
+            return "seed"
+        with patch.object(sop_l3_keymap_click, "_keymap_click_process", fake_process):
+            self.assertEqual(asyncio.run(sop_l3_keymap_click.keymap_click_process("seed", llm_service=injected)), "seed")
+            asyncio.run(sop_l3_keymap_click.keymap_click_process("seed"))
+        self.assertEqual(seen, [injected, shared])
+
+    def test_03_importing_the_sops_does_not_load_adk(self):
+        package_parent = str(Path(sop_l3_keymap_click.__file__).parents[2]) # Directory containing lc_python_core
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_parent, os.environ.get("PYTHONPATH")])))
+        code = "import sys, lc_python_core.sops.sop_pipeline_runner; print('google.adk' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=120)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False", result.stderr[-2000:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..services import lc_llm_registry
+    from ..services.lc_llm_backend import LlmBackend
+    from ..services.lc_llm_limiter import is_throttle_error
+    from ..services.lc_llm_stub import StubLlmService, stub_target_for_prompt, stub_response_for_prompt
+    from ..sops import sop_l3_keymap_click as l3
+except ImportError:
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import lc_llm_registry
+    from lc_python_core.services.lc_llm_backend import LlmBackend
+    from lc_python_core.services.lc_llm_limiter import is_throttle_error
+    from lc_python_core.services.lc_llm_stub import StubLlmService, stub_target_for_prompt, stub_response_for_prompt
+    from lc_python_core.sops import sop_l3_keymap_click as l3
+
+
+SAMPLE_TEXT = """Title: Quarterly report
+# Summary
+Please send the figures to Alice Smith at Acme by next week, it's urgent! The upload is not slow, but 3 GB failed twice.
+Is https://example.com/report ready? Thanks
+"""
+
+
+class TestStubLlmService(unittest.TestCase):
+
+    def setUp(self):
+        l3.LLM_RESPONSE_CACHE.clear()
+
+    def _run_with_stub(self, stub, coro_factory):
+        async def run():
+            token = l3._L3_RUN_LLM_SERVICE.set(stub)
+            try:
+                return await coro_factory()
+            finally:
+                l3._L3_RUN_LLM_SERVICE.reset(token)
+        return asyncio.run(run())
+
+    def test_01_l3_helpers_get_schema_valid_answers(self):
+        stub = StubLlmService(use_limiter=False)
+
+        async def run_helpers():
+            return [
+                await l3._keymap_detect_language(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_extract_explicit_meta(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_extract_structure_markers(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_extract_lexical(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_derive_syntactic(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_derive_pragmatic_affective(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_extract_relational_linking(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_calculate_stats(SAMPLE_TEXT, "prompt"),
+                await l3._keymap_identify_anomalies(SAMPLE_TEXT, "prompt", None),
+                await l3._keymap_extract_consolidated(SAMPLE_TEXT, "prompt"),
+            ]
+        languages, metadata, markers, lexical, syntactic, pragmatic, relational, stats, flags, (sections, failed) = self._run_with_stub(stub, run_helpers)
+
+        # Non-empty results show the response parsed and validated (the helpers fall back to empty defaults otherwise).
+        self.assertEqual(languages[0].language_code, "en")
+        self.assertEqual((metadata[0].key, metadata[0].value), ("Title", "Quarterly report"))
+        self.assertIn("Heading: Summary", markers)
+        self.assertIn("Alice Smith", [entity.mention for entity in lexical.entity_mentions_raw])
+        self.assertEqual(lexical.negation_markers[0].term, "not")
+        self.assertEqual(syntactic.sentence_type_distribution["interrogative"], 1)
+        self.assertEqual(pragmatic.sentiment_hint.polarity.value, "mixed")
+        self.assertEqual(relational.url_mentions.detected_urls, ["https://example.com/report"])
+        self.assertGreater(stats.token_count.value, 0)
+        self.assertTrue(flags.mixed_affect_signal.detected)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(sections), 8)
+        self.assertEqual(stub.stats()["malformed"], 0)
+        self.assertEqual(set(stub.stats()["targets"]), {"detected_languages", "explicit_metadata", "content_structure_markers", "lexical_affordances",
+                                                        "syntactic_hints", "pragmatic_affective_affordances", "relational_linking_markers",
+                                                        "statistical_properties", "l3_flags", "keymap"})
+
+    def test_02_deterministic_responses_and_plain_prompts(self):
+        prompt = l3._keymap_build_consolidated_prompt(SAMPLE_TEXT, "prompt")
+        self.assertEqual(stub_target_for_prompt(prompt), "keymap")
+        self.assertEqual(stub_response_for_prompt(prompt), stub_response_for_prompt(prompt))
+        self.assertIsNone(stub_target_for_prompt("What is the capital of Spain?"))
+        reply = asyncio.run(StubLlmService(use_limiter=False).prompt_llm("What is the capital of Spain?"))
+        self.assertTrue(reply.startswith("Stub response to a 6-word prompt"))
+
+    def test_03_simulated_faults(self):
+        prompt = l3._keymap_build_consolidated_prompt(SAMPLE_TEXT, "prompt")
+        with self.assertRaises(RuntimeError) as raised:
+            asyncio.run(StubLlmService(throttle_rate=1.0, use_limiter=False).prompt_llm(prompt))
+        self.assertTrue(is_throttle_error(raised.exception))
+        with self.assertRaises(RuntimeError) as raised:
+            asyncio.run(StubLlmService(error_rate=1.0, use_limiter=False).prompt_llm(prompt))
+        self.assertFalse(is_throttle_error(raised.exception))
+
+        def malformed_replies(seed):
+            stub = StubLlmService(seed=seed, malformed_rate=1.0, use_limiter=False)
+            return [asyncio.run(stub.prompt_llm(prompt)) for _ in range(6)]
+        replies = malformed_replies(seed=3)
+        self.assertEqual(replies, malformed_replies(seed=3)) # Same seed, same fault sequence
+        for reply in replies:
+            try:
+                self.assertNotIsInstance(json.loads(reply), dict)
+            except json.JSONDecodeError:
+                pass
+
+    def test_04_latency_and_concurrency_quota(self):
+        stub = StubLlmService(latency_ms=50, latency_distribution="fixed", max_concurrent=2, use_limiter=False)
+
+        async def run():
+            return await asyncio.gather(*[stub.prompt_llm(f"prompt {i}") for i in range(3)], return_exceptions=True)
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+        self.assertEqual(sum(isinstance(result, str) for result in results), 2)
+        self.assertTrue(is_throttle_error(results[2]))
+        self.assertEqual(stub.stats()["throttled"], 1)
+        with self.assertRaises(ValueError):
+            StubLlmService(latency_distribution="pareto")
+
+    def test_05_registry_builds_stub_backend(self):
+        try:
+            with patch.object(lc_llm_registry, "LLM_BACKEND", "stub"):
+                lc_llm_registry.reset_llm_service()
+                service = lc_llm_registry.get_llm_service()
+            self.assertIsInstance(service, StubLlmService)
+            self.assertIsInstance(service, LlmBackend)
+        finally:
+            lc_llm_registry.reset_llm_service()
+
+
+if __name__ == '__main__':
+    unittest.main()
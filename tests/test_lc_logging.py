@@ -0,0 +1,63 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..services import lc_logging
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import lc_logging
+
+
+class _CountingPayload:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "payload"
+
+
+class TestLcLogging(unittest.TestCase):
+
+    def tearDown(self):
+        lc_logging.configure_logging()
+        lc_logging._sample_counts.clear()
+
+    def test_01_levels_and_lazy_formatting(self):
+        lc_logging.configure_logging(level="WARNING")
+        logger = lc_logging.get_logger("tests.logging")
+        payload = _CountingPayload()
+        out = io.StringIO()
+        with redirect_stdout(out):
+            lc_logging.log_info_sampled(logger, "helper", "INFO in %s: %s", "helper", payload)
+            logger.warning("WARNING in %s: %s", "helper", payload)
+        self.assertEqual(out.getvalue(), "WARNING in helper: payload\n")
+        self.assertEqual(payload.formatted, 1) # The suppressed INFO never built its message
+
+    def test_02_info_sampling_per_key(self):
+        lc_logging.configure_logging(level="INFO")
+        logger = lc_logging.get_logger("tests.logging")
+        out = io.StringIO()
+        with patch.object(lc_logging, "LOG_INFO_SAMPLE_EVERY", 3), redirect_stdout(out):
+            for i in range(6):
+                lc_logging.log_info_sampled(logger, "a", "a %s", i)
+            lc_logging.log_info_sampled(logger, "b", "b %s", 0)
+        self.assertEqual(out.getvalue().splitlines(), ["a 0", "a 3", "b 0"])
+
+    def test_03_queue_handler_delivers_on_stop(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            lc_logging.configure_logging(level="INFO", use_queue=True)
+            lc_logging.get_logger("tests.logging").info("queued %s", 1)
+            lc_logging._stop_listener()
+        self.assertEqual(out.getvalue(), "queued 1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@ import json
 import shutil
 from pathlib import Path
 import os
+import tempfile
+import multiprocessing
+from unittest.mock import patch
 
 # Adjust import path to access lc_mem_service from the tests directory
 # This assumes 'lc_python_core' is structured such that 'services' is a sibling to 'tests'
@@ -17,8 +20,30 @@ try:
         mock_lc_mem_core_update_object,
         mock_lc_mem_core_delete_object,
         mock_lc_mem_core_query_objects,
+        create_pbi,
+        get_pbi,
+        query_pbis,
+        set_storage_backend,
+        create_agent_profile,
+        update_agent_profile,
+        delete_agent_profile,
+        query_agent_profiles,
+        AGENT_PROFILE_INDEX,
+        get_objects_many,
+        create_objects_many,
+        update_objects_many,
+        get_object_cache_stats,
+        clear_object_cache,
+        OBJECT_CACHE,
+        OBJECT_TYPE_INDEX,
+        rebuild_indexes,
         MADA_VAULT_DIR # Import to use and clean up
     )
+    from ..services.lc_mem_storage import SqliteBackend, DirectoryBackend, import_directory_vault
+    from ..services import lc_mem_index
+    from ..services.lc_mem_cache import ObjectCache
+    from ..services.lc_mem_storage import convert_vault, migrate_vault_layout
+    from ..services.lc_mem_codec import get_codec, available_codecs, decode as decode_value
 except ImportError: # Fallback for direct script execution or different test runner setup
     import sys
     # Assuming the script is run from within lc_python_core/tests or similar context
@@ -45,8 +70,30 @@ except ImportError: # Fallback for direct script execution or different test run
         mock_lc_mem_core_update_object,
         mock_lc_mem_core_delete_object,
         mock_lc_mem_core_query_objects,
+        create_pbi,
+        get_pbi,
+        query_pbis,
+        set_storage_backend,
+        create_agent_profile,
+        update_agent_profile,
+        delete_agent_profile,
+        query_agent_profiles,
+        AGENT_PROFILE_INDEX,
+        get_objects_many,
+        create_objects_many,
+        update_objects_many,
+        get_object_cache_stats,
+        clear_object_cache,
+        OBJECT_CACHE,
+        OBJECT_TYPE_INDEX,
+        rebuild_indexes,
         MADA_VAULT_DIR
     )
+    from lc_python_core.services.lc_mem_storage import SqliteBackend, DirectoryBackend, import_directory_vault
+    from lc_python_core.services import lc_mem_index
+    from lc_python_core.services.lc_mem_cache import ObjectCache
+    from lc_python_core.services.lc_mem_storage import convert_vault, migrate_vault_layout
+    from lc_python_core.services.lc_mem_codec import get_codec, available_codecs, decode as decode_value
 
 
 class TestLcMemService(unittest.TestCase):
@@ -221,6 +268,494 @@ class TestLcMemService(unittest.TestCase):
         self.assertIn(payload1["data"], found_payloads)
         self.assertIn(payload2["data"], found_payloads)
 
+    def test_12_get_objects_many_order_and_errors(self):
+        uid_a = mock_lc_mem_core_ensure_uid("BatchType")
+        uid_b = mock_lc_mem_core_ensure_uid("BatchType")
+        mock_lc_mem_core_create_object(uid_a, {"type": "BatchType", "n": 1})
+        mock_lc_mem_core_create_object(uid_b, {"type": "BatchType", "n": 2})
+        missing_uid = "urn:crux:uid::doesnotexist"
+
+        results = get_objects_many([uid_b, missing_uid, "bad-uid", uid_a])
+        self.assertEqual([r["uid"] for r in results], [uid_b, missing_uid, "bad-uid", uid_a])
+        self.assertEqual([r["ok"] for r in results], [True, False, False, True])
+        self.assertEqual(results[0]["payload"]["n"], 2)
+        self.assertEqual(results[3]["payload"]["n"], 1)
+        self.assertIn("not found", results[1]["error"])
+        self.assertIn("Invalid CRUX UID", results[2]["error"])
+
+    def test_13_create_and_update_objects_many(self):
+        uids = [mock_lc_mem_core_ensure_uid("BatchType") for _ in range(12)]
+        created = create_objects_many([{"object_uid": uid, "object_payload": {"type": "BatchType", "i": i}} for i, uid in enumerate(uids)]
+                                      + [{"object_uid": "bad-uid", "object_payload": {}}])
+        self.assertEqual(sum(r["ok"] for r in created), 12)
+        self.assertFalse(created[-1]["ok"])
+        self.assertEqual(sorted(mock_lc_mem_core_query_objects({"object_type": "BatchType"})), sorted(uids))
+
+        updated = update_objects_many([{"object_uid": uid, "updated_object_payload": {"type": "BatchType", "i": i * 10}} for i, uid in enumerate(uids)]
+                                      + [{"object_uid": "urn:crux:uid::doesnotexist", "updated_object_payload": {}}])
+        self.assertTrue(all(r["ok"] for r in updated[:-1]))
+        self.assertFalse(updated[-1]["ok"])
+        self.assertEqual(mock_lc_mem_core_get_object(uids[3])["i"], 30)
+        with open(MADA_VAULT_DIR / uids[3].split("::")[-1] / "metadata.json", 'r') as f:
+            self.assertEqual(json.load(f)["version"], "0.1.1")
+
+    def test_14_object_type_manifest_tracks_writes(self):
+        uid1 = mock_lc_mem_core_ensure_uid("OIACycle")
+        uid2 = mock_lc_mem_core_ensure_uid("TextDocument")
+        mock_lc_mem_core_create_object(uid1, {"name": "cycle"}, {"object_type": "OIACycle"})
+        mock_lc_mem_core_create_object(uid2, {"type": "TextDocument", "text": "t"})
+        self.assertTrue((MADA_VAULT_DIR / ".object_type_index_log.jsonl").exists())
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "OIACycle"}), [uid1])
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "TextDocument"}), [uid2])
+
+        mock_lc_mem_core_update_object(uid2, {"text": "t2"}, update_metadata={"object_type": "ArchivedDocument"})
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "TextDocument"}), [])
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "ArchivedDocument"}), [uid2])
+        mock_lc_mem_core_delete_object(uid1)
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "OIACycle"}), [])
+
+    def test_15_rebuild_indexes_from_disk(self):
+        uid = mock_lc_mem_core_ensure_uid("OIACycle")
+        mock_lc_mem_core_create_object(uid, {"name": "cycle"}, {"object_type": "OIACycle"})
+        # An object written behind the service's back is only visible after a rebuild.
+        DirectoryBackend(MADA_VAULT_DIR).write("objects", "feedface", {"name": "manual"}, {"object_type": "OIACycle"})
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "OIACycle"}), [uid])
+        counts = rebuild_indexes()
+        self.assertEqual(counts["object_type"], 2)
+        self.assertEqual(sorted(mock_lc_mem_core_query_objects({"object_type": "OIACycle"})), sorted([uid, "urn:crux:uid::feedface"]))
+        self.assertEqual(OBJECT_TYPE_INDEX.lookup({"object_type": "OIACycle"}), {uid.split("::")[-1], "feedface"})
+
+    def test_16_failed_delete_keeps_object_indexed(self):
+        uid = mock_lc_mem_core_ensure_uid("OIACycle")
+        mock_lc_mem_core_create_object(uid, {"name": "cycle"}, {"object_type": "OIACycle"})
+        with patch.object(DirectoryBackend, "delete", side_effect=OSError("Device or resource busy")):
+            self.assertFalse(mock_lc_mem_core_delete_object(uid))
+        self.assertEqual(mock_lc_mem_core_query_objects({"object_type": "OIACycle"}), [uid])
+
+
+def _index_writer(root_dir: str, prefix: str, count: int):
+    # Runs in a child process; a low threshold makes the writers compact under each other.
+    lc_mem_index.COMPACT_THRESHOLD = 7
+    index = lc_mem_index.SecondaryIndex(Path(root_dir), "shared", {"writer": "writer"})
+    for i in range(count):
+        index.put(f"{prefix}{i:04d}", {"writer": prefix})
+        if i % 5 == 4:
+            index.remove(f"{prefix}{i - 1:04d}")
+
+
+def _typed_object_writer(object_type: str, count: int):
+    # Runs in a child process, writing through the service like a second pipeline worker would.
+    lc_mem_index.COMPACT_THRESHOLD = 7
+    for _ in range(count):
+        mock_lc_mem_core_create_object(mock_lc_mem_core_ensure_uid(object_type), {"name": object_type}, {"object_type": object_type})
+
+
+class TestLcMemIndexAcrossProcesses(unittest.TestCase):
+
+    def test_01_concurrent_writers_lose_no_entries(self):
+        with tempfile.TemporaryDirectory() as root_dir:
+            writers = [multiprocessing.Process(target=_index_writer, args=(root_dir, prefix, 60)) for prefix in ("aa", "bb", "cc", "dd")]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join(60)
+                self.assertEqual(writer.exitcode, 0)
+            index = lc_mem_index.SecondaryIndex(Path(root_dir), "shared", {"writer": "writer"})
+            for prefix in ("aa", "bb", "cc", "dd"):
+                expected = {f"{prefix}{i:04d}" for i in range(60) if i % 5 != 3}
+                self.assertEqual(index.lookup({"writer": prefix}), expected)
+
+    def test_02_typed_queries_see_objects_from_every_process(self):
+        if MADA_VAULT_DIR.exists():
+            shutil.rmtree(MADA_VAULT_DIR)
+        try:
+            writers = [multiprocessing.Process(target=_typed_object_writer, args=(object_type, 30)) for object_type in ("OIACycle", "TextDocument", "OIACycle")]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join(60)
+                self.assertEqual(writer.exitcode, 0)
+            self.assertEqual(len(mock_lc_mem_core_query_objects({"object_type": "OIACycle"})), 60)
+            self.assertEqual(len(mock_lc_mem_core_query_objects({"object_type": "TextDocument"})), 30)
+        finally:
+            if MADA_VAULT_DIR.exists():
+                shutil.rmtree(MADA_VAULT_DIR)
+
+
+class TestLcAgentProfileQueries(unittest.TestCase):
+
+    def setUp(self):
+        if MADA_VAULT_DIR.exists():
+            shutil.rmtree(MADA_VAULT_DIR)
+        MADA_VAULT_DIR.mkdir(parents=True, exist_ok=True)
+        self.coder = create_agent_profile({"agent_name": "Coder", "agent_type": "LLM", "model_name": "gemini-pro",
+                                           "capabilities": ["code", "review"], "tools": [{"tool_name": "git"}, "shell"]})
+        self.writer = create_agent_profile({"agent_name": "Writer", "agent_type": "LLM", "model_name": "gemini-flash",
+                                            "capabilities": ["write", "review"], "tools": ["search"]})
+
+    def tearDown(self):
+        if MADA_VAULT_DIR.exists():
+            shutil.rmtree(MADA_VAULT_DIR)
+
+    def _names(self, query):
+        return sorted(p["agent_name"] for p in query_agent_profiles(query))
+
+    def test_01_capability_tool_and_model_queries(self):
+        self.assertEqual(self._names({"capabilities": "review"}), ["Coder", "Writer"])
+        self.assertEqual(self._names({"capabilities": ["code", "review"]}), ["Coder"])
+        self.assertEqual(self._names({"capabilities": ["code", "write"]}), [])
+        self.assertEqual(self._names({"tools": "git"}), ["Coder"])
+        self.assertEqual(self._names({"model_name": "gemini-flash", "agent_type": "LLM"}), ["Writer"])
+        self.assertEqual(self._names({}), ["Coder", "Writer"])
+
+    def test_02_index_tracks_update_and_delete(self):
+        update_agent_profile(self.writer, {"capabilities": ["write", "code"]})
+        self.assertEqual(AGENT_PROFILE_INDEX.lookup({"capabilities": ["code"]}), {self.coder.split("::")[-1], self.writer.split("::")[-1]})
+        self.assertEqual(self._names({"capabilities": "code"}), ["Coder", "Writer"])
+        delete_agent_profile(self.coder)
+        self.assertEqual(self._names({"capabilities": "code"}), ["Writer"])
+
+    def test_03_index_rebuilt_when_missing(self):
+        for index_file in (AGENT_PROFILE_INDEX.snapshot_path, AGENT_PROFILE_INDEX.log_path):
+            if index_file.exists():
+                index_file.unlink()
+        self.assertEqual(self._names({"capabilities": ["code", "review"]}), ["Coder"])
+        self.assertTrue(AGENT_PROFILE_INDEX.snapshot_path.exists())
+
+
+class TestLcMemDirectoryBackendDurability(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "vault"
+        self.backend = DirectoryBackend(self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_01_writes_are_compact_and_leave_no_temp_files(self):
+        self.backend.write("objects", "aaaa", {"k": "v"}, {"object_type": "T"})
+        obj_dir = self.root / "aaaa"
+        self.assertEqual((obj_dir / "object_payload.json").read_text(), '{"k":"v"}')
+        self.assertEqual(sorted(p.name for p in obj_dir.iterdir()), ["metadata.json", "object_payload.json"])
+        self.assertEqual(list(self.backend.journal_dir.iterdir()), [])
+        self.assertEqual(self.backend.list_uid_hexes("objects"), ["aaaa"])
+
+    def test_02_recover_replays_interrupted_write(self):
+        self.backend.write("pbis", "bbbb", {"v": 1}, {"object_type": "ProductBacklogItem"})
+        # Simulate a crash after the journal record was committed but before both files were replaced.
+        record = {"namespace": "pbis", "uid_hex": "bbbb", "payload": {"v": 2}, "metadata": {"object_type": "ProductBacklogItem", "rev": 2}}
+        with open(self.backend.journal_dir / "pbis.bbbb.json", 'w') as f:
+            json.dump(record, f)
+        with open(self.root / "pbis" / "bbbb" / "object_payload.json", 'w') as f:
+            f.write('{"v": 2')  # torn, as a non-atomic writer would leave it
+        stale_tmp = self.backend.journal_dir / ".pbis.cccc.json.1234.tmp"
+        stale_tmp.write_text('{"namespace"')
+        os.utime(stale_tmp, (0, 0))
+        # A fresh temp file may be another process's write in progress, so it is left alone.
+        live_tmp = self.backend.journal_dir / ".pbis.dddd.json.5678.tmp"
+        live_tmp.write_text('{"namespace"')
+
+        self.assertEqual(DirectoryBackend(self.root).recover(), 1)
+        self.assertEqual(self.backend.read("pbis", "bbbb"), ({"v": 2}, {"object_type": "ProductBacklogItem", "rev": 2}))
+        self.assertEqual(list(self.backend.journal_dir.iterdir()), [live_tmp])
+
+    def test_03_delete_is_atomic_rename(self):
+        self.backend.write("objects", "dddd", {"k": 1}, {"object_type": "T"})
+        self.assertTrue(self.backend.delete("objects", "dddd"))
+        self.assertFalse((self.root / "dddd").exists())
+        self.assertEqual(list(self.backend.journal_dir.iterdir()), [])
+        self.assertFalse(self.backend.delete("objects", "dddd"))
+
+    @unittest.skipIf(os.name == "nt", "recover() uses fcntl locks")
+    def test_04_recover_skips_record_of_write_in_progress(self):
+        self.backend.write("objects", "eeee", {"v": 1}, {"object_type": "T"})
+        write_pair = self.backend._write_pair
+        recovered = []
+
+        def write_pair_while_another_process_starts(*args):
+            # A second process opening the vault mid-write must not replay this write's record.
+            recovered.append(DirectoryBackend(self.root).recover())
+            write_pair(*args)
+
+        with patch.object(self.backend, "_write_pair", side_effect=write_pair_while_another_process_starts):
+            self.backend.write("objects", "eeee", {"v": 2}, {"object_type": "T"})
+        self.assertEqual(recovered, [0])
+        self.assertEqual(self.backend.read("objects", "eeee"), ({"v": 2}, {"object_type": "T"}))
+        self.assertEqual(list(self.backend.journal_dir.iterdir()), [])
+
+    def test_05_version_token_changes_on_same_size_rewrite(self):
+        self.backend.write("objects", "ffff", {"v": 1}, {"object_type": "T"})
+        obj_dir = self.root / "ffff"
+        stamps = {name: (obj_dir / name).stat().st_mtime_ns for name in ("object_payload.json", "metadata.json")}
+        token = self.backend.version_token("objects", "ffff")
+        self.backend.write("objects", "ffff", {"v": 2}, {"object_type": "T"})
+        # Same sizes, and mtimes pinned as on a filesystem with coarse timestamps.
+        for name, mtime_ns in stamps.items():
+            os.utime(obj_dir / name, ns=(mtime_ns, mtime_ns))
+        self.assertNotEqual(self.backend.version_token("objects", "ffff"), token)
+
+    def test_06_count_events_skips_torn_final_line(self):
+        self.backend.write("objects", "abab", {"k": 1}, {"object_type": "T"})
+        self.assertEqual(self.backend.count_events("objects", "abab"), 0)
+        for i in range(3):
+            self.backend.append_event("objects", "abab", {"event_id": f"e{i}"})
+        with open(self.backend._events_path("objects", "abab"), 'ab') as f:
+            f.write(b'{"event_id": "e3"')  # Interrupted append
+        self.assertEqual(self.backend.count_events("objects", "abab"), 3)
+        self.assertEqual(len(self.backend.read_events("objects", "abab")), 3)
+
+
+class TestLcMemCodecs(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "vault"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_01_mixed_codec_vault_is_readable(self):
+        legacy = DirectoryBackend(self.root)
+        legacy_dir = self.root / "0001"
+        legacy_dir.mkdir(parents=True)
+        with open(legacy_dir / "object_payload.json", 'w') as f:
+            json.dump({"n": 1}, f, indent=2)
+        with open(legacy_dir / "metadata.json", 'w') as f:
+            json.dump({"object_type": "T"}, f, indent=2)
+        for i, name in enumerate(available_codecs(), start=2):
+            DirectoryBackend(self.root, codec=get_codec(name)).write("objects", f"{i:04d}", {"n": i, "codec": name}, {"object_type": "T"})
+
+        reader = DirectoryBackend(self.root)
+        self.assertEqual(reader.read_payload("objects", "0001"), {"n": 1})
+        for i, name in enumerate(available_codecs(), start=2):
+            self.assertEqual(reader.read_payload("objects", f"{i:04d}"), {"n": i, "codec": name})
+        self.assertEqual(len(reader.find_by_object_type("objects", "T")), 1 + len(available_codecs()))
+
+    def test_02_binary_codec_files_carry_marker(self):
+        if "msgpack" not in available_codecs():
+            self.skipTest("msgpack is not installed")
+        backend = DirectoryBackend(self.root, codec=get_codec("msgpack"))
+        backend.write("objects", "aaaa", {"k": [1, 2]}, {"object_type": "T"})
+        raw = (self.root / "aaaa" / "object_payload.json").read_bytes()
+        self.assertTrue(raw.startswith(b"\x00lcmem:msgpack\n"))
+        self.assertEqual(decode_value(raw), {"k": [1, 2]})
+
+    def test_03_convert_vault(self):
+        target = available_codecs()[-1]
+        backend = DirectoryBackend(self.root)
+        backend.write("objects", "aaaa", {"k": 1}, {"object_type": "T"})
+        backend.write("pbis", "bbbb", {"k": 2}, {"object_type": "ProductBacklogItem"})
+        counts = convert_vault(backend, get_codec(target))
+        self.assertEqual(counts, {"objects": 1, "pbis": 1, "agent_profiles": 0})
+        self.assertEqual(backend.codec.name, target)
+        self.assertEqual(DirectoryBackend(self.root).read("pbis", "bbbb"), ({"k": 2}, {"object_type": "ProductBacklogItem"}))
+
+    def test_04_unknown_codec_rejected(self):
+        with self.assertRaises(ValueError):
+            get_codec("pickle")
+
+
+class TestLcMemShardedLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "vault"
+        self.backend = DirectoryBackend(self.root, layout="sharded")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_01_sharded_write_read_list_delete(self):
+        self.backend.write("pbis", "aaaa", {"k": 1}, {"object_type": "ProductBacklogItem"})
+        self.backend.append_event("pbis", "aaaa", {"event_id": "e1"})
+        shard_dir = self.root / "pbis" / DirectoryBackend.shard_path("aaaa")
+        self.assertTrue((shard_dir / "object_payload.json").exists())
+        self.assertEqual(len(shard_dir.relative_to(self.root / "pbis").parts), 3)
+        self.assertEqual(self.backend.read("pbis", "aaaa"), ({"k": 1}, {"object_type": "ProductBacklogItem"}))
+        self.assertEqual(self.backend.read_events("pbis", "aaaa"), [{"event_id": "e1"}])
+        self.assertEqual(self.backend.list_uid_hexes("pbis"), ["aaaa"])
+        self.assertEqual(self.backend.list_uid_hexes("objects"), [])
+        self.assertTrue(self.backend.delete("pbis", "aaaa"))
+        self.assertFalse(self.backend.exists("pbis", "aaaa"))
+
+    def test_02_legacy_flat_objects_readable_and_moved_on_write(self):
+        DirectoryBackend(self.root).write("objects", "bbbb", {"v": 1}, {"object_type": "T"})
+        self.backend.write("objects", "cccc", {"v": 2}, {"object_type": "T"})
+        self.assertEqual(self.backend.read_payload("objects", "bbbb"), {"v": 1})
+        self.assertEqual(sorted(self.backend.list_uid_hexes("objects")), ["bbbb", "cccc"])
+        self.assertEqual(len(self.backend.find_by_object_type("objects", "T")), 2)
+        # The flat reader sees sharded objects too.
+        self.assertEqual(DirectoryBackend(self.root).read_payload("objects", "cccc"), {"v": 2})
+
+        self.backend.write("objects", "bbbb", {"v": 3}, {"object_type": "T"})
+        self.assertFalse((self.root / "bbbb").exists())
+        self.assertTrue((self.root / DirectoryBackend.shard_path("bbbb")).is_dir())
+        self.assertEqual(self.backend.read_payload("objects", "bbbb"), {"v": 3})
+
+    def test_03_migrate_vault_layout_both_ways(self):
+        flat = DirectoryBackend(self.root)
+        flat.write("objects", "aaaa", {"k": 1}, {"object_type": "T"})
+        flat.write("pbis", "bbbb", {"k": 2}, {"object_type": "ProductBacklogItem"})
+        flat.append_event("pbis", "bbbb", {"event_id": "e1"})
+
+        self.assertEqual(migrate_vault_layout(self.root, "sharded"), {"objects": 1, "pbis": 1, "agent_profiles": 0})
+        self.assertEqual(sorted(p.name for p in self.root.iterdir() if not p.name.startswith(".")), sorted(["pbis", DirectoryBackend.shard_path("aaaa").parts[0]]))
+        self.assertEqual(self.backend.read_events("pbis", "bbbb"), [{"event_id": "e1"}])
+        self.assertEqual(migrate_vault_layout(self.root, "sharded"), {"objects": 0, "pbis": 0, "agent_profiles": 0})
+
+        self.assertEqual(migrate_vault_layout(self.root, "flat"), {"objects": 1, "pbis": 1, "agent_profiles": 0})
+        self.assertEqual(sorted(p.name for p in (self.root / "pbis").iterdir()), ["bbbb"])
+        self.assertEqual(flat.read("objects", "aaaa"), ({"k": 1}, {"object_type": "T"}))
+
+    def test_04_unknown_layout_rejected(self):
+        with self.assertRaises(ValueError):
+            DirectoryBackend(self.root, layout="nested")
+
+
+class TestLcMemSqliteBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = SqliteBackend(Path(self.temp_dir.name) / "vault.sqlite3")
+        self.previous_backend = set_storage_backend(self.backend)
+
+    def tearDown(self):
+        set_storage_backend(self.previous_backend)
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_01_wal_mode_enabled(self):
+        mode = self.backend._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_02_object_crud_round_trip(self):
+        uid = mock_lc_mem_core_ensure_uid("SqliteObj")
+        self.assertTrue(mock_lc_mem_core_create_object(uid, {"data": "v1"}, {"object_type": "SqliteObj"}))
+        self.assertEqual(mock_lc_mem_core_get_object(uid), {"data": "v1"})
+
+        self.assertTrue(mock_lc_mem_core_update_object(uid, {"data": "v2"}, update_metadata={"version": "2.0.0"}))
+        self.assertEqual(mock_lc_mem_core_get_object(uid), {"data": "v2"})
+        self.assertEqual(self.backend.read_metadata("objects", uid.split('::')[-1]).get("version"), "2.0.0")
+
+        self.assertIn(uid, mock_lc_mem_core_query_objects({"object_type": "*"}))
+        self.assertTrue(mock_lc_mem_core_delete_object(uid))
+        self.assertIsNone(mock_lc_mem_core_get_object(uid))
+        self.assertFalse(mock_lc_mem_core_update_object(uid, {"data": "v3"}))
+
+    def test_03_pbis_and_uid_list_query(self):
+        pbi_uid = create_pbi({"title": "SQLite PBI", "status": "New"})
+        self.assertIsNotNone(pbi_uid)
+        self.assertEqual(get_pbi(pbi_uid).get("title"), "SQLite PBI")
+        self.assertEqual(len(query_pbis({"status": "New"})), 1)
+
+        results = mock_lc_mem_core_query_objects({"object_uid_list": [pbi_uid]})
+        self.assertEqual(results[0].get("pbi_uid"), pbi_uid)
+
+    def test_04_import_directory_vault(self):
+        source = Path(self.temp_dir.name) / "legacy_vault"
+        for rel, payload, meta in [
+            ("aaaa", {"x": 1}, {"crux_uid": "urn:crux:uid::aaaa", "object_type": "TypeA"}),
+            ("pbis/bbbb", {"title": "Imported PBI", "status": "Done"}, {"crux_uid": "urn:crux:uid::bbbb", "object_type": "ProductBacklogItem"}),
+        ]:
+            (source / rel).mkdir(parents=True)
+            with open(source / rel / "object_payload.json", 'w') as f:
+                json.dump(payload, f)
+            with open(source / rel / "metadata.json", 'w') as f:
+                json.dump(meta, f)
+
+        counts = import_directory_vault(source, self.backend)
+        self.assertEqual(counts, {"objects": 1, "pbis": 1, "agent_profiles": 0})
+        self.assertEqual(self.backend.find_by_object_type("objects", "TypeA"), ["urn:crux:uid::aaaa"])
+        self.assertEqual(get_pbi("urn:crux:uid::bbbb").get("title"), "Imported PBI")
+        self.assertEqual(len(query_pbis({"status": "Done"})), 1)
+
+    def test_05_batch_read_and_write(self):
+        uids = [mock_lc_mem_core_ensure_uid("BatchType") for _ in range(3)]
+        created = create_objects_many([{"object_uid": uid, "object_payload": {"type": "BatchType", "i": i}} for i, uid in enumerate(uids)])
+        self.assertTrue(all(r["ok"] for r in created))
+        results = get_objects_many(list(reversed(uids)) + ["urn:crux:uid::doesnotexist"])
+        self.assertEqual([r["payload"]["i"] if r["ok"] else None for r in results], [2, 1, 0, None])
+
+    def test_06_event_log(self):
+        uid_hex = "cccc"
+        self.backend.write("objects", uid_hex, {"type": "Evented"}, {"object_type": "Evented"})
+        for i in range(3):
+            self.backend.append_event("objects", uid_hex, {"event_id": f"e{i}", "n": i})
+        self.assertEqual([e["n"] for e in self.backend.read_events("objects", uid_hex)], [0, 1, 2])
+        self.assertEqual(self.backend.count_events("objects", uid_hex), 3)
+        self.assertEqual(self.backend.trim_events("objects", uid_hex, "e1"), 2)
+        self.assertEqual([e["event_id"] for e in self.backend.read_events("objects", uid_hex)], ["e2"])
+        self.assertEqual(self.backend.count_events("objects", uid_hex), 1)
+        self.backend.delete("objects", uid_hex)
+        self.assertEqual(self.backend.read_events("objects", uid_hex), [])
+
+
+class TestLcMemObjectCache(unittest.TestCase):
+
+    def setUp(self):
+        if MADA_VAULT_DIR.exists():
+            shutil.rmtree(MADA_VAULT_DIR)
+        MADA_VAULT_DIR.mkdir(parents=True, exist_ok=True)
+        clear_object_cache()
+        OBJECT_CACHE.reset_stats()
+
+    def tearDown(self):
+        clear_object_cache()
+        if MADA_VAULT_DIR.exists():
+            shutil.rmtree(MADA_VAULT_DIR)
+
+    def test_01_repeat_get_hits_cache(self):
+        uid = mock_lc_mem_core_ensure_uid("CachedType")
+        mock_lc_mem_core_create_object(uid, {"type": "CachedType", "value": 1})
+        self.assertEqual(mock_lc_mem_core_get_object(uid)["value"], 1)
+        self.assertEqual(mock_lc_mem_core_get_object(uid)["value"], 1)
+        stats = get_object_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_02_returned_payload_is_a_copy(self):
+        pbi_uid = create_pbi({"title": "Copy check", "tags": ["a"]})
+        first = get_pbi(pbi_uid)
+        first["title"] = "Mutated"
+        first["tags"].append("b")
+        second = get_pbi(pbi_uid)
+        self.assertEqual(second["title"], "Copy check")
+        self.assertEqual(second["tags"], ["a"])
+
+    def test_03_update_and_delete_invalidate(self):
+        uid = mock_lc_mem_core_ensure_uid("CachedType")
+        mock_lc_mem_core_create_object(uid, {"type": "CachedType", "value": 1})
+        mock_lc_mem_core_get_object(uid)
+        mock_lc_mem_core_update_object(uid, {"type": "CachedType", "value": 2})
+        self.assertEqual(mock_lc_mem_core_get_object(uid)["value"], 2)
+        mock_lc_mem_core_delete_object(uid)
+        self.assertIsNone(mock_lc_mem_core_get_object(uid))
+
+    def test_04_external_rewrite_detected(self):
+        pbi_uid = create_pbi({"title": "Original"})
+        self.assertEqual(get_pbi(pbi_uid)["title"], "Original")
+        # Simulate another process rewriting the payload behind the cache's back.
+        payload_file = MADA_VAULT_DIR / "pbis" / pbi_uid.split("::")[-1] / "object_payload.json"
+        with open(payload_file, 'r') as f:
+            payload = json.load(f)
+        payload["title"] = "Rewritten elsewhere"
+        with open(payload_file, 'w') as f:
+            json.dump(payload, f)
+        self.assertEqual(get_pbi(pbi_uid)["title"], "Rewritten elsewhere")
+        self.assertGreaterEqual(get_object_cache_stats()["stale"], 1)
+
+    def test_05_lru_eviction(self):
+        cache = ObjectCache(max_entries=2)
+        cache.put("a", {"v": 1}, token=1)
+        cache.put("b", {"v": 2}, token=1)
+        cache.get("a", token=1)  # "b" is now least recently used
+        cache.put("c", {"v": 3}, token=1)
+        self.assertIsNone(cache.get("b", token=1))
+        self.assertEqual(cache.get("a", token=1), {"v": 1})
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get("a", token=2))  # Token changed: stale
+
 
 if __name__ == '__main__':
     # This allows running the tests directly from the command line
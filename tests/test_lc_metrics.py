@@ -0,0 +1,90 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..services import lc_metrics
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.services import lc_metrics
+
+
+def _fake_seed():
+    return SimpleNamespace(seed_id="urn:crux:uid::t", trace_metadata=SimpleNamespace(L2_trace=SimpleNamespace(timing=None), L3_trace=SimpleNamespace(timing=None)))
+
+
+class TestLcMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.jsonl_path = Path(self.temp_dir.name) / "metrics.jsonl"
+        self.patchers = [patch.object(lc_metrics, "METRICS_ENABLED", True), patch.object(lc_metrics, "METRICS_JSONL_PATH", str(self.jsonl_path))]
+        for patcher in self.patchers:
+            patcher.start()
+        lc_metrics.METRICS.reset()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        lc_metrics.METRICS.reset()
+        self.temp_dir.cleanup()
+
+    def test_01_sync_layer_timing_and_errors(self):
+        @lc_metrics.instrument_layer("L2")
+        def frame(seed, fail=False):
+            if fail:
+                raise ValueError("bad")
+            return seed
+
+        seed = frame(_fake_seed())
+        self.assertGreaterEqual(seed.trace_metadata.L2_trace.timing.wall_ms, 0)
+        self.assertEqual(seed.trace_metadata.L2_trace.timing.llm_calls, 0)
+        with self.assertRaises(ValueError):
+            frame(_fake_seed(), fail=True)
+        totals = lc_metrics.get_layer_metrics()["layers"]["L2"]
+        self.assertEqual((totals["runs"], totals["errors"]), (2, 1))
+        records = [json.loads(line) for line in self.jsonl_path.read_text().splitlines()]
+        self.assertEqual([(r["layer"], r["ok"], r["trace_id"]) for r in records], [("L2", True, "urn:crux:uid::t"), ("L2", False, None)])
+
+    def test_02_async_layer_accumulates_llm_wait(self):
+        async def fake_llm_call(label):
+            with lc_metrics.llm_wait(label):
+                await asyncio.sleep(0.02)
+
+        @lc_metrics.instrument_layer("L3")
+        async def keymap(seed):
+            await asyncio.gather(fake_llm_call("Helper:a"), fake_llm_call("Helper:b"))
+            return seed
+
+        seed = asyncio.run(keymap(_fake_seed()))
+        timing = seed.trace_metadata.L3_trace.timing
+        self.assertEqual(timing.llm_calls, 2)
+        self.assertGreaterEqual(timing.llm_wait_ms, 35) # Summed over overlapping calls
+        self.assertEqual(sorted(lc_metrics.get_layer_metrics()["llm"]), ["Helper:a", "Helper:b"])
+
+    def test_03_prometheus_text_and_disabled(self):
+        @lc_metrics.instrument_layer("L2")
+        def frame(seed):
+            return seed
+
+        frame(_fake_seed())
+        prom_path = Path(self.temp_dir.name) / "lc.prom"
+        self.assertTrue(lc_metrics.write_prometheus_text(prom_path))
+        text = prom_path.read_text()
+        self.assertIn("# TYPE lc_sop_layer_wall_seconds_total counter", text)
+        self.assertIn('lc_sop_layer_runs_total{layer="L2"} 1', text)
+        with patch.object(lc_metrics, "METRICS_ENABLED", False):
+            seed = frame(_fake_seed())
+        self.assertIsNone(seed.trace_metadata.L2_trace.timing)
+        self.assertEqual(lc_metrics.get_layer_metrics()["layers"]["L2"]["runs"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
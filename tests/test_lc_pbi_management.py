@@ -13,6 +13,7 @@ try:
         update_pbi,
         delete_pbi,
         query_pbis,
+        PBI_INDEX,
         PBI_VAULT_DIR, # For direct inspection and cleanup
         MADA_VAULT_DIR # To ensure it's created for PBI_VAULT_DIR parent
     )
@@ -26,6 +27,7 @@ except ImportError:
         update_pbi,
         delete_pbi,
         query_pbis,
+        PBI_INDEX,
         PBI_VAULT_DIR,
         MADA_VAULT_DIR
     )
@@ -227,10 +229,35 @@ class TestLcPbiManagement(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].get("title"), "PBI 1")
 
+    def test_13_index_tracks_update_and_delete(self):
+        pbi_uid = create_pbi({"title": "Indexed PBI", "status": "New", "related_oia_cycle_uids": ["urn:crux:uid::oia_X"]})
+        uid_hex = pbi_uid.split('::')[-1]
+        self.assertEqual(PBI_INDEX.lookup({"status": "New"}), {uid_hex})
+        self.assertTrue((PBI_VAULT_DIR / ".pbi_index_log.jsonl").exists())
+
+        update_pbi(pbi_uid, {"status": "Done", "related_oia_cycle_uids": ["urn:crux:uid::oia_Y"]})
+        self.assertEqual(PBI_INDEX.lookup({"status": "New"}), set())
+        self.assertEqual(PBI_INDEX.lookup({"status": "Done", "related_oia_cycle_uid": "urn:crux:uid::oia_Y"}), {uid_hex})
+        self.assertEqual(len(query_pbis({"related_oia_cycle_uid": "urn:crux:uid::oia_X"})), 0)
+
+        delete_pbi(pbi_uid)
+        self.assertEqual(PBI_INDEX.all_uids(), set())
+        self.assertEqual(query_pbis({"status": "Done"}), [])
+
+    def test_14_index_rebuilt_for_unindexed_vault(self):
+        create_pbi({"title": "Pre-existing PBI", "status": "Blocked"})
+        # Simulate a vault written before the index existed.
+        for index_file in PBI_VAULT_DIR.glob(".pbi_index_*"):
+            index_file.unlink()
+
+        results = query_pbis({"status": "Blocked"})
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].get("title"), "Pre-existing PBI")
+        self.assertTrue((PBI_VAULT_DIR / ".pbi_index_snapshot.json").exists())
+
 if __name__ == '__main__':
     if "lc_python_core" not in sys.path[0] and "lc_python_core" not in os.getcwd():
         current_dir_parent = Path(__file__).resolve().parent
         if current_dir_parent.name == "tests" and current_dir_parent.parent.name == "lc_python_core":
              sys.path.insert(0, str(current_dir_parent.parent.parent))
     unittest.main()
-```
@@ -7,7 +7,7 @@ from ..schemas.mada_schema import ( # Corrected path
     L2FrameTypeObj, L2Trace, L2EpistemicStateOfFramingEnum, InputClassL2Enum,
     TemporalHintProvenanceL2Enum, L2ValidationStatusOfFrameEnum, CommunicationContextL2, TemporalHintL2
 )
-from ..sops.sop_l1_startle import startle_process, _startle_create_initial_madaSeed_shell # Corrected path
+from ..sops.sop_l1_startle import startle_process, _startle_create_initial_madaSeed_shell, _startle_build_madaSeed_shell # Corrected path
 from ..sops.sop_l2_frame_click import frame_click_process # Corrected path
 
 
@@ -26,6 +26,31 @@ class TestMadaSchema(unittest.TestCase):
         self.assertEqual(shell.version, "0.3.0") # As defined in _startle_create_initial_madaSeed_shell
         self.assertIsNotNone(shell.seed_content.L1_startle_reflex.L2_frame_type.L3_surface_keymap.L4_anchor_state.L5_field_state.L6_reflection_payload.L7_encoded_application)
 
+    def test_mada_seed_shell_clone_matches_build_and_is_independent(self):
+        """Cloned shells match a fully built one and do not share state with each other."""
+        raw_signals = [RawSignal(raw_input_id="urn:crux:uid::raw1", raw_input_signal="hello")]
+        built = _startle_build_madaSeed_shell("urn:crux:uid::a", "urn:crux:uid::t", raw_signals)
+        first = _startle_create_initial_madaSeed_shell("urn:crux:uid::a", "urn:crux:uid::t", raw_signals)
+        self.assertEqual((first.seed_id, first.trace_metadata.trace_id, first.seed_content.raw_signals), (built.seed_id, built.trace_metadata.trace_id, built.seed_content.raw_signals))
+        first_layer, built_layer = first.seed_content.L1_startle_reflex, built.seed_content.L1_startle_reflex
+        for layer_obj, nested in (("L2_frame_type_obj", "L2_frame_type"), ("L3_surface_keymap_obj", "L3_surface_keymap"), ("L4_anchor_state_obj", "L4_anchor_state"), ("L5_field_state_obj", "L5_field_state"), ("L6_reflection_payload_obj", "L6_reflection_payload")):
+            first_layer, built_layer = getattr(first_layer, nested), getattr(built_layer, nested)
+            if layer_obj != "L6_reflection_payload_obj": # Carries a per-event generation_timestamp
+                self.assertEqual(getattr(first_layer, layer_obj), getattr(built_layer, layer_obj))
+        self.assertEqual(first_layer.L7_encoded_application, built_layer.L7_encoded_application)
+
+        first.seed_content.raw_signals.append(RawSignal(raw_input_id="urn:crux:uid::raw2", raw_input_signal="x"))
+        first.seed_content.L1_startle_reflex.L2_frame_type.L2_frame_type_obj.error_details = "mutated"
+        first.trace_metadata.L3_trace.epistemic_state_L3 = "mutated"
+        second = _startle_create_initial_madaSeed_shell("urn:crux:uid::b", "urn:crux:uid::t2", [])
+        self.assertEqual(second.seed_id, "urn:crux:uid::b")
+        self.assertEqual(second.trace_metadata.trace_id, "urn:crux:uid::t2")
+        self.assertEqual(second.seed_content.raw_signals, [])
+        self.assertEqual(len(raw_signals), 1)
+        self.assertEqual(second.seed_content.L1_startle_reflex.L2_frame_type.L2_frame_type_obj.error_details, "Pending_L2")
+        self.assertEqual(second.trace_metadata.L3_trace.epistemic_state_L3, "Pending_L3")
+        self.assertEqual(second.seed_content.L1_startle_reflex.L2_frame_type.L3_surface_keymap.L4_anchor_state.L5_field_state.L6_reflection_payload.L6_reflection_payload_obj.payload_metadata.source_trace_id, "urn:crux:uid::t2")
+
 
 class TestStartleProcess(unittest.TestCase):
     sample_input_event_multi = {
@@ -0,0 +1,68 @@
+import unittest
+from pathlib import Path
+
+# Adjust import paths for testing
+try:
+    from ..sops.sop_l3_local_extractors import extract_local_features, local_statistics, tokenize_words
+    from ..sops.sop_l3_keymap_click import _keymap_apply_local_features, _keymap_check_encoding
+    from ..schemas.mada_schema import ContentEncodingStatusL3Enum, L3SurfaceKeymapObj, NegationMarker
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.sops.sop_l3_local_extractors import extract_local_features, local_statistics, tokenize_words
+    from lc_python_core.sops.sop_l3_keymap_click import _keymap_apply_local_features, _keymap_check_encoding
+    from lc_python_core.schemas.mada_schema import ContentEncodingStatusL3Enum, L3SurfaceKeymapObj, NegationMarker
+
+
+class TestSopL3LocalExtractors(unittest.TestCase):
+
+    def test_01_statistics(self):
+        self.assertEqual(len(tokenize_words("This is a test sentence.")), 5)
+        stats = local_statistics("Hello there. How are you? Fine")
+        self.assertEqual(stats.token_count.value, 6)
+        self.assertEqual(stats.sentence_count.value, 3)
+        self.assertEqual(stats.lexical_diversity.score, 1.0)
+        self.assertGreater(stats.entropy_score.score, 0)
+
+    def test_02_lexical_relational_and_structure(self):
+        text = ("# Plan\n- Ship 3 kg by tomorrow, because it isn't ready 😀😀\n---\n"
+                "As mentioned above, see https://example.com/x. Some items cost $20.")
+        features = extract_local_features(text)
+        lexical = features["lexical"]
+        self.assertEqual([(m.value_string, m.unit_mention) for m in lexical["numerical_quantity_mentions"]], [("3", "kg"), ("20", "$")])
+        self.assertEqual([m.term for m in lexical["negation_markers"]], ["isn't"])
+        self.assertEqual([m.expression for m in lexical["temporal_expression_mentions"]], ["tomorrow"])
+        self.assertEqual([m.term for m in lexical["quantifier_qualifier_mentions"]], ["Some"])
+        self.assertEqual([(e.emoji, e.count) for e in features["emoji_mentions"]], [("😀", 2)])
+        relational = features["relational_linking_markers"]
+        self.assertEqual(relational.url_mentions.detected_urls, ["https://example.com/x"])
+        self.assertEqual(relational.explicit_relational_phrases.detected, ["because"])
+        self.assertEqual(relational.explicit_reference_markers.detected, ["As mentioned above"])
+        self.assertEqual(features["content_structure_markers"], ["Heading: Plan", "List item: - Ship 3 kg by tomorrow, because it isn't ready 😀😀", "Separator: ---"])
+
+    def test_03_encoding_and_non_text(self):
+        self.assertEqual(extract_local_features("[[BINARY_CONTENT_PLACEHOLDER]]"), {"content_encoding_status": ContentEncodingStatusL3Enum.BINARYDETECTED})
+        self.assertEqual(extract_local_features("bad � byte")["content_encoding_status"], ContentEncodingStatusL3Enum.POSSIBLEENCODINGISSUE)
+        self.assertEqual(extract_local_features("plain text")["content_encoding_status"], ContentEncodingStatusL3Enum.CONFIRMEDUTF8)
+
+    def test_04_merge_keeps_llm_values_for_local_gaps(self):
+        keymap = L3SurfaceKeymapObj(version="0.1.1", lexical_affordances={}, syntactic_hints={}, pragmatic_affective_affordances={}, relational_linking_markers={}, L3_flags={})
+        keymap.lexical_affordances.negation_markers = [NegationMarker(term="hardly", confidence=0.6)]
+        keymap.content_structure_markers = ["Heading: From LLM"]
+        _keymap_apply_local_features(keymap, extract_local_features("I do not agree with 2 points."))
+        self.assertEqual([m.term for m in keymap.lexical_affordances.negation_markers], ["not"]) # Local result wins
+        self.assertEqual(keymap.content_structure_markers, ["Heading: From LLM"]) # Local found nothing, LLM value kept
+        self.assertEqual(keymap.statistical_properties.token_count.value, 7)
+
+    def test_05_encoding_issue_only_flagged_by_local_pass(self):
+        text = "bad \ufffd byte"
+        keymap = L3SurfaceKeymapObj(version="0.1.1", lexical_affordances={}, syntactic_hints={}, pragmatic_affective_affordances={}, relational_linking_markers={}, L3_flags={})
+        keymap.content_encoding_status = _keymap_check_encoding(text)
+        self.assertEqual(keymap.content_encoding_status, ContentEncodingStatusL3Enum.CONFIRMEDUTF8) # The 'llm' policy's baseline check
+        _keymap_apply_local_features(keymap, extract_local_features(text))
+        self.assertEqual(keymap.content_encoding_status, ContentEncodingStatusL3Enum.POSSIBLEENCODINGISSUE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import json
 import shutil
 from pathlib import Path
 import os
+from unittest.mock import patch
 
 # Adjust import paths for testing
 try:
@@ -13,9 +14,11 @@ try:
         add_application_to_cycle,
         update_oia_cycle_status,
         get_oia_cycle_state,
+        compact_oia_cycle,
         OIA_CYCLE_OBJECT_TYPE
     )
-    from ..services.lc_mem_service import MADA_VAULT_DIR
+    from ..services.lc_mem_service import MADA_VAULT_DIR, mock_lc_mem_core_get_object, mock_lc_mem_core_get_events
+    from ..sops.meta_sops import sop_oia_cycle_management
 except ImportError:
     import sys
     package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
@@ -27,9 +30,11 @@ except ImportError:
         add_application_to_cycle,
         update_oia_cycle_status,
         get_oia_cycle_state,
+        compact_oia_cycle,
         OIA_CYCLE_OBJECT_TYPE
     )
-    from lc_python_core.services.lc_mem_service import MADA_VAULT_DIR
+    from lc_python_core.services.lc_mem_service import MADA_VAULT_DIR, mock_lc_mem_core_get_object, mock_lc_mem_core_get_events
+    from lc_python_core.sops.meta_sops import sop_oia_cycle_management
 
 
 class TestOiaCycleManagement(unittest.TestCase):
@@ -140,6 +145,83 @@ class TestOiaCycleManagement(unittest.TestCase):
         state = get_oia_cycle_state("urn:crux:uid::nonexistent_oia_cycle")
         self.assertIsNone(state)
 
+    def test_07_adds_append_events_without_rewriting_snapshot(self):
+        oia_uid = initiate_oia_cycle("Event Log Cycle")
+        snapshot_before = mock_lc_mem_core_get_object(oia_uid)
+        add_observation_to_cycle(oia_uid, "obs 1")
+        add_observation_to_cycle(oia_uid, "obs 2")
+        update_oia_cycle_status(oia_uid, "Paused", "Pausing.")
+
+        self.assertEqual(mock_lc_mem_core_get_object(oia_uid), snapshot_before)
+        self.assertEqual(len(mock_lc_mem_core_get_events(oia_uid)), 3)
+        state = get_oia_cycle_state(oia_uid)
+        self.assertEqual([o["summary"] for o in state["observations"]], ["obs 1", "obs 2"])
+        self.assertEqual(state["status"], "Paused")
+        self.assertEqual(len(state["log"]), 4)
+
+    def test_08_compaction_folds_log_into_snapshot(self):
+        oia_uid = initiate_oia_cycle("Compaction Cycle")
+        for i in range(5):
+            add_observation_to_cycle(oia_uid, f"obs {i}")
+        self.assertTrue(compact_oia_cycle(oia_uid))
+        self.assertEqual(mock_lc_mem_core_get_events(oia_uid), [])
+        self.assertEqual(len(mock_lc_mem_core_get_object(oia_uid)["observations"]), 5)
+
+        add_interpretation_to_cycle(oia_uid, "interp")
+        state = get_oia_cycle_state(oia_uid)
+        self.assertEqual(len(state["observations"]), 5)
+        self.assertEqual(len(state["interpretations"]), 1)
+        self.assertEqual(len(state["log"]), 7)
+
+    def test_09_read_triggers_compaction_past_threshold(self):
+        oia_uid = initiate_oia_cycle("Threshold Cycle")
+        original_threshold = sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD
+        for i in range(4):
+            add_observation_to_cycle(oia_uid, f"obs {i}")
+        sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD = 3 # Events appended under a higher threshold are compacted by the next read
+        try:
+            self.assertEqual(len(get_oia_cycle_state(oia_uid)["observations"]), 4)
+        finally:
+            sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD = original_threshold
+        self.assertEqual(mock_lc_mem_core_get_events(oia_uid), [])
+        self.assertEqual(len(get_oia_cycle_state(oia_uid)["observations"]), 4)
+
+    def test_10_add_to_nonexistent_cycle(self):
+        self.assertIsNone(add_observation_to_cycle("urn:crux:uid::nonexistent_oia_cycle", "obs"))
+        self.assertFalse(update_oia_cycle_status("urn:crux:uid::nonexistent_oia_cycle", "Done", "msg"))
+
+    def test_11_append_triggers_compaction_at_threshold(self):
+        oia_uid = initiate_oia_cycle("Append Threshold Cycle")
+        original_threshold = sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD
+        sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD = 3
+        try:
+            # Below the threshold an append only counts the log, it does not read it.
+            with patch.object(sop_oia_cycle_management, "mock_lc_mem_core_get_events", side_effect=AssertionError("log decoded on append")):
+                add_observation_to_cycle(oia_uid, "obs 0")
+                add_observation_to_cycle(oia_uid, "obs 1")
+            self.assertEqual(len(mock_lc_mem_core_get_events(oia_uid)), 2)
+            update_oia_cycle_status(oia_uid, "Paused", "Pausing.") # Third event: compacted without any read
+            self.assertEqual(mock_lc_mem_core_get_events(oia_uid), [])
+            snapshot = mock_lc_mem_core_get_object(oia_uid)
+            self.assertEqual(len(snapshot["observations"]), 2)
+            self.assertEqual(snapshot["status"], "Paused")
+            add_observation_to_cycle(oia_uid, "obs 2")
+            self.assertEqual(len(mock_lc_mem_core_get_events(oia_uid)), 1)
+        finally:
+            sop_oia_cycle_management.OIA_EVENT_COMPACT_THRESHOLD = original_threshold
+        self.assertEqual(len(get_oia_cycle_state(oia_uid)["observations"]), 3)
+
+    def test_12_state_has_no_snapshot_bookkeeping(self):
+        oia_uid = initiate_oia_cycle("Bookkeeping Cycle")
+        add_observation_to_cycle(oia_uid, "obs 0")
+        self.assertNotIn("last_applied_event_id", get_oia_cycle_state(oia_uid))
+        self.assertTrue(compact_oia_cycle(oia_uid))
+        self.assertIn("last_applied_event_id", mock_lc_mem_core_get_object(oia_uid)) # Kept with the stored snapshot only
+        add_observation_to_cycle(oia_uid, "obs 1")
+        state = get_oia_cycle_state(oia_uid)
+        self.assertNotIn("last_applied_event_id", state)
+        self.assertEqual(len(state["observations"]), 2)
+
 if __name__ == '__main__':
     # Adjust sys.path if running directly for lc_python_core imports
     if "lc_python_core" not in sys.path[0] and "lc_python_core" not in os.getcwd():
@@ -0,0 +1,226 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Adjust import paths for testing
+try:
+    from ..sops import sop_pipeline_runner
+    from ..sops.sop_pipeline_checkpoint import checkpoint_uid
+    from ..services.lc_mem_service import set_storage_backend, mock_lc_mem_core_create_object
+    from ..services.lc_mem_storage import SqliteBackend
+except ImportError:
+    import sys
+    package_path = Path(__file__).resolve().parents[2] # up to lc_python_core
+    sys.path.insert(0, str(package_path.parent)) # up to frontends
+    from lc_python_core.sops import sop_pipeline_runner
+    from lc_python_core.sops.sop_pipeline_checkpoint import checkpoint_uid
+    from lc_python_core.services.lc_mem_service import set_storage_backend, mock_lc_mem_core_create_object
+    from lc_python_core.services.lc_mem_storage import SqliteBackend
+
+
+def _stage(name):
+    def run(seed, *args):
+        if name == "L5" and seed.event.get("fail_at") == "L5":
+            raise RuntimeError("boom")
+        seed.layers.append(name)
+        return seed
+    return run
+
+
+# Checkpoints are stored as JSON, so the checkpoint tests use real seeds and record the
+# layers that ran in a list field that survives the round trip.
+_TEXT_EVENT = {"reception_timestamp_utc_iso": "2023-11-01T12:00:00Z", "origin_hint": "Test",
+               "data_components": [{"role_hint": "primary_text_content", "content_handle_placeholder": "Hello there.", "size_hint": 12, "type_hint": "text/plain"}]}
+
+
+def _layers(seed):
+    return seed.trace_metadata.L1_trace.L1_applied_policy_refs
+
+
+def _checkpoint_stage(name):
+    def run(seed, *args):
+        _layers(seed).append(name)
+        return seed
+    return run
+
+
+class TestSopPipelineRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.l3_active = 0
+        self.l3_peak = 0
+
+        async def fake_keymap(seed, **kwargs):
+            self.l3_active += 1
+            self.l3_peak = max(self.l3_peak, self.l3_active)
+            await asyncio.sleep(seed.event["delay"])
+            self.l3_active -= 1
+            seed.layers.append("L3")
+            return seed
+
+        stages = {
+            "startle_process": lambda event: SimpleNamespace(event=event, layers=["L1"], seed_content=SimpleNamespace(raw_signals=[])),
+            "frame_click_process": _stage("L2"),
+            "keymap_click_process": fake_keymap,
+            "anchor_click_process": _stage("L4"),
+            "field_click_process": _stage("L5"),
+            "reflect_boom_process": _stage("L6"),
+            "apply_done_process": _stage("L7"),
+        }
+        self.patchers = [patch.object(sop_pipeline_runner, name, fn) for name, fn in stages.items()]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def _collect(self, events, **kwargs):
+        async def run():
+            return [result async for result in sop_pipeline_runner.run_pipeline_batch(events, **kwargs)]
+        return asyncio.run(run())
+
+    def test_01_completion_order_and_failure_isolation(self):
+        events = [{"delay": 0.2}, {"delay": 0.0, "fail_at": "L5"}, {"delay": 0.05}]
+        results = self._collect(events)
+        self.assertEqual([r["index"] for r in results], [1, 2, 0])
+        failed = results[0]
+        self.assertEqual((failed["ok"], failed["failed_layer"]), (False, "L5"))
+        self.assertIn("boom", failed["error"])
+        self.assertEqual(failed["seed"].layers, ["L1", "L2", "L3", "L4"])
+        for result in results[1:]:
+            self.assertTrue(result["ok"])
+            self.assertEqual(result["seed"].layers, ["L1", "L2", "L3", "L4", "L5", "L6", "L7"])
+
+    def test_02_shared_l3_limit(self):
+        results = self._collect([{"delay": 0.02} for _ in range(10)], l3_max_in_flight=3, max_in_flight=10)
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(self.l3_peak, 3)
+
+
+class TestSopPipelineRunnerProcessMode(unittest.TestCase):
+
+    def test_01_process_pool_reports_worker_errors(self):
+        # A malformed event (not a dict) makes L1 raise inside the worker process.
+        event = "not an input event"
+        executor = sop_pipeline_runner.create_pipeline_executor("process", max_workers=2)
+        self.assertIsInstance(executor, sop_pipeline_runner.ProcessPoolExecutor)
+
+        async def run():
+            return [result async for result in sop_pipeline_runner.run_pipeline_batch([event, event], executor=executor)]
+        try:
+            results = asyncio.run(run())
+        finally:
+            executor.shutdown()
+        self.assertEqual(sorted(r["index"] for r in results), [0, 1])
+        for result in results:
+            self.assertEqual((result["ok"], result["failed_layer"], result["seed"]), (False, "L1", None))
+            self.assertIn("AttributeError", result["error"])
+
+    def test_02_valid_event_round_trips_through_worker_processes(self):
+        event = _TEXT_EVENT
+        process_executor = sop_pipeline_runner.create_pipeline_executor("process", max_workers=1)
+        thread_executor = sop_pipeline_runner.create_pipeline_executor("thread", max_workers=1)
+
+        async def run(executor):
+            l1_seed = await sop_pipeline_runner._pipeline_call_stage(executor, "startle_process", event)
+            return l1_seed, await sop_pipeline_runner._pipeline_call_stage(executor, "frame_click_process", l1_seed.model_copy(deep=True))
+        try:
+            l1_seed, l2_seed = asyncio.run(run(process_executor))
+            _, l2_seed_in_thread = asyncio.run(run(thread_executor))
+        finally:
+            process_executor.shutdown()
+            thread_executor.shutdown()
+        l1_context = l1_seed.seed_content.L1_startle_reflex.L1_startle_context_obj
+        self.assertEqual(l1_context.L1_epistemic_state_of_startle, "Startle_Complete_SignalRefs_Generated")
+        self.assertEqual(len(l1_context.signal_components_metadata_L1), 1)
+        self.assertEqual(l2_seed.seed_id, l1_seed.seed_id)
+        # L2 does in a worker exactly what it does in-process.
+        self.assertEqual(l2_seed.seed_content.L1_startle_reflex.L2_frame_type.L2_frame_type_obj,
+                         l2_seed_in_thread.seed_content.L1_startle_reflex.L2_frame_type.L2_frame_type_obj)
+        self.assertEqual(l2_seed.trace_metadata.L2_trace.model_dump(exclude={"completion_timestamp_L2"}),
+                         l2_seed_in_thread.trace_metadata.L2_trace.model_dump(exclude={"completion_timestamp_L2"}))
+
+
+class TestSopPipelineRunnerCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = SqliteBackend(Path(self.temp_dir.name) / "vault.sqlite3")
+        self.previous_backend = set_storage_backend(self.backend)
+        self.l3_calls = 0
+        self.l3_fails = True
+
+        real_startle_process = sop_pipeline_runner.startle_process
+
+        def startle(event):
+            seed = real_startle_process(_TEXT_EVENT)
+            seed.seed_id = "urn:crux:uid::cafe"
+            _layers(seed).append("L1")
+            return seed
+
+        async def flaky_keymap(seed, **kwargs):
+            self.l3_calls += 1
+            if self.l3_fails:
+                raise TimeoutError("LLM timeout")
+            _layers(seed).append("L3")
+            return seed
+
+        stages = {
+            "startle_process": startle,
+            "frame_click_process": _checkpoint_stage("L2"),
+            "keymap_click_process": flaky_keymap,
+            "anchor_click_process": _checkpoint_stage("L4"),
+            "field_click_process": _checkpoint_stage("L5"),
+            "reflect_boom_process": _checkpoint_stage("L6"),
+            "apply_done_process": _checkpoint_stage("L7"),
+        }
+        self.patchers = [patch.object(sop_pipeline_runner, name, fn) for name, fn in stages.items()]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        set_storage_backend(self.previous_backend)
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_01_resume_after_l3_failure_and_rerun_from_l5(self):
+        async def run_batch():
+            return [result async for result in sop_pipeline_runner.run_pipeline_batch([{}], checkpoint=True)]
+        failed = asyncio.run(run_batch())[0]
+        self.assertEqual((failed["ok"], failed["failed_layer"]), (False, "L3"))
+        self.assertEqual(sop_pipeline_runner.latest_seed_checkpoint("urn:crux:uid::cafe")[0], "L2")
+
+        self.l3_fails = False
+        resumed = asyncio.run(sop_pipeline_runner.resume_pipeline("urn:crux:uid::cafe"))
+        self.assertTrue(resumed["ok"])
+        self.assertEqual(resumed["resumed_from"], "L3")
+        self.assertEqual(_layers(resumed["seed"]), ["L1", "L2", "L3", "L4", "L5", "L6", "L7"])
+
+        rerun = asyncio.run(sop_pipeline_runner.resume_pipeline("urn:crux:uid::cafe", from_layer="L5"))
+        self.assertEqual(_layers(rerun["seed"]), ["L1", "L2", "L3", "L4", "L5", "L6", "L7"]) # Started from the L4 checkpoint
+        self.assertEqual(self.l3_calls, 2)
+        done = asyncio.run(sop_pipeline_runner.resume_pipeline("urn:crux:uid::cafe"))
+        self.assertEqual((done["ok"], done["resumed_from"]), (True, None))
+
+    def test_02_resume_without_checkpoint(self):
+        result = asyncio.run(sop_pipeline_runner.resume_pipeline("urn:crux:uid::beef", from_layer="L4"))
+        self.assertEqual((result["ok"], result["seed"], result["failed_layer"]), (False, None, "L4"))
+        with self.assertRaises(ValueError):
+            asyncio.run(sop_pipeline_runner.resume_pipeline("urn:crux:uid::beef", from_layer="L1"))
+
+    def test_03_invalid_checkpoint_is_ignored(self):
+        for seed in ({"version": "not a version"}, "gASVAAAAAAAAAAB9lC4="):
+            mock_lc_mem_core_create_object(checkpoint_uid("urn:crux:uid::f00d", "L2"), {"seed_id": "urn:crux:uid::f00d", "layer": "L2", "seed": seed},
+                                           initial_metadata={"object_type": "MadaSeedCheckpoint"})
+            self.assertIsNone(sop_pipeline_runner.load_seed_checkpoint("urn:crux:uid::f00d", "L2"))
+
+
+if __name__ == '__main__':
+    unittest.main()